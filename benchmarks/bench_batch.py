@@ -0,0 +1,58 @@
+# Boards per second of the numpy batch solver against solving the same boards one by one.
+# Run from the repository root: python -m benchmarks.bench_batch [count]
+import random
+import sys
+import time
+
+from src.sudoku_batch import boards_from_strings, solve_batch
+from src.sudoku_engine import solve
+from src.sudoku_io import parse_puzzle
+
+PUZZLES: dict[str, str] = {
+    "easy": "530070000600195000098000060800060003400803001700020006060000280000419005000080079",
+    "medium": "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+}
+
+
+def variants(puzzle: str, count: int, seed: int = 0) -> list[str]:
+    # Equivalent puzzles: relabelled digits and shuffled rows within each band
+    rng = random.Random(seed)
+    rows: list[str] = [puzzle[y * 9:(y + 1) * 9] for y in range(9)]
+    result: list[str] = []
+    for _ in range(count):
+        digits: list[str] = list("123456789")
+        rng.shuffle(digits)
+        order: list[int] = []
+        for band in range(3):
+            band_rows: list[int] = [band * 3, band * 3 + 1, band * 3 + 2]
+            rng.shuffle(band_rows)
+            order += band_rows
+        text: str = "".join(rows[y] for y in order)
+        result.append("".join(digits[int(c) - 1] if c not in ".0" else "." for c in text))
+    return result
+
+
+def main() -> None:
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    scalar_count: int = max(count // 20, 1)
+    print(f"{'tier':<8}{'solver':<22}{'boards':>8}{'boards/s':>12}")
+    for tier, puzzle in PUZZLES.items():
+        lines: list[str] = variants(puzzle, count)
+
+        # plain backtracking needs millions of nodes on some medium variants
+        for algorithm in ("backtrack", "propagate") if tier == "easy" else ("propagate",):
+            started: float = time.perf_counter()
+            for line in lines[:scalar_count]:
+                assert solve(parse_puzzle(line), algorithm).solved
+            rate: float = scalar_count / (time.perf_counter() - started)
+            print(f"{tier:<8}{'scalar ' + algorithm:<22}{scalar_count:>8}{rate:>12.0f}")
+
+        started = time.perf_counter()
+        _, solved = solve_batch(boards_from_strings(lines))
+        rate = count / (time.perf_counter() - started)
+        assert solved.all()
+        print(f"{tier:<8}{'numpy batch':<22}{count:>8}{rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Import time of the non-GUI entry points, each in a fresh interpreter, and a check
+# that none of them pulls in Qt, numpy or multiprocessing.
+# Run from the repository root:
+#   python -m benchmarks.bench_imports                 # fail when a module is over budget
+#   python -m benchmarks.bench_imports --repeat 20 --budget 50
+# Exits with status 1 when an entry point loads one of the FORBIDDEN packages or
+# takes longer than --budget milliseconds (fastest of --repeat runs).
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT: Path = Path(__file__).parent.parent
+
+ENTRY_POINTS: tuple[str, ...] = (
+    "src.sudoku_core",
+    "src.sudoku_engine",
+    "src.sudoku_io",
+    "src.sudoku_cli",
+    "src.sudoku_generator",
+    "src.sudoku_cache",
+    "src.sudoku_store",
+    "src.sudoku_terminal",
+    "src.sudoku_trace",
+)
+
+# Top-level packages that only the GUI (or an explicit parallel run) may load
+FORBIDDEN: tuple[str, ...] = ("PySide6", "shiboken6", "numpy", "multiprocessing", "concurrent")
+
+# Measures in the child, so interpreter start-up is not counted
+PROBE: str = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set({forbidden!r}))
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(module: str) -> dict:
+    # One fresh interpreter importing `module`: {"seconds": float, "loaded": [forbidden packages]}
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, forbidden=FORBIDDEN)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the non-GUI entry points.")
+    parser.add_argument("--modules", nargs="+", default=list(ENTRY_POINTS), help="modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="imports per module, the fastest one counts")
+    parser.add_argument("--budget", type=float, default=150.0, help="allowed import time in milliseconds")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    failures: list[str] = []
+    print(f"{'module':<24}{'ms':>8}  loaded")
+    for module in arguments.modules:
+        runs: list[dict] = [measure(module) for _ in range(max(arguments.repeat, 1))]
+        milliseconds: float = min(run["seconds"] for run in runs) * 1000
+        loaded: list[str] = sorted({name for run in runs for name in run["loaded"]})
+        print(f"{module:<24}{milliseconds:>8.1f}  {' '.join(loaded) or '-'}")
+        if loaded:
+            failures.append(f"{module} loads {', '.join(loaded)}")
+        if milliseconds > arguments.budget:
+            failures.append(f"{module}: {milliseconds:.1f} ms, budget {arguments.budget:.1f} ms")
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
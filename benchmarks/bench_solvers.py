@@ -0,0 +1,168 @@
+# Throughput of every solver strategy over tiered puzzle corpora, with a stored
+# baseline to catch regressions.
+# Run from the repository root:
+#   python -m benchmarks.bench_solvers                   # compare with benchmarks/baseline.json
+#   python -m benchmarks.bench_solvers --update-baseline # record a new baseline
+#   python -m benchmarks.bench_solvers --output results.json --tiers easy hard
+# Exits with status 1 when an engine solves a tier more than --threshold slower
+# (puzzles per second) or with more than --threshold more nodes than the baseline.
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.sudoku_core import SudokuBoard
+from src.sudoku_engine import STRATEGIES, SudokuEngine
+from src.sudoku_io import parse_puzzle, read_puzzles
+
+CORPORA: Path = Path(__file__).parent / "corpora"
+BASELINE: Path = Path(__file__).parent / "baseline.json"
+
+TIERS: tuple[str, ...] = ("easy", "hard", "17-clue", "16x16", "pathological")
+
+# name -> (algorithm, SudokuEngine options)
+ENGINES: dict[str, tuple[str, dict]] = {name: (name, {}) for name in sorted(STRATEGIES)}
+ENGINES["backtrack-mrv"] = ("backtrack", {"cell_order": "mrv"})
+
+# Plain row-major backtracking needs tens of millions of nodes on these tiers
+# (the pathological tier is built to defeat it), so it is left out of them
+SKIP: set[tuple[str, str]] = {
+    ("backtrack", "17-clue"),
+    ("backtrack", "16x16"),
+    ("backtrack", "pathological"),
+}
+
+
+def sixteen_by_sixteen(count: int = 5, seed: int = 16) -> list[SudokuBoard]:
+    # There is no 16x16 text format, so these are built here: a pattern grid with
+    # shuffled digits, bands, stacks and lines, then half of the cells blanked out
+    rng: random.Random = random.Random(seed)
+    size, box = 16, 4
+    boards: list[SudokuBoard] = []
+    for _ in range(count):
+        digits: list[int] = rng.sample(range(1, size + 1), size)
+        rows: list[int] = [band * box + row for band in rng.sample(range(box), box) for row in rng.sample(range(box), box)]
+        columns: list[int] = [stack * box + column for stack in rng.sample(range(box), box) for column in rng.sample(range(box), box)]
+        board: SudokuBoard = SudokuBoard.fromRows([
+            [digits[(box * (y % box) + y // box + x) % size] for x in columns] for y in rows
+        ])
+        for cell in rng.sample(range(size * size), size * size // 2):
+            board.cells[cell] = 0
+        boards.append(board)
+    return boards
+
+
+def load_tier(tier: str) -> list[SudokuBoard]:
+    if tier == "16x16":
+        return sixteen_by_sixteen()
+    path: Path = CORPORA / f"{tier.replace('-', '')}.txt"
+    with open(path, encoding="utf-8") as source:
+        return [parse_puzzle(line) for line in read_puzzles(source)]
+
+
+def run_tier(engine_name: str, puzzles: list[SudokuBoard]) -> dict:
+    algorithm, options = ENGINES[engine_name]
+    nodes: int = 0
+    backtracks: int = 0
+    solved: int = 0
+    started: float = time.perf_counter()
+    for puzzle in puzzles:
+        result = SudokuEngine(puzzle.copy(), algorithm, seed=0, **options).solve()
+        solved += result.solved
+        nodes += result.stats.placements
+        backtracks += result.stats.backtracks
+    seconds: float = time.perf_counter() - started
+    return {
+        "puzzles": len(puzzles),
+        "solved": solved,
+        "seconds": seconds,
+        "puzzles_per_second": len(puzzles) / seconds if seconds > 0 else float("inf"),
+        "nodes": nodes,
+        "backtracks": backtracks,
+    }
+
+
+def peak_memory(engine_name: str, puzzles: list[SudokuBoard]) -> int:
+    # Separate pass, since tracemalloc slows allocation-heavy engines down a lot
+    tracemalloc.start()
+    try:
+        run_tier(engine_name, puzzles)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    previous: dict[tuple[str, str], dict] = {(entry["engine"], entry["tier"]): entry for entry in baseline}
+    regressions: list[str] = []
+    for entry in results:
+        old: dict | None = previous.get((entry["engine"], entry["tier"]))
+        if old is None:
+            continue
+        if entry["puzzles_per_second"] < old["puzzles_per_second"] * (1 - threshold):
+            regressions.append(
+                f"{entry['engine']} on {entry['tier']}: {entry['puzzles_per_second']:.1f} puzzles/s, "
+                f"baseline {old['puzzles_per_second']:.1f}"
+            )
+        if entry["nodes"] > old["nodes"] * (1 + threshold):
+            regressions.append(f"{entry['engine']} on {entry['tier']}: {entry['nodes']} nodes, baseline {old['nodes']}")
+    return regressions
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the solver engines over tiered puzzle corpora.")
+    parser.add_argument("--tiers", nargs="+", choices=TIERS, default=list(TIERS), help="corpora to run")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES), help="engines to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per tier, the fastest one counts")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="baseline results to compare with")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    results: list[dict] = []
+    print(f"{'engine':<15}{'tier':<14}{'solved':>8}{'puzzles/s':>11}{'nodes':>10}{'backtracks':>12}{'peak KiB':>10}")
+    for tier in arguments.tiers:
+        puzzles: list[SudokuBoard] = load_tier(tier)
+        for engine_name in arguments.engines:
+            if (engine_name, tier) in SKIP:
+                continue
+            runs: list[dict] = [run_tier(engine_name, puzzles) for _ in range(max(arguments.repeat, 1))]
+            entry: dict = {"engine": engine_name, "tier": tier, **min(runs, key=lambda run: run["seconds"])}
+            entry["peak_memory"] = None if arguments.no_memory else peak_memory(engine_name, puzzles)
+            results.append(entry)
+
+            memory: str = "-" if entry["peak_memory"] is None else f"{entry['peak_memory'] / 1024:.0f}"
+            print(
+                f"{engine_name:<15}{tier:<14}{entry['solved']:>4}/{entry['puzzles']:<3}{entry['puzzles_per_second']:>11.1f}"
+                f"{entry['nodes']:>10}{entry['backtracks']:>12}{memory:>10}"
+            )
+
+    report: dict = {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as target:
+            json.dump(report, target, indent=2)
+    if arguments.update_baseline:
+        with open(arguments.baseline, "w", encoding="utf-8") as target:
+            json.dump(report, target, indent=2)
+        return 0
+
+    if not arguments.baseline.exists():
+        return 0
+    with open(arguments.baseline, encoding="utf-8") as source:
+        regressions: list[str] = compare(results, json.load(source)["results"], arguments.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
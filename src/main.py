@@ -1,16 +1,3 @@
-try:
-    from src.sudoku_visualizer import SudokuGUIVisualizer, SudokuTerminalVisualizer
-    from src.sudoku_solver import SudokuSolver
-    from src.sudoku_controller import SudokuController
-except ModuleNotFoundError:
-    # Fallback if running main.py directly
-    from sudoku_visualizer import SudokuGUIVisualizer, SudokuTerminalVisualizer
-    from sudoku_solver import SudokuSolver
-    from sudoku_controller import SudokuController
-
-
-import time
-
 board: list[list[int]] = [
     [5, 3, 0, 0, 7, 0, 0, 0, 0],
     [6, 0, 0, 1, 9, 5, 0, 0, 0],
@@ -25,6 +12,13 @@ board: list[list[int]] = [
 
 
 def main() -> None:
+    # The GUI (and with it Qt) is only imported once the GUI is started
+    try:
+        from src.sudoku_controller import SudokuController
+    except ModuleNotFoundError:
+        # Fallback if running main.py directly
+        from sudoku_controller import SudokuController
+
     controller: SudokuController = SudokuController(board)
     controller.setupUI()
     controller.showUI()
@@ -0,0 +1,172 @@
+from typing import Callable, Iterable, Sequence
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # numpy is only needed for batch solving
+    np = None
+
+try:
+    from src.sudoku_core import SudokuBoard, parse_symbols
+    from src.sudoku_engine import SudokuEngine
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard, parse_symbols
+    from sudoku_engine import SudokuEngine
+
+
+# Vectorized batch solving. N boards are packed into one (N, n, n) candidate array:
+# the (N, n, n, n) boolean "digit d + 1 is possible at (y, x) on board i" tensor with
+# its digit axis packed into the bits of an unsigned int (bit d), so that a unit's
+# candidates reduce with one bitwise_or instead of n boolean reductions.
+# Naked and hidden singles run on the whole batch at once, and only the boards that
+# singles cannot finish go to the scalar SudokuEngine.
+
+# Boards propagated together; bounds the size of the candidate array
+BATCH_SIZE: int = 4096
+
+# Widest candidate mask numpy can hold; larger boards skip the vectorized singles
+MAX_BATCH_BOARD_SIZE: int = 64
+
+
+def _requireNumpy() -> None:
+    if np is None:
+        raise ModuleNotFoundError("Batch solving needs numpy: pip install numpy")
+
+
+def _maskType(board_size: int) -> type:
+    if board_size <= 16:
+        return np.uint16
+    if board_size <= 32:
+        return np.uint32
+    return np.uint64
+
+
+def boards_from_strings(lines: Sequence[str]) -> "np.ndarray":
+    # Puzzle lines of one size (see sudoku_io) -> (N, n, n) uint8 array
+    _requireNumpy()
+    if len(lines) == 0:
+        return np.zeros((0, 9, 9), dtype=np.uint8)
+    board_size: int = int(len(lines[0]) ** (1 / 2))
+    values: bytes = parse_symbols("".join(lines))
+    return np.frombuffer(values, dtype=np.uint8).reshape(len(lines), board_size, board_size).copy()
+
+
+def candidates_from_boards(boards: "np.ndarray") -> "np.ndarray":
+    board_size: int = boards.shape[1]
+    mask_type: type = _maskType(board_size)
+    full = mask_type((1 << board_size) - 1)
+    shifted = np.left_shift(mask_type(1), np.maximum(boards.astype(mask_type), 1) - 1)
+    return np.where(boards == 0, full, shifted).astype(mask_type)
+
+
+def unpack_candidates(candidates: "np.ndarray") -> "np.ndarray":
+    # Packed masks -> the (N, n, n, n) boolean tensor
+    board_size: int = candidates.shape[1]
+    bits = np.left_shift(candidates.dtype.type(1), np.arange(board_size, dtype=candidates.dtype))
+    return (candidates[..., None] & bits) != 0
+
+
+def _unitGroups(candidates: "np.ndarray", box_size: int) -> list[tuple[list["np.ndarray"], Callable]]:
+    # Rows, columns and boxes of every board. Each group is the list of its cell slices
+    # (one (N, ...) array per position in the unit) plus a function that broadcasts a
+    # per-unit result back onto the (board, box row, row in box, box column, column in box) view.
+    units = candidates.reshape(candidates.shape[0], box_size, box_size, box_size, box_size)
+    positions: list[tuple[int, int]] = [(a, b) for a in range(box_size) for b in range(box_size)]
+    return [
+        ([units[:, :, :, bx, ix] for bx, ix in positions], lambda result: result[:, :, :, None, None]),
+        ([units[:, by, iy, :, :] for by, iy in positions], lambda result: result[:, None, None, :, :]),
+        ([units[:, :, iy, :, ix] for iy, ix in positions], lambda result: result[:, :, None, :, None]),
+    ]
+
+
+def _onceTwice(cells: list["np.ndarray"]) -> tuple["np.ndarray", "np.ndarray"]:
+    # Digits seen in at least one / at least two of the given cell masks
+    once = np.zeros_like(cells[0])
+    twice = np.zeros_like(cells[0])
+    for mask in cells:
+        twice |= once & mask
+        once |= mask
+    return once, twice
+
+
+def propagate_singles(candidates: "np.ndarray") -> "np.ndarray":
+    # Naked and hidden singles on every board until nothing changes (in place).
+    # Returns a bool array of the boards that ran into a contradiction.
+    count, board_size = candidates.shape[0], candidates.shape[1]
+    box_size: int = int(board_size ** (1 / 2))
+    shape: tuple[int, ...] = (count, box_size, box_size, box_size, box_size)
+    full = candidates.dtype.type((1 << board_size) - 1)
+    contradiction = np.zeros(count, dtype=bool)
+
+    while True:
+        before = candidates.copy()
+
+        # Naked singles: a decided cell removes its digit from its peers, and two
+        # decided cells of one unit holding the same digit are a contradiction
+        single = (candidates & (candidates - 1)) == 0
+        placed = np.where(single, candidates, 0).astype(candidates.dtype)
+        used = np.zeros(shape, dtype=candidates.dtype)
+        for cells, expand in _unitGroups(placed, box_size):
+            once, twice = _onceTwice(cells)
+            used |= expand(once)
+            contradiction |= (twice != 0).reshape(count, -1).any(axis=1)
+        candidates[...] = np.where(single, candidates, candidates & ~used.reshape(candidates.shape))
+
+        # Hidden singles: a digit with only one possible cell in a unit. A digit with
+        # no possible cell at all is a contradiction.
+        hidden = np.zeros(shape, dtype=candidates.dtype)
+        for cells, expand in _unitGroups(candidates, box_size):
+            once, twice = _onceTwice(cells)
+            hidden |= candidates.reshape(shape) & expand(once & ~twice)
+            contradiction |= (once != full).reshape(count, -1).any(axis=1)
+        hidden = hidden.reshape(candidates.shape)
+        candidates[...] = np.where(hidden != 0, hidden, candidates)
+
+        contradiction |= (candidates == 0).any(axis=(1, 2))
+        if np.array_equal(before, candidates):
+            return contradiction
+
+
+def boards_from_candidates(candidates: "np.ndarray") -> "np.ndarray":
+    # Decided cells get their digit, open cells 0
+    decided = (candidates != 0) & ((candidates & (candidates - 1)) == 0)
+    digits = np.zeros(candidates.shape, dtype=np.uint8)
+    for digit in range(candidates.shape[1]):
+        digits[candidates == (1 << digit)] = digit + 1
+    return np.where(decided, digits, 0).astype(np.uint8)
+
+
+def solve_batch(boards: "np.ndarray | Iterable[SudokuBoard | list[list[int]]]", algorithm: str = "propagate") -> tuple["np.ndarray", "np.ndarray"]:
+    # Returns (solutions, solved): an (N, n, n) uint8 array (unsolved boards keep what
+    # propagation could fill in) and an (N,) bool array
+    _requireNumpy()
+    if not isinstance(boards, np.ndarray):
+        boards = [board.toNumpy() if isinstance(board, SudokuBoard) else board for board in boards]
+    boards = np.asarray(boards, dtype=np.uint8)
+    solutions = np.zeros_like(boards)
+    solved = np.zeros(boards.shape[0], dtype=bool)
+
+    if boards.shape[0] and boards.shape[1] > MAX_BATCH_BOARD_SIZE:
+        for index in range(boards.shape[0]):
+            solutions[index] = boards[index]
+            engine = SudokuEngine(SudokuBoard.fromNumpy(solutions[index]), algorithm)
+            solved[index] = engine.grid.isConsistent() and engine.solve().solved
+        return solutions, solved
+
+    for start in range(0, boards.shape[0], BATCH_SIZE):
+        chunk = boards[start:start + BATCH_SIZE]
+        candidates = candidates_from_boards(chunk)
+        contradiction = propagate_singles(candidates)
+        partial = boards_from_candidates(candidates)
+
+        finished = (partial != 0).all(axis=(1, 2)) & ~contradiction
+        solutions[start:start + BATCH_SIZE] = partial
+        solved[start:start + BATCH_SIZE] = finished
+
+        # Hand the remainder to the scalar search, which solves straight into
+        # `partial` through a zero-copy SudokuBoard view of the board's row
+        for index in np.flatnonzero(~finished & ~contradiction):
+            engine: SudokuEngine = SudokuEngine(SudokuBoard.fromNumpy(partial[index]), algorithm)
+            if engine.grid.isConsistent() and engine.solve().solved:
+                solutions[start + index] = partial[index]
+                solved[start + index] = True
+    return solutions, solved
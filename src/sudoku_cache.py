@@ -0,0 +1,228 @@
+import sqlite3
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import permutations
+from operator import itemgetter
+
+try:
+    from src.sudoku_core import SudokuBoard
+    from src.sudoku_engine import SolveResult, SudokuEngine
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard
+    from sudoku_engine import SolveResult, SudokuEngine
+
+
+# Solve-result cache keyed by a canonical form of the puzzle, so that a puzzle that
+# comes back rotated, reflected, with its bands or stacks swapped or with its digits
+# relabeled is answered from the cache and the solution is mapped back to the
+# caller's orientation and digits.
+#
+# The canonical form is taken over the transforms below, with digits renumbered in
+# order of first appearance: among the transforms giving the smallest pattern of
+# givens, the one giving the lexicographically smallest board. Comparing the
+# patterns first is cheap and leaves few candidates to relabel. The transforms are
+# transposition and reversing the line order inside every band and stack (together:
+# the 8 rotations/reflections), times every band and stack order. Row orders inside
+# a band are otherwise left alone, which keeps the number of transforms small.
+# Identical repeats skip the canonical form altogether through an exact-match entry.
+
+# Band and stack orders are only permuted up to this box size (3! * 3! orders for
+# 9x9; 16x16 would need 4! * 4!), larger boards only get the 8 rotations/reflections
+MAX_PERMUTED_BOX: int = 3
+
+# Rough per-entry overhead of the in-memory tier (dict slot, tuple, bytes headers)
+ENTRY_OVERHEAD: int = 200
+
+_UNSOLVABLE: bytes = b""
+
+# Cell value -> 1 for a given, 0 for a blank
+_OCCUPIED: bytes = b"\x00" + b"\x01" * 255
+
+
+@lru_cache(maxsize=None)
+def transforms(board_size: int) -> tuple[tuple[int, ...], ...]:
+    # Cell permutations: transformed[j] = board[permutation[j]]
+    box: int = int(board_size ** (1 / 2))
+    orders = permutations(range(box)) if box <= MAX_PERMUTED_BOX else [tuple(range(box))]
+    band_orders: list[tuple[int, ...]] = list(orders)
+    result: list[tuple[int, ...]] = []
+    for transpose in (False, True):
+        for reverse_rows in (False, True):
+            for reverse_columns in (False, True):
+                inner_rows = range(box - 1, -1, -1) if reverse_rows else range(box)
+                inner_columns = range(box - 1, -1, -1) if reverse_columns else range(box)
+                for bands in band_orders:
+                    rows: list[int] = [band * box + row for band in bands for row in inner_rows]
+                    for stacks in band_orders:
+                        columns: list[int] = [stack * box + column for stack in stacks for column in inner_columns]
+                        if transpose:
+                            result.append(tuple(x * board_size + y for y in rows for x in columns))
+                        else:
+                            result.append(tuple(y * board_size + x for y in rows for x in columns))
+    return tuple(dict.fromkeys(result))
+
+
+@lru_cache(maxsize=None)
+def _getters(board_size: int) -> tuple[itemgetter, ...]:
+    return tuple(itemgetter(*permutation) for permutation in transforms(board_size))
+
+
+def _relabeling(cells: bytes, board_size: int) -> bytes:
+    # Translate table that renumbers digits in order of first appearance; digits that
+    # do not appear get the remaining numbers in ascending order, so it is a bijection
+    table: bytearray = bytearray(range(256))
+    seen: list[int] = [value for value in dict.fromkeys(cells) if value]
+    missing: list[int] = [value for value in range(1, board_size + 1) if value not in seen]
+    for label, value in enumerate(seen + missing, 1):
+        table[value] = label
+    return bytes(table)
+
+
+def canonical_form(board: SudokuBoard) -> tuple[bytes, int, bytes]:
+    # (canonical cells, index of the transform in transforms(board_size), relabeling table)
+    board_size: int = board.board_size
+    getters: tuple[itemgetter, ...] = _getters(board_size)
+    cells: bytes = board.snapshot()
+
+    pattern: bytes = cells.translate(_OCCUPIED)
+    best_pattern: tuple[int, ...] | None = None
+    tied: list[int] = []
+    for index, getter in enumerate(getters):
+        candidate: tuple[int, ...] = getter(pattern)
+        if best_pattern is None or candidate < best_pattern:
+            best_pattern, tied = candidate, [index]
+        elif candidate == best_pattern:
+            tied.append(index)
+
+    best: bytes | None = None
+    best_transform: int = 0
+    best_table: bytes = b""
+    for index in tied:
+        moved: bytes = bytes(getters[index](cells))
+        table: bytes = _relabeling(moved, board_size)
+        relabeled: bytes = moved.translate(table)
+        if best is None or relabeled < best:
+            best, best_transform, best_table = relabeled, index, table
+    return best, best_transform, best_table
+
+
+def _restore(canonical: bytes, board_size: int, transform: int, table: bytes) -> bytes:
+    # Inverse of canonical_form for a solution in canonical orientation and labels
+    inverse: bytearray = bytearray(range(256))
+    for value in range(1, board_size + 1):
+        inverse[table[value]] = value
+    relabeled: bytes = canonical.translate(bytes(inverse))
+    cells: bytearray = bytearray(len(relabeled))
+    for position, cell in enumerate(transforms(board_size)[transform]):
+        cells[cell] = relabeled[position]
+    return bytes(cells)
+
+
+class SolveCache:
+    # LRU cache of solve results with a memory bound, optionally backed by a sqlite
+    # file that keeps canonical entries across runs. Boards with more than 255 digits
+    # (two bytes per cell) are not cached.
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, path: str | None = None) -> None:
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        # key -> solution cells ("" for unsolvable). Canonical keys start with "c",
+        # exact-match keys (the caller's own board and orientation) with "="
+        self.entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self.database: sqlite3.Connection | None = None
+        if path is not None:
+            self.database = sqlite3.connect(path, check_same_thread=False)
+            self.database.execute("CREATE TABLE IF NOT EXISTS solutions (puzzle BLOB PRIMARY KEY, solution BLOB NOT NULL)")
+            self.database.commit()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _remember(self, key: bytes, value: bytes) -> None:
+        previous: bytes | None = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(key) + len(previous) + ENTRY_OVERHEAD
+        self.entries[key] = value
+        self.size += len(key) + len(value) + ENTRY_OVERHEAD
+        while self.size > self.max_bytes and self.entries:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.size -= len(old_key) + len(old_value) + ENTRY_OVERHEAD
+
+    def _recall(self, key: bytes) -> bytes | None:
+        value: bytes | None = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def _result(self, board: SudokuBoard, solution: bytes) -> SolveResult:
+        self.hits += 1
+        if solution == _UNSOLVABLE:
+            return SolveResult(False, board.copy(), cached=True)
+        answer: SudokuBoard = SudokuBoard.empty(board.board_size)
+        answer.restore(solution)
+        return SolveResult(True, answer, cached=True)
+
+    def get(self, board: SudokuBoard) -> SolveResult | None:
+        # The cached result for `board` in its own orientation and digits, None on a miss
+        if board.cells.itemsize != 1:
+            return None
+        exact: bytes = b"=" + board.snapshot()
+        solution: bytes | None = self._recall(exact)
+        if solution is not None:
+            return self._result(board, solution)
+
+        canonical, transform, table = canonical_form(board)
+        key: bytes = b"c" + canonical
+        solution = self._recall(key)
+        if solution is None and self.database is not None:
+            row = self.database.execute("SELECT solution FROM solutions WHERE puzzle = ?", (key,)).fetchone()
+            if row is not None:
+                solution = bytes(row[0])
+                self._remember(key, solution)
+        if solution is None:
+            self.misses += 1
+            return None
+
+        if solution != _UNSOLVABLE:
+            solution = _restore(solution, board.board_size, transform, table)
+        self._remember(exact, solution)
+        return self._result(board, solution)
+
+    def put(self, puzzle: SudokuBoard, result: SolveResult) -> None:
+        # Store the result of solving `puzzle` (the board as it was before the solve).
+        # Cancelled and timed-out solves are not stored.
+        if puzzle.cells.itemsize != 1 or result.cancelled or result.timed_out:
+            return
+        solution: bytes = result.board.snapshot() if result.solved else _UNSOLVABLE
+        self._remember(b"=" + puzzle.snapshot(), solution)
+
+        canonical, transform, table = canonical_form(puzzle)
+        if result.solved:
+            # the solution in the canonical orientation and labels
+            moved: bytes = bytes(_getters(puzzle.board_size)[transform](solution))
+            solution = moved.translate(table)
+        key: bytes = b"c" + canonical
+        self._remember(key, solution)
+        if self.database is not None:
+            self.database.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)", (key, solution))
+            self.database.commit()
+
+    def solve(self, board: SudokuBoard, algorithm: str = "propagate") -> SolveResult:
+        # Cached solve that leaves `board` untouched
+        result: SolveResult | None = self.get(board)
+        if result is None:
+            result = SudokuEngine(board.copy(), algorithm).solve()
+            self.put(board, result)
+        return result
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+    def close(self) -> None:
+        if self.database is not None:
+            self.database.close()
+            self.database = None
@@ -0,0 +1,101 @@
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+
+
+# Checkpoints of a running solve, so that a search that takes hours survives a
+# process restart (see SudokuEngine.setCheckpoint and SudokuEngine.resume).
+# File layout: a fixed header, a small JSON document (algorithm, options, counters),
+# the board cells and the search frames. Frames are flattened into one list of
+# integers (every frame as its length followed by its items), all stored with the
+# same little-endian byte width, so a checkpoint of a 25x25 search is a few KiB.
+# Files are written to a temporary name and renamed over the old checkpoint, so a
+# crash while writing leaves the previous checkpoint intact.
+
+MAGIC: bytes = b"SDKCKPT\x00"
+VERSION: int = 1
+# magic, version, integer width in bytes, JSON length, board length, integer count
+HEADER: struct.Struct = struct.Struct("<8sBBIII")
+
+# Frame formats, by the search that wrote them:
+#   "backtrack"  (cell index, mask of the digits still to try) of the row-major search
+#   "heuristic"  (row, column, *digits still to try, last one first) of the
+#                heuristic and stepping searches (SudokuEngine._backtrack_stack)
+#   "dlx"        (matrix node,) of every chosen row, in order
+#   "propagate"  (cell index, mask of the digits still to try) of every guess
+KINDS: tuple[str, ...] = ("backtrack", "heuristic", "dlx", "propagate")
+
+
+@dataclass
+class Checkpoint:
+    kind: str
+    algorithm: str
+    board_size: int
+    #layout.variant of the engine's layout, checked on resume
+    variant: str
+    #board cells (SudokuBoard.snapshot()) when the checkpoint was taken
+    board: bytes
+    frames: list[list[int]]
+    #SolveStats fields at the time of the checkpoint (samples are not kept)
+    stats: dict = field(default_factory=dict)
+    #engine options and search-specific state (restart cutoff, random state, ...)
+    options: dict = field(default_factory=dict)
+
+
+def write_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    if checkpoint.kind not in KINDS:
+        raise ValueError(f"Unknown checkpoint kind {checkpoint.kind!r}, expected one of: {', '.join(KINDS)}")
+    meta: bytes = json.dumps({
+        "kind": checkpoint.kind,
+        "algorithm": checkpoint.algorithm,
+        "board_size": checkpoint.board_size,
+        "variant": checkpoint.variant,
+        "stats": checkpoint.stats,
+        "options": checkpoint.options,
+    }, separators=(",", ":")).encode("utf-8")
+    numbers: list[int] = []
+    for frame in checkpoint.frames:
+        numbers.append(len(frame))
+        numbers.extend(frame)
+    width: int = max(1, (max(numbers, default=0).bit_length() + 7) // 8)
+
+    temporary: str = f"{path}.tmp"
+    with open(temporary, "wb") as target:
+        target.write(HEADER.pack(MAGIC, VERSION, width, len(meta), len(checkpoint.board), len(numbers)))
+        target.write(meta)
+        target.write(checkpoint.board)
+        target.write(b"".join(number.to_bytes(width, "little") for number in numbers))
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary, path)
+
+
+def read_checkpoint(path: str) -> Checkpoint:
+    with open(path, "rb") as source:
+        data: bytes = source.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"Invalid checkpoint {path}: file is too short")
+    magic, version, width, meta_length, board_length, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Invalid checkpoint {path}: unknown header")
+    if len(data) != HEADER.size + meta_length + board_length + count * width:
+        raise ValueError(f"Invalid checkpoint {path}: truncated file")
+
+    offset: int = HEADER.size
+    meta: dict = json.loads(data[offset:offset + meta_length])
+    offset += meta_length
+    board: bytes = data[offset:offset + board_length]
+    offset += board_length
+    numbers: list[int] = [
+        int.from_bytes(data[start:start + width], "little") for start in range(offset, offset + count * width, width)
+    ]
+    frames: list[list[int]] = []
+    position: int = 0
+    while position < len(numbers):
+        length: int = numbers[position]
+        frames.append(numbers[position + 1:position + 1 + length])
+        position += 1 + length
+    return Checkpoint(
+        meta["kind"], meta["algorithm"], meta["board_size"], meta["variant"], board, frames, meta["stats"], meta["options"]
+    )
@@ -0,0 +1,150 @@
+import argparse
+import itertools
+import os
+import sys
+from collections import deque
+from typing import Iterator
+
+try:
+    from src.sudoku_core import SudokuBoard
+    from src.sudoku_engine import STRATEGIES, SolveResult, SolveStats, SudokuEngine
+    from src.sudoku_io import format_board, parse_puzzle, read_puzzles, write_lines
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard
+    from sudoku_engine import STRATEGIES, SolveResult, SolveStats, SudokuEngine
+    from sudoku_io import format_board, parse_puzzle, read_puzzles, write_lines
+
+
+# Batch solver: one puzzle per input line, one answer per output line, in input order.
+# Usage: python -m src.sudoku_cli puzzles.txt -o solutions.txt --workers 8
+
+
+def solve_line(line: str, algorithm: str, stats: SolveStats | None = None, max_seconds: float = 0.0, max_nodes: int = 0) -> str:
+    # With `stats`, the solve's counters and timings are added to it. A solve over
+    # `max_seconds` or `max_nodes` placements (0: no limit) answers "timeout".
+    try:
+        board: SudokuBoard = parse_puzzle(line)
+    except ValueError as error:
+        return str(error)
+
+    engine: SudokuEngine = SudokuEngine(board, algorithm)
+    if not engine.grid.isConsistent():
+        return "Invalid puzzle: conflicting givens"
+    engine.setBudget(max_seconds, max_nodes)
+    result: SolveResult = engine.solve()
+    if stats is not None:
+        stats.merge(result.stats)
+    if result.timed_out:
+        return "timeout"
+    if not result.solved:
+        return "unsolvable"
+    return format_board(board)
+
+
+def solve_chunk(chunk: list[str], algorithm: str, max_seconds: float = 0.0, max_nodes: int = 0) -> tuple[list[str], SolveStats]:
+    stats: SolveStats = SolveStats()
+    return [solve_line(line, algorithm, stats, max_seconds, max_nodes) for line in chunk], stats
+
+
+def chunked(puzzles: Iterator[str], chunk_size: int) -> Iterator[list[str]]:
+    while chunk := list(itertools.islice(puzzles, chunk_size)):
+        yield chunk
+
+
+def solve_stream(
+    puzzles: Iterator[str],
+    workers: int = 1,
+    chunk_size: int = 256,
+    algorithm: str = "propagate",
+    stats: SolveStats | None = None,
+    max_seconds: float = 0.0,
+    max_nodes: int = 0,
+) -> Iterator[str]:
+    # Yields one answer per puzzle, in input order. Input is pulled lazily and at most
+    # 2 * workers chunks are in flight, so memory stays bounded for any input size.
+    # With `stats`, the counters of every solve are added to it. max_seconds and
+    # max_nodes bound every single solve (see solve_line).
+    def collect(answers: list[str], chunk_stats: SolveStats) -> list[str]:
+        if stats is not None:
+            stats.merge(chunk_stats)
+        return answers
+
+    chunks: Iterator[list[str]] = chunked(puzzles, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from collect(*solve_chunk(chunk, algorithm, max_seconds, max_nodes))
+        return
+
+    # multiprocessing is only imported when it is used
+    from concurrent.futures import Future, ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(solve_chunk, chunk, algorithm, max_seconds, max_nodes))
+            if len(pending) >= 2 * workers:
+                yield from collect(*pending.popleft().result())
+        while pending:
+            yield from collect(*pending.popleft().result())
+
+
+def format_stats(stats: SolveStats) -> list[str]:
+    lines: list[str] = [
+        f"placements    {stats.placements}",
+        f"backtracks    {stats.backtracks}",
+        f"max depth     {stats.max_depth}",
+        f"eliminations  {stats.eliminations}",
+        f"wall time     {stats.elapsed:.3f} s",
+        f"cpu time      {stats.cpu:.3f} s",
+    ]
+    for phase, (wall, cpu) in stats.phases.items():
+        lines.append(f"  {phase:<12}{wall:.3f} s wall, {cpu:.3f} s cpu")
+    for technique, count in stats.techniques.items():
+        lines.append(f"  {technique:<12}{count}")
+    return lines
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solve line-per-puzzle sudoku files.")
+    parser.add_argument("input", help="puzzle file, one puzzle per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="solution file ('-' for stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("-c", "--chunk-size", type=int, default=256, help="puzzles sent to a worker at a time")
+    parser.add_argument("-a", "--algorithm", default="propagate", choices=sorted(STRATEGIES), help="search strategy")
+    parser.add_argument("--stats", action="store_true", help="print solver counters and timings to stderr")
+    parser.add_argument("--time-limit", type=float, default=0.0, help="seconds per puzzle before answering 'timeout' (0: none)")
+    parser.add_argument("--node-limit", type=int, default=0, help="placements per puzzle before answering 'timeout' (0: none)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    if arguments.chunk_size < 1:
+        print("--chunk-size must be at least 1", file=sys.stderr)
+        return 2
+
+    source = sys.stdin if arguments.input == "-" else open(arguments.input, encoding="utf-8")
+    target = sys.stdout if arguments.output == "-" else open(arguments.output, "w", encoding="utf-8")
+    stats: SolveStats | None = SolveStats() if arguments.stats else None
+    try:
+        answers: Iterator[str] = solve_stream(
+            read_puzzles(source),
+            workers=arguments.workers,
+            chunk_size=arguments.chunk_size,
+            algorithm=arguments.algorithm,
+            stats=stats,
+            max_seconds=arguments.time_limit,
+            max_nodes=arguments.node_limit,
+        )
+        write_lines(target, answers)
+        if stats is not None:
+            write_lines(sys.stderr, format_stats(stats))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
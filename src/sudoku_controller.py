@@ -1,11 +1,21 @@
 import sys
 
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QFileDialog
 from PySide6.QtCore import QTimer, QObject, Signal
 
+from sudoku_core import SudokuBoard, from_symbol, to_symbol
 from sudoku_solver import SudokuSolver
+from sudoku_trace import read_trace
 from sudoku_visualizer import SudokuGUIVisualizer
 
+# Slow mode without a delay runs the search in slices of one frame and repaints
+# once per slice; Fast mode solves on a worker thread
+FRAME_RATE: int = 30
+
+# Events per second of a trace replayed in Slow mode without a delay
+REPLAY_SPEED: int = 3000
+
+
 class SudokuController(QObject):
     session_started: Signal = Signal()
     session_ended: Signal = Signal()
@@ -16,18 +26,47 @@ class SudokuController(QObject):
         self.time_delay: float = time_delay
         
         self.timer: QTimer = QTimer()
-        self.timer.timeout.connect(self.solver._step)
+        self.timer.timeout.connect(self.tick)
 
     #this functions will be connected to the solve button
     def startSolving(self):
         self.view.board.setCurrentCell(-1, -1)
         self.session_started.emit()
-        self.solver.solve()
+        if self.solver.trace_player is not None:
+            self.startReplay()
+            return
+        if self.view.solve_mode_combo_box.currentText() == "Fast":
+            # constraint propagation keeps 16x16 and larger boards fast
+            self.solver.solve(mode="background", algorithm="propagate" if self.solver.state.board_size > 9 else None)
+            return
+        self.solver.solve(mode="step")
         self.timer.start(int(self.time_delay * 1000))
+
+    def startReplay(self):
+        # Solve on a loaded trace shows the recorded search: Fast jumps to its end,
+        # Slow plays it (again from the start once it has reached the end)
+        player = self.solver.trace_player
+        if self.view.solve_mode_combo_box.currentText() == "Fast":
+            self.solver.replaySteps(len(player.trace))
+            return
+        if player.atEnd():
+            self.solver.seekTrace(0)
+        self.timer.start(int(self.time_delay * 1000))
+
+    def tick(self):
+        # One step per timer interval, or as many as fit in a frame when there is no delay
+        if self.solver.trace_player is not None:
+            self.solver.replaySteps(1 if self.time_delay > 0 else max(REPLAY_SPEED // FRAME_RATE, 1))
+        elif self.time_delay > 0:
+            self.solver.runSteps(max_steps=1)
+        else:
+            self.solver.runSteps(max_seconds=1 / FRAME_RATE)
     
     def setupUI(self):
         self.app: QApplication = QApplication(sys.argv)
-        self.view: SudokuGUIVisualizer = SudokuGUIVisualizer()
+        self.view: SudokuGUIVisualizer = SudokuGUIVisualizer(board_size=self.solver.state.board_size)
+        # closing the window also ends the app; a background solve must be over by then
+        self.app.aboutToQuit.connect(self.solver.shutdown)
         self._setupConnections()
         pass
 
@@ -38,16 +77,27 @@ class SudokuController(QObject):
     #connect the GUI to the various backend functions
     def _setupConnections(self):
         self.solver.value_changed.connect(self.valueChanged)
+        self.solver.cells_changed.connect(self.view.setCells)
+        self.solver.board_resized.connect(self.view.setBoardSize)
 
         self.view.solve_button.clicked.connect(self.startSolving)
         self.view.load_example.clicked.connect(self.loadBoard)
+        self.view.create_puzzle.clicked.connect(self.createPuzzle)
         self.view.quit_button.clicked.connect(self.quitApplication)
         self.view.solve_mode_combo_box.currentTextChanged.connect(self.solveModeChanged)
+        self.view.board_size_combo_box.currentIndexChanged.connect(self.boardSizeChanged)
         self.view.time_delay.returnPressed.connect(self.timeDelayChanged)
         self.view.clear_button.clicked.connect(self.clearBoardButtonClicked)
+        self.view.load_trace.clicked.connect(self.loadTrace)
+        self.view.trace_slider.valueChanged.connect(self.solver.seekTrace)
+        self.solver.trace_moved.connect(self.view.setTracePosition)
         self.view.board.cellChanged.connect(self.cellEdited)
 
         self.solver.finished.connect(self.stopButtonClicked)
+        self.solver.finished.connect(self.updateTimeLabel)
+        self.solver.progress.connect(self.showProgress)
+        self.solver.generate_progress.connect(self.showGenerateProgress)
+        self.solver.generated.connect(self.puzzleCreated)
         self.view.stop_button.clicked.connect(self.stopButtonClicked)
 
         self.view.solve_button.clicked.connect(lambda: self.view.toggleEverySidebarWidgetExcept("disable", exceptions=[self.view.stop_button, self.view.quit_button]))
@@ -62,23 +112,98 @@ class SudokuController(QObject):
     def cellEdited(self, row: int, column: int):
         if self.view.board.item(row, column) is self.view.board.currentItem():
             possible: bool = True
-            value: str = self.view.board.item(row, column).text()
-
-            if value.isdigit():
-                possible = self.solver.setCellValue(row, column, int(value))
+            text: str = self.view.board.item(row, column).text()
+
+            try:
+                # lower-case letters only stand for 36 and up, so on smaller boards
+                # typing is case-insensitive
+                value: int = from_symbol(text.upper() if self.solver.state.board_size <= 35 else text)
+            except ValueError:
+                value = 0
+            if value != 0:
+                possible = self.solver.setCellValue(row, column, value)
             else:
                 self.solver.setCellValue(row, column, 0)
                 self.view.board.item(row, column).setText("")
 
+            if self.solver.trace_player is not None:
+                # the board no longer follows the trace
+                self.solver.trace_player = None
+                self.view.setTraceLength(0)
+
             if not possible:
                 self.view.board.item(row, column).setText("")
+            elif value != 0 and text != to_symbol(value):
+                # e.g. "a" typed for "A" or "10" typed for "A"
+                self.view.board.item(row, column).setText(to_symbol(value))
+
+    def createPuzzle(self):
+        # Generated on a worker thread (a 36x36 puzzle takes about a minute); Stop
+        # keeps the puzzle as far as it got
+        self.timer.stop()
+        self.view.setTraceLength(0)
+        self.session_started.emit()
+        self.view.toggleEverySidebarWidgetExcept("disable", exceptions=[self.view.stop_button, self.view.quit_button])
+        self.view.time_label.setText("Creating puzzle...")
+        self.solver.generatePuzzle()
+
+    def puzzleCreated(self):
+        self.view.toggleEverySidebarWidgetExcept("enable", exceptions=[self.view.stop_button])
+        self.view.time_label.setText("Timer: ")
+        self.session_ended.emit()
+
+    def showGenerateProgress(self, percent: int):
+        self.view.time_label.setText(f"Creating puzzle: {percent}%")
+
+    def loadTrace(self):
+        path, _ = QFileDialog.getOpenFileName(self.view, "Load Solve Trace")
+        if not path:
+            return
+        try:
+            trace = read_trace(path)
+        except (OSError, ValueError) as error:
+            print(error)
+            return
+        self.timer.stop()
+        index: int = self.view.board_size_combo_box.findData(trace.board_size)
+        if index != -1:
+            self.view.board_size_combo_box.blockSignals(True)
+            self.view.board_size_combo_box.setCurrentIndex(index)
+            self.view.board_size_combo_box.blockSignals(False)
+        self.solver.openTrace(trace)
+        self.view.setTraceLength(len(trace))
+        self.session_ended.emit()
+
+    def boardSizeChanged(self, index: int):
+        board_size: int = self.view.board_size_combo_box.itemData(index)
+        if board_size == self.solver.state.board_size:
+            return
+        self.timer.stop()
+        self.solver.setBoard(SudokuBoard.empty(board_size))
+        self.view.setTraceLength(0)
+        self.session_ended.emit()
 
     def clearBoardButtonClicked(self):
         self.solver.clearBoard()
+        self.view.setTraceLength(0)
         self.session_ended.emit()
         
     def stopButtonClicked(self):
         self.timer.stop()
+        self.solver.cancel()
+
+    def updateTimeLabel(self):
+        player = self.solver.trace_player
+        if player is not None:
+            self.view.time_label.setText(f"Trace: event {player.position} of {len(player.trace)}")
+            return
+        stats = self.solver.stats
+        self.view.time_label.setText(
+            f"Timer: {stats.elapsed:.3f} s\n{stats.placements} placements, {stats.backtracks} backtracks"
+        )
+
+    def showProgress(self, placements: int, rate: float, depth: int):
+        self.view.time_label.setText(f"Solving: {placements} placements\n{rate:,.0f} per second, depth {depth}")
 
     def timeDelayChanged(self):
         try:
@@ -94,22 +219,17 @@ class SudokuController(QObject):
             self.view.time_delay.setDisabled(False)
 
     def valueChanged(self, row: int, column: int, value: int):
-        if value == 0:
-            self.view.board.item(row, column).setText("")
-        else:
-            self.view.board.item(row, column).setText(str(value))
+        self.view.board.item(row, column).setText(to_symbol(value))
 
     def loadBoard(self):
         board_size: int = self.solver.state.board_size
         for y in range(board_size):
             for x in range(board_size):
-                value: int = self.solver.state.board[y][x]
-                if value == 0:
-                    self.view.board.item(y, x).setText("")
-                else:
-                    self.view.board.item(y, x).setText(str(value))
+                self.view.board.item(y, x).setText(to_symbol(self.solver.state.board[y, x]))
 
     def quitApplication(self):
+        self.timer.stop()
+        self.solver.shutdown()
         self.view.close()
     
 
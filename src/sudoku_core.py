@@ -0,0 +1,340 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterator
+
+try:
+    from src.sudoku_layout import Layout, get_layout
+except ModuleNotFoundError:
+    from sudoku_layout import Layout, get_layout
+
+
+# Text format: one symbol per cell, "." or "0" for blanks. Digits 1-9 are "1".."9",
+# larger ones continue with letters (10 = "A", ..., 35 = "Z", 36 = "a", ...), so
+# boards up to 49x49 keep one character per cell. Every other byte maps to 0xFF so
+# that a single scan finds invalid characters.
+SYMBOLS: str = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_FROM_TEXT: bytes = bytes(
+    0 if byte in b".0" else SYMBOLS.index(chr(byte)) + 1 if chr(byte) in SYMBOLS else 0xFF for byte in range(256)
+)
+_TO_TEXT: bytes = b"." + SYMBOLS.encode("ascii") + bytes(255 - len(SYMBOLS))
+
+
+def to_symbol(value: int) -> str:
+    # Text of one cell value ("" for a blank), e.g. for display
+    if value == 0:
+        return ""
+    return SYMBOLS[value - 1] if value <= len(SYMBOLS) else str(value)
+
+
+def from_symbol(text: str) -> int:
+    # Value of one cell's text, the inverse of to_symbol; "" and "." are blank
+    text = text.strip()
+    if text in ("", ".", "0"):
+        return 0
+    if len(text) == 1 and text in SYMBOLS:
+        return SYMBOLS.index(text) + 1
+    if text.isdigit():
+        return int(text)
+    raise ValueError(f"Invalid cell value {text!r}")
+
+
+def parse_symbols(text: str) -> bytes:
+    # One byte per cell of a puzzle line; raises ValueError on characters outside the format
+    try:
+        raw: bytes = text.strip().encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("Invalid puzzle: unexpected character") from None
+    values: bytes = raw.translate(_FROM_TEXT)
+    if 0xFF in values:
+        raise ValueError(f"Invalid puzzle: unexpected character {chr(raw[values.index(0xFF)])!r}")
+    return values
+
+
+def _typecode(board_size: int) -> str:
+    return "B" if board_size <= 0xFF else "H"
+
+
+class SudokuBoard:
+    # A board as one flat row-major array (a byte per cell, two past 255 digits)
+    # instead of a list of lists. Cell (y, x) is cells[y * board_size + x];
+    # board[y] is a zero-copy memoryview of the row, so board[y][x] reads and
+    # writes like the old nested lists did.
+    __slots__ = ("cells", "board_size", "box_size")
+
+    def __init__(self, cells, board_size: int | None = None) -> None:
+        # cells is any writable buffer with int items: array, bytearray, memoryview
+        if board_size is None:
+            board_size = int(len(cells) ** (1 / 2))
+        if board_size * board_size != len(cells):
+            raise ValueError("Invalid board: every row must have as many cells as there are rows")
+        self.cells = cells
+        self.board_size: int = board_size
+        self.box_size: int = int(board_size ** (1 / 2))
+
+    @classmethod
+    def empty(cls, board_size: int) -> "SudokuBoard":
+        return cls(array(_typecode(board_size), [0]) * (board_size * board_size), board_size)
+
+    @classmethod
+    def fromRows(cls, rows: list[list[int]]) -> "SudokuBoard":
+        board_size: int = len(rows)
+        if any(len(row) != board_size for row in rows):
+            raise ValueError("Invalid board: every row must have as many cells as there are rows")
+        return cls(array(_typecode(board_size), [value for row in rows for value in row]), board_size)
+
+    @classmethod
+    def fromString(cls, text: str) -> "SudokuBoard":
+        values: bytes = parse_symbols(text)
+        board_size: int = int(len(values) ** (1 / 2))
+        if board_size == 0 or board_size * board_size != len(values):
+            raise ValueError(f"Invalid puzzle: {len(values)} characters is not a square board")
+        if max(values) > board_size:
+            raise ValueError(f"Invalid puzzle: {SYMBOLS[max(values) - 1]!r} is out of range for a {board_size}x{board_size} board")
+        return cls(array("B", values), board_size)
+
+    @classmethod
+    def fromNumpy(cls, values) -> "SudokuBoard":
+        # Shares memory with `values` when it is already a C-contiguous uint8/uint16 array
+        import numpy as np
+        dtype = np.uint8 if values.shape[-1] <= 0xFF else np.uint16
+        values = np.ascontiguousarray(values, dtype=dtype)
+        return cls(memoryview(values).cast("B").cast(dtype().dtype.char), values.shape[-1])
+
+    def toNumpy(self):
+        # Zero-copy (board_size, board_size) view of the cells
+        import numpy as np
+        dtype = np.uint8 if memoryview(self.cells).itemsize == 1 else np.uint16
+        return np.frombuffer(self.cells, dtype=dtype).reshape(self.board_size, self.board_size)
+
+    def toString(self) -> str:
+        if self.board_size <= len(SYMBOLS):
+            return self.snapshot().translate(_TO_TEXT).decode("ascii")
+        # No one-character symbols left (64x64 and up): space separated numbers
+        return " ".join(str(value) if value else "." for value in self.cells)
+
+    def tolist(self) -> list[list[int]]:
+        size: int = self.board_size
+        return [list(self.cells[y * size:(y + 1) * size]) for y in range(size)]
+
+    def snapshot(self) -> bytes:
+        return bytes(memoryview(self.cells).cast("B"))
+
+    def restore(self, snapshot: bytes) -> None:
+        memoryview(self.cells).cast("B")[:] = snapshot
+
+    def copy(self) -> "SudokuBoard":
+        cells: array = array(_typecode(self.board_size))
+        cells.frombytes(self.snapshot())
+        return SudokuBoard(cells, self.board_size)
+
+    def clear(self) -> None:
+        view: memoryview = memoryview(self.cells).cast("B")
+        view[:] = bytes(len(view))
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.cells[key[0] * self.board_size + key[1]]
+        return memoryview(self.cells)[key * self.board_size:(key + 1) * self.board_size]
+
+    def __setitem__(self, key: tuple[int, int], value: int) -> None:
+        self.cells[key[0] * self.board_size + key[1]] = value
+
+    def __len__(self) -> int:
+        return self.board_size
+
+    def __iter__(self) -> Iterator[memoryview]:
+        for y in range(self.board_size):
+            yield self[y]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SudokuBoard):
+            return self.board_size == other.board_size and self.snapshot() == other.snapshot()
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SudokuBoard({self.toString()!r})"
+
+
+@dataclass
+class SudokuState:
+    board: SudokuBoard
+    original_board: SudokuBoard | None
+    board_size: int
+    box_size: int
+    horizontal_spacing: int
+    vertical_spacing: int
+    time_delay: float
+    clear_screen: int
+    no_of_newlines: int
+    #per-technique counters of the last solve (see sudoku_propagation.TECHNIQUES)
+    technique_counts: dict[str, int] = field(default_factory=dict)
+
+
+class CandidateGrid:
+    # Keeps one bitmask per unit of the board's layout (bit d set = digit d is used
+    # there, see sudoku_layout) plus a bitset of the empty cells (bit y * board_size + x),
+    # so that legality checks and the next-empty-cell lookup no longer have to scan the
+    # board. The layout defaults to the classic rows, columns and boxes.
+    # The *At methods take a flat cell index (y * board_size + x).
+
+    def __init__(self, board: SudokuBoard | list[list[int]], layout: Layout | None = None) -> None:
+        if not isinstance(board, SudokuBoard):
+            board = SudokuBoard.fromRows(board)
+        if layout is None:
+            layout = get_layout(board.board_size)
+        elif layout.board_size != board.board_size:
+            raise ValueError(f"Invalid board: the layout is for {layout.board_size}x{layout.board_size} boards")
+        self.board: SudokuBoard = board
+        self.cells = board.cells
+        self.board_size: int = board.board_size
+        self.box_size: int = max(board.box_size, 1)
+        self.full_mask: int = layout.full_mask
+
+        self.layout: Layout = layout
+        self.units_of: tuple[tuple[int, ...], ...] = layout.units_of
+        self.core_of: tuple[tuple[int, int, int], ...] = layout.core_of
+        self.extra_of: tuple[tuple[int, ...], ...] = layout.extra_of
+        self.has_extra: bool = layout.has_extra
+        self.cage_of: tuple[tuple[int, int, int] | None, ...] = layout.cage_of
+        #whether any cell has a cage sum to respect, so classic boards skip the check
+        self.has_cages: bool = bool(layout.cages)
+
+        self.unit_masks: list[int] = []
+        self.empty: int = 0
+        self.load()
+
+    def load(self) -> None:
+        # Rebuild every mask from the board (used on creation and after bulk edits)
+        self.unit_masks = [0] * len(self.layout.units)
+        self.empty = 0
+
+        unit_masks: list[int] = self.unit_masks
+        for index, value in enumerate(self.cells):
+            if value == 0:
+                self.empty |= 1 << index
+            else:
+                bit: int = 1 << value
+                for unit in self.units_of[index]:
+                    unit_masks[unit] |= bit
+
+    def usedAt(self, index: int) -> int:
+        unit_masks: list[int] = self.unit_masks
+        a, b, c = self.core_of[index]
+        used: int = unit_masks[a] | unit_masks[b] | unit_masks[c]
+        if self.has_extra:
+            for unit in self.extra_of[index]:
+                used |= unit_masks[unit]
+        return used
+
+    def candidatesAt(self, index: int) -> int:
+        free: int = self.full_mask & ~self.usedAt(index)
+        if self.has_cages:
+            cage = self.cage_of[index]
+            if cage is not None:
+                free &= self.layout.cageDigits(cage, self.unit_masks[cage[0]])
+        return free
+
+    def placeAt(self, index: int, value: int) -> None:
+        # The cell must be empty and the value legal
+        bit: int = 1 << value
+        self.cells[index] = value
+        unit_masks: list[int] = self.unit_masks
+        a, b, c = self.core_of[index]
+        unit_masks[a] |= bit
+        unit_masks[b] |= bit
+        unit_masks[c] |= bit
+        if self.has_extra:
+            for unit in self.extra_of[index]:
+                unit_masks[unit] |= bit
+        self.empty &= ~(1 << index)
+
+    def unplaceAt(self, index: int) -> None:
+        # Undo a place(); only valid for values that were placed legally
+        mask: int = ~(1 << self.cells[index])
+        self.cells[index] = 0
+        unit_masks: list[int] = self.unit_masks
+        a, b, c = self.core_of[index]
+        unit_masks[a] &= mask
+        unit_masks[b] &= mask
+        unit_masks[c] &= mask
+        if self.has_extra:
+            for unit in self.extra_of[index]:
+                unit_masks[unit] &= mask
+        self.empty |= 1 << index
+
+    def used(self, row: int, column: int) -> int:
+        return self.usedAt(row * self.board_size + column)
+
+    def candidates(self, row: int, column: int) -> int:
+        return self.candidatesAt(row * self.board_size + column)
+
+    def isLegal(self, row: int, column: int, value: int) -> bool:
+        return bool((self.candidates(row, column) >> value) & 1)
+
+    def nextCandidate(self, row: int, column: int, value: int) -> int:
+        # Smallest legal digit >= value, or 0 if there is none left
+        free: int = self.candidates(row, column) & ~((1 << value) - 1)
+        if free == 0:
+            return 0
+        return (free & -free).bit_length() - 1
+
+    def place(self, row: int, column: int, value: int) -> None:
+        self.placeAt(row * self.board_size + column, value)
+
+    def unplace(self, row: int, column: int) -> None:
+        self.unplaceAt(row * self.board_size + column)
+
+    def erase(self, row: int, column: int) -> None:
+        # Like unplace() but safe for user-entered boards that may contain duplicates:
+        # a digit's bit is only cleared when no other cell of the unit still holds it
+        index: int = row * self.board_size + column
+        value: int = self.cells[index]
+        if value == 0:
+            return
+        self.cells[index] = 0
+        self.empty |= 1 << index
+
+        mask: int = ~(1 << value)
+        for unit in self.units_of[index]:
+            if not self.unitHas(unit, value):
+                self.unit_masks[unit] &= mask
+
+    def unitHas(self, unit: int, value: int, skip: int = -1) -> bool:
+        # Scanning check of one unit, ignoring the cell with flat index `skip`
+        cells = self.cells
+        return any(cells[cell] == value for cell in self.layout.units[unit] if cell != skip)
+
+    def peerHas(self, row: int, column: int, value: int) -> bool:
+        # Scanning check that ignores the cell itself; only needed when the cell
+        # already holds `value`, where the masks cannot tell the cell from its peers
+        cells = self.cells
+        return any(cells[peer] == value for peer in self.layout.peers[row * self.board_size + column])
+
+    def isConsistent(self) -> bool:
+        # No given clashes with another cell of one of its units, and no cage is
+        # past the point where its total can still be reached
+        masks: list[int] = [0] * len(self.layout.units)
+        for index, value in enumerate(self.cells):
+            if value == 0:
+                continue
+            if value > self.board_size:
+                return False
+            bit: int = 1 << value
+            for unit in self.units_of[index]:
+                if masks[unit] & bit:
+                    return False
+                masks[unit] |= bit
+        return all(self.layout.cageDigits(cage, masks[cage[0]]) for cage in self.layout.cages)
+
+    def firstEmpty(self) -> tuple[int, int] | None:
+        if self.empty == 0:
+            return None
+        index: int = (self.empty & -self.empty).bit_length() - 1
+        return divmod(index, self.board_size)
+
+    def emptyCount(self) -> int:
+        return self.empty.bit_count()
@@ -0,0 +1,316 @@
+from typing import Callable
+
+try:
+    from src.sudoku_core import CandidateGrid
+except ModuleNotFoundError:
+    from sudoku_core import CandidateGrid
+
+
+class DancingLinks:
+    # Knuth's Algorithm X on a toroidal doubly linked list, stored as parallel int lists.
+    # Node 0 is the root, nodes 1..column_count are the column headers and every
+    # other node belongs to a row of the exact cover matrix. Columns after
+    # `primary_count` are secondary: covered at most once instead of exactly once
+    # (they stay out of the header list, so the search never has to fill them).
+
+    def __init__(self, column_count: int, primary_count: int | None = None) -> None:
+        if primary_count is None:
+            primary_count = column_count
+        self.column_count: int = column_count
+        headers: range = range(column_count + 1)
+        self.left: list[int] = [i - 1 for i in headers]
+        self.right: list[int] = [i + 1 for i in headers]
+        self.left[0] = primary_count
+        self.right[primary_count] = 0
+        for column in range(primary_count + 1, column_count + 1):
+            self.left[column] = self.right[column] = column
+        self.up: list[int] = list(headers)
+        self.down: list[int] = list(headers)
+        self.column: list[int] = list(headers)
+        self.size: list[int] = [0] * (column_count + 1)
+        self.row_of_node: list[int] = [-1] * (column_count + 1)
+
+        self.placements: int = 0
+        self.backtracks: int = 0
+        self.max_depth: int = 0
+        #nodes chosen at the deepest point of the search, and whether should_stop ended it
+        self.deepest: list[int] = []
+        self.stopped: bool = False
+
+        #called with (placements, backtracks, depth) every sample_every placements
+        self.sample_every: int = 0
+        self.on_sample: Callable[[int, int, int], None] | None = None
+        #polled with the placements every `check_every` placements; the search gives up
+        #(and sets `stopped`) when it returns True
+        self.should_stop: Callable[[int], bool] | None = None
+        self.check_every: int = 1024
+        #asked with the placements at the same points; when it returns True,
+        #on_checkpoint gets (chosen nodes, placements, backtracks, max_depth) to save
+        self.checkpoint_due: Callable[[int], bool] | None = None
+        self.on_checkpoint: Callable[[list[int], int, int, int], None] | None = None
+        #side constraints the matrix cannot express: accept(row id) is asked before a
+        #row is chosen and may refuse it, release(row id) is told when it is taken back
+        self.accept: Callable[[int], bool] | None = None
+        self.release: Callable[[int], None] | None = None
+
+    def addRow(self, row_id: int, columns: list[int]) -> None:
+        # columns are 1-based column header ids
+        first: int = len(self.left)
+        for offset, column in enumerate(columns):
+            node: int = first + offset
+            self.left.append(node - 1 if offset > 0 else first + len(columns) - 1)
+            self.right.append(node + 1 if offset < len(columns) - 1 else first)
+            self.up.append(self.up[column])
+            self.down.append(column)
+            self.down[self.up[column]] = node
+            self.up[column] = node
+            self.column.append(column)
+            self.row_of_node.append(row_id)
+            self.size[column] += 1
+
+    def search(self, resume: list[int] | None = None) -> list[int] | None:
+        # Iterative search (deep boards would blow the recursion limit).
+        # Returns the ids of the chosen rows, or None if there is no exact cover.
+        # `resume` is the chosen node list of a checkpoint (see on_checkpoint) of a
+        # search on the same matrix, which then continues from there.
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column_of, size = self.column, self.size
+        row_of_node, accept, release = self.row_of_node, self.accept, self.release
+
+        def cover(column: int) -> None:
+            right[left[column]] = right[column]
+            left[right[column]] = left[column]
+            i: int = down[column]
+            while i != column:
+                j: int = right[i]
+                while j != i:
+                    down[up[j]] = down[j]
+                    up[down[j]] = up[j]
+                    size[column_of[j]] -= 1
+                    j = right[j]
+                i = down[i]
+
+        def uncover(column: int) -> None:
+            i: int = up[column]
+            while i != column:
+                j: int = left[i]
+                while j != i:
+                    size[column_of[j]] += 1
+                    down[up[j]] = j
+                    up[down[j]] = j
+                    j = left[j]
+                i = up[i]
+            right[left[column]] = column
+            left[right[column]] = column
+
+        chosen: list[int] = []
+        for node in resume or ():
+            if accept is not None:
+                accept(row_of_node[node])
+            cover(column_of[node])
+            j: int = right[node]
+            while j != node:
+                cover(column_of[j])
+                j = right[j]
+            chosen.append(node)
+        self.max_depth = max(self.max_depth, len(chosen))
+
+        should_stop, checkpoint_due = self.should_stop, self.checkpoint_due
+        next_sample: int = self.sample_every or -1
+        next_check: int = self.check_every if should_stop is not None or checkpoint_due is not None else -1
+        while True:
+            # Checked before choosing, when every chosen row is fully covered, so a
+            # checkpoint is just the chosen list
+            if self.placements >= next_check > 0:
+                next_check += self.check_every
+                self.stopped = should_stop is not None and should_stop(self.placements)
+                if checkpoint_due is not None and (self.stopped or checkpoint_due(self.placements)):
+                    self.on_checkpoint(chosen, self.placements, self.backtracks, self.max_depth)
+                if self.stopped:
+                    return None
+            if right[0] == 0:
+                return [row_of_node[node] for node in chosen]
+
+            # Pick the column with the fewest rows left (Knuth's S heuristic)
+            best: int = right[0]
+            best_size: int = size[best]
+            column: int = right[best]
+            while column != 0 and best_size > 1:
+                if size[column] < best_size:
+                    best, best_size = column, size[column]
+                column = right[column]
+
+            cover(best)
+            node: int = down[best]
+            if accept is not None:
+                while node != best and not accept(row_of_node[node]):
+                    node = down[node]
+            if node == best:
+                uncover(best)
+                node = -1
+            else:
+                self.placements += 1
+
+            # Backtrack until some chosen row has an untried sibling in its column
+            while node == -1:
+                if not chosen:
+                    return None
+                self.backtracks += 1
+                node = chosen.pop()
+                if release is not None:
+                    release(row_of_node[node])
+                j: int = left[node]
+                while j != node:
+                    uncover(column_of[j])
+                    j = left[j]
+                column = column_of[node]
+                node = down[node]
+                if accept is not None:
+                    while node != column and not accept(row_of_node[node]):
+                        node = down[node]
+                if node == column:
+                    uncover(column)
+                    node = -1
+                else:
+                    self.placements += 1
+
+            chosen.append(node)
+            if len(chosen) > self.max_depth:
+                self.max_depth = len(chosen)
+                self.deepest = chosen[:]
+            if self.placements >= next_sample > 0:
+                self.on_sample(self.placements, self.backtracks, len(chosen))
+                next_sample += self.sample_every
+            j = right[node]
+            while j != node:
+                cover(column_of[j])
+                j = right[j]
+
+
+def _cageTotals(grid: CandidateGrid, links: DancingLinks, slot: list[int]) -> tuple[Callable[[int], bool], Callable[[int], None]]:
+    # accept/release callbacks that keep every Killer cage able to reach its total:
+    # a digit is refused when it breaks the total or leaves another open cell of the
+    # cage without a row whose digit could still complete it (forward checking)
+    stride: int = grid.board_size + 1
+    layout = grid.layout
+    left, right, down, row_of_node = links.left, links.right, links.down, links.row_of_node
+    used: list[int] = grid.unit_masks[:]
+
+    def accept(row_id: int) -> bool:
+        cell, digit = divmod(row_id, stride)
+        cage = layout.cage_of[cell]
+        if cage is None:
+            return True
+        unit: int = cage[0]
+        bit: int = 1 << digit
+        if not layout.cageDigits(cage, used[unit]) & bit:
+            return False
+        used[unit] |= bit
+        allowed: int = layout.cageDigits(cage, used[unit])
+        for other in layout.units[unit]:
+            column: int = slot[other]
+            # givens have no column, chosen cells have theirs covered
+            if other == cell or column == 0 or right[left[column]] != column:
+                continue
+            node: int = down[column]
+            while node != column and not allowed >> (row_of_node[node] % stride) & 1:
+                node = down[node]
+            if node == column:
+                used[unit] ^= bit
+                return False
+        return True
+
+    def release(row_id: int) -> None:
+        cell, digit = divmod(row_id, stride)
+        cage = layout.cage_of[cell]
+        if cage is not None:
+            used[cage[0]] &= ~(1 << digit)
+
+    return accept, release
+
+
+def solve_dlx(
+    grid: CandidateGrid,
+    sample_every: int = 0,
+    on_sample: Callable[[int, int, int], None] | None = None,
+    should_stop: Callable[[int], bool] | None = None,
+    check_every: int = 1024,
+    resume: list[int] | None = None,
+    checkpoint_due: Callable[[int], bool] | None = None,
+    on_checkpoint: Callable[[list[int], int, int, int], None] | None = None,
+) -> tuple[bool, int, int, int]:
+    # Solve the grid's board in place as an exact cover problem.
+    # Returns (solved, placements, backtracks, max_depth). A search stopped by
+    # should_stop leaves its deepest partial cover on the board. The matrix only depends on
+    # the board, so the nodes of a checkpoint taken through on_checkpoint can be
+    # passed back as `resume` for the same board.
+    board_size: int = grid.board_size
+    cells = grid.cells
+    layout = grid.layout
+    cell_count: int = board_size * board_size
+    stride: int = board_size + 1
+
+    # Only the constraints the givens have not already satisfied become columns:
+    # every empty cell, and every (unit, digit) pair still missing. slot[key] is the
+    # column of a key, where keys are the cell index for cells and
+    # cell_count + unit * stride + digit for unit digits. Units that are not houses
+    # (Killer cages) only need each digit at most once and become secondary columns.
+    slot: list[int] = [0] * (cell_count + len(layout.units) * stride)
+    column_count: int = 0
+    for index, value in enumerate(cells):
+        if value == 0:
+            column_count += 1
+            slot[index] = column_count
+
+    def numberMissing(unit: int) -> None:
+        nonlocal column_count
+        missing: int = grid.full_mask & ~grid.unit_masks[unit]
+        while missing:
+            bit: int = missing & -missing
+            missing ^= bit
+            column_count += 1
+            slot[cell_count + unit * stride + bit.bit_length() - 1] = column_count
+
+    houses: frozenset[int] = frozenset(layout.houses)
+    for unit in layout.houses:
+        numberMissing(unit)
+    primary_count: int = column_count
+    for unit in range(len(layout.units)):
+        if unit not in houses:
+            numberMissing(unit)
+
+    links: DancingLinks = DancingLinks(column_count, primary_count)
+    extra_of = layout.extra_of if layout.has_extra else None
+    for index, value in enumerate(cells):
+        if value != 0:
+            continue
+        a, b, c = (cell_count + unit * stride for unit in layout.core_of[index])
+        extra: list[int] = [cell_count + unit * stride for unit in extra_of[index]] if extra_of is not None else []
+        free: int = grid.candidatesAt(index)
+        while free:
+            bit: int = free & -free
+            free ^= bit
+            digit: int = bit.bit_length() - 1
+            columns: list[int] = [slot[index], slot[a + digit], slot[b + digit], slot[c + digit]]
+            for key in extra:
+                columns.append(slot[key + digit])
+            links.addRow(index * stride + digit, columns)
+
+    if on_sample is not None:
+        links.sample_every, links.on_sample = sample_every, on_sample
+    links.should_stop, links.check_every = should_stop, check_every
+    links.checkpoint_due, links.on_checkpoint = checkpoint_due, on_checkpoint
+    if grid.has_cages:
+        links.accept, links.release = _cageTotals(grid, links, slot)
+
+    chosen: list[int] | None = links.search(resume)
+    if chosen is None:
+        if links.stopped:
+            for node in links.deepest:
+                grid.placeAt(*divmod(links.row_of_node[node], stride))
+        return False, links.placements, links.backtracks, links.max_depth
+
+    for row_id in chosen:
+        cell, digit = divmod(row_id, stride)
+        grid.placeAt(cell, digit)
+    return True, links.placements, links.backtracks, links.max_depth
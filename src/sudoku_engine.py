@@ -0,0 +1,864 @@
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Iterator
+
+try:
+    from src.sudoku_checkpoint import Checkpoint, read_checkpoint, write_checkpoint
+    from src.sudoku_core import CandidateGrid, SudokuBoard
+    from src.sudoku_heuristics import get_cell_order, get_value_order
+    from src.sudoku_layout import Layout, get_layout
+    from src.sudoku_trace import TraceWriter
+except ModuleNotFoundError:
+    from sudoku_checkpoint import Checkpoint, read_checkpoint, write_checkpoint
+    from sudoku_core import CandidateGrid, SudokuBoard
+    from sudoku_heuristics import get_cell_order, get_value_order
+    from sudoku_layout import Layout, get_layout
+    from sudoku_trace import TraceWriter
+
+
+@dataclass
+class SolveSample:
+    placements: int
+    backtracks: int
+    depth: int
+    elapsed: float
+
+
+@dataclass
+class SolveStats:
+    placements: int = 0
+    backtracks: int = 0
+    elapsed: float = 0.0
+    restarts: int = 0
+    #how often each propagation technique made progress (only filled by "propagate")
+    techniques: dict[str, int] = field(default_factory=dict)
+    #deepest search stack reached
+    max_depth: int = 0
+    #candidates removed by propagation (only filled by "propagate")
+    eliminations: int = 0
+    cpu: float = 0.0
+    #phase name -> (wall seconds, cpu seconds)
+    phases: dict[str, tuple[float, float]] = field(default_factory=dict)
+    #progress taken every `sample_every` placements when sampling is on
+    samples: list[SolveSample] = field(default_factory=list)
+
+    def merge(self, other: "SolveStats") -> None:
+        # Add another solve's numbers to these (e.g. to total a batch)
+        self.placements += other.placements
+        self.backtracks += other.backtracks
+        self.elapsed += other.elapsed
+        self.restarts += other.restarts
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.eliminations += other.eliminations
+        self.cpu += other.cpu
+        for technique, count in other.techniques.items():
+            self.techniques[technique] = self.techniques.get(technique, 0) + count
+        for phase, (wall, cpu) in other.phases.items():
+            total_wall, total_cpu = self.phases.get(phase, (0.0, 0.0))
+            self.phases[phase] = (total_wall + wall, total_cpu + cpu)
+        self.samples.extend(other.samples)
+
+
+@dataclass
+class SolveResult:
+    solved: bool
+    board: SudokuBoard
+    stats: SolveStats = field(default_factory=SolveStats)
+    #the search was stopped by cancel() before it finished
+    cancelled: bool = False
+    #answered from a SolveCache (see sudoku_cache) without searching
+    cached: bool = False
+    #the search ran out of its budget (see SudokuEngine.setBudget) before it finished
+    timed_out: bool = False
+    #which budget ran out: "time", "nodes" or "memory"
+    exceeded: str | None = None
+    #deepest partial assignment the search reached, for cancelled and timed-out solves
+    partial: SudokuBoard | None = None
+
+
+# Search strategies by name. A strategy solves engine.board in place (keeping
+# engine.grid in sync), adds to engine.stats and returns whether it found a solution.
+STRATEGIES: dict[str, Callable[["SudokuEngine"], bool]] = {}
+
+
+def register_strategy(name: str) -> Callable:
+    def decorator(strategy: Callable[["SudokuEngine"], bool]) -> Callable[["SudokuEngine"], bool]:
+        STRATEGIES[name] = strategy
+        return strategy
+    return decorator
+
+
+def get_strategy(name: str) -> Callable[["SudokuEngine"], bool]:
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown algorithm {name!r}, expected one of: {', '.join(sorted(STRATEGIES))}")
+    return STRATEGIES[name]
+
+
+# First node cutoff when restarts are enabled; it doubles after every restart
+RESTART_CUTOFF: int = 256
+
+# Events that SudokuEngine.addHook accepts and the arguments their callbacks get:
+# "phase" (name, wall seconds, cpu seconds), "sample" (SolveSample), "finish" (SolveStats)
+HOOK_EVENTS: tuple[str, ...] = ("phase", "sample", "finish")
+
+# Placements between two checks of the cancel flag (and the budgets and checkpoints)
+# inside the search loops
+CANCEL_CHECK_INTERVAL: int = 1024
+
+# Algorithms whose search SudokuEngine.setTrace can record
+TRACEABLE: tuple[str, ...] = ("backtrack",)
+
+# Seconds between two reads of the process memory when a memory budget is set
+MEMORY_CHECK_SECONDS: float = 0.01
+
+
+try:
+    _PAGE_SIZE: int = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def resident_memory() -> int:
+    # Resident set size of this process in bytes. Where the current size cannot be
+    # read, the peak size (Unix) or 0 (memory budgets are then never exceeded).
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+    except ModuleNotFoundError:
+        return 0
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes everywhere but on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+
+class SudokuEngine:
+    # Pure-Python backtracking search (no Qt). The board passed in is solved in place
+    # (a nested list is first packed into a SudokuBoard, which is then engine.board).
+    # step() advances the search one placement at a time and reports every change
+    # through on_change (this is what the GUI animates); solve() runs the whole
+    # search in one call with the strategy picked by `algorithm`, without any callbacks.
+    # cell_order / value_order pick the backtracking heuristics (see sudoku_heuristics),
+    # and restarts=True breaks ties randomly and restarts with a growing node cutoff.
+    # sample_every > 0 records a SolveSample every that many placements (the search
+    # loops only compare a counter, so it is cheap enough to leave on in production).
+    # cancel() may be called from another thread; the loops check for it every
+    # CANCEL_CHECK_INTERVAL placements and the solve returns with cancelled=True.
+    # `layout` picks the variant's constraint graph (see sudoku_layout); every
+    # strategy works on any layout, the default is the classic rows, columns and boxes.
+    # setCheckpoint() makes solve() save its search state to a file now and then (and
+    # when it is cancelled), and SudokuEngine.resume() continues such a search.
+    # setBudget() bounds every solve by wall time, placements and memory; a solve
+    # over budget stops like a cancelled one and returns with timed_out=True.
+    # setTrace() records every change of the backtracking searches (solve() and
+    # step()) to a trace file that sudoku_trace replays without solving again.
+
+    def __init__(
+        self,
+        board: SudokuBoard | list[list[int]],
+        algorithm: str = "backtrack",
+        cell_order: str = "row-major",
+        value_order: str = "ascending",
+        restarts: bool = False,
+        seed: int | None = None,
+        sample_every: int = 0,
+        layout: Layout | None = None,
+    ) -> None:
+        get_strategy(algorithm)
+        self.grid: CandidateGrid = CandidateGrid(board, layout)
+        self.board: SudokuBoard = self.grid.board
+        self.algorithm: str = algorithm
+        self.stats: SolveStats = SolveStats()
+        self.solved: bool = False
+
+        self.cell_order: str = cell_order
+        self.value_order: str = value_order
+        self.chooseCell = get_cell_order(cell_order)
+        self.orderValues = get_value_order(value_order)
+        self.restarts: bool = restarts
+        self.random: random.Random = random.Random(seed)
+
+        #called with (row, column, value) for every change made by step()
+        self.on_change: Callable[[int, int, int], None] | None = None
+        #see setTrace()
+        self.trace: TraceWriter | None = None
+
+        self.sample_every: int = sample_every
+        self.cancelled: bool = False
+        self.hooks: dict[str, list[Callable]] = {event: [] for event in HOOK_EVENTS}
+        self._started: float = time.perf_counter()
+
+        #see setCheckpoint(); the search loops only look at these every
+        #CANCEL_CHECK_INTERVAL placements
+        self.checkpoint_path: str | None = None
+        self.checkpoint_every_nodes: int = 0
+        self.checkpoint_every_seconds: float = 0.0
+        self._checkpoint_nodes: int = -1
+        self._checkpoint_time: float = float("inf")
+        self._solve_started: float = 0.0
+        self._solve_cpu: float = 0.0
+        #checkpoint the next solve() continues from (see resume())
+        self._resume: Checkpoint | None = None
+
+        #see setBudget(); 0 means no limit
+        self.max_seconds: float = 0.0
+        self.max_nodes: int = 0
+        self.max_memory: int = 0
+        self._deadline: float = float("inf")
+        self._node_limit: int = -1
+        self._next_memory_check: float = 0.0
+        #the budget the running (or last) solve ran out of
+        self.exceeded: str | None = None
+        #board snapshot at the deepest point of the last search, for SolveResult.partial
+        #(strategies that do not set it leave their deepest assignment on the board)
+        self._deepest: bytes | None = None
+
+        # frames are (row, column, digits still to try in that cell, last one first)
+        self._backtrack_stack: list[tuple[int, int, list[int]]] = []
+
+    def result(self) -> SolveResult:
+        partial: SudokuBoard | None = None
+        if not self.solved and (self.cancelled or self.exceeded is not None):
+            partial = self.board.copy()
+            if self._deepest is not None:
+                partial.restore(self._deepest)
+        return SolveResult(
+            self.solved, self.board.copy(), self.stats, self.cancelled, timed_out=self.exceeded is not None, exceeded=self.exceeded, partial=partial,
+        )
+
+    def cancel(self) -> None:
+        # Thread-safe: only sets a flag that the running search polls
+        self.cancelled = True
+
+    def addHook(self, event: str, callback: Callable) -> None:
+        if event not in self.hooks:
+            raise ValueError(f"Unknown hook event {event!r}, expected one of: {', '.join(HOOK_EVENTS)}")
+        self.hooks[event].append(callback)
+
+    def _fire(self, event: str, *arguments) -> None:
+        for callback in self.hooks[event]:
+            callback(*arguments)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        # Adds the wall and CPU time spent inside the block to stats.phases[name]
+        wall: float = time.perf_counter()
+        cpu: float = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            total_wall, total_cpu = self.stats.phases.get(name, (0.0, 0.0))
+            self.stats.phases[name] = (total_wall + wall, total_cpu + cpu)
+            self._fire("phase", name, wall, cpu)
+
+    def sample(self, placements: int, backtracks: int, depth: int) -> None:
+        # Called by the search loops every sample_every placements
+        sample: SolveSample = SolveSample(placements, backtracks, depth, time.perf_counter() - self._started)
+        self.stats.samples.append(sample)
+        self._fire("sample", sample)
+
+    def setBudget(self, seconds: float = 0.0, nodes: int = 0, memory: int = 0) -> None:
+        # Limits for every following solve (or stepped search): wall seconds,
+        # placements ("propagate": guesses) and resident memory of the process in
+        # bytes, 0 for no limit. They are checked with the cancel flag, every
+        # CANCEL_CHECK_INTERVAL placements, so a node budget is rounded up to that.
+        self.max_seconds = seconds
+        self.max_nodes = nodes
+        self.max_memory = memory
+
+    def _armBudget(self) -> None:
+        self.exceeded = None
+        self._deadline = time.perf_counter() + self.max_seconds if self.max_seconds else float("inf")
+        self._node_limit = self.stats.placements + self.max_nodes if self.max_nodes else -1
+        self._next_memory_check = 0.0
+
+    def overBudget(self, placements: int) -> bool:
+        # Asked with the total placements so far; remembers which budget ran out
+        if self.exceeded is None:
+            now: float = time.perf_counter()
+            if 0 <= self._node_limit <= placements:
+                self.exceeded = "nodes"
+            elif now >= self._deadline:
+                self.exceeded = "time"
+            elif self.max_memory and now >= self._next_memory_check:
+                self._next_memory_check = now + MEMORY_CHECK_SECONDS
+                if resident_memory() >= self.max_memory:
+                    self.exceeded = "memory"
+        return self.exceeded is not None
+
+    def stopping(self, placements: int) -> bool:
+        # Asked by the search loops every CANCEL_CHECK_INTERVAL placements
+        return self.cancelled or self.overBudget(placements)
+
+    def setTrace(self, trace: TraceWriter | None) -> None:
+        # Record the changes of every following backtracking solve (or stepped search)
+        # to `trace`; None stops recording. The caller closes the writer. Traced solves
+        # run the general backtracking loop, as the inlined row-major one has no hooks,
+        # and the other algorithms cannot be traced (they only write the board at the end).
+        self.trace = trace
+
+    def setCheckpoint(self, path: str | None, every_nodes: int = 0, every_seconds: float = 60.0) -> None:
+        # While solve() runs, write the search state to `path` every `every_nodes`
+        # placements and/or every `every_seconds` seconds (0 turns either off, a None
+        # path turns checkpointing off), and once more if the solve is cancelled or
+        # runs out of its budget.
+        # Both are checked every CANCEL_CHECK_INTERVAL placements ("propagate":
+        # every guess), so node counts are rounded up to that.
+        self.checkpoint_path = path
+        self.checkpoint_every_nodes = every_nodes
+        self.checkpoint_every_seconds = every_seconds
+
+    def _armCheckpoint(self, placements: int) -> None:
+        self._checkpoint_nodes = placements + self.checkpoint_every_nodes if self.checkpoint_every_nodes else -1
+        self._checkpoint_time = time.perf_counter() + self.checkpoint_every_seconds if self.checkpoint_every_seconds else float("inf")
+
+    def checkpointDue(self, placements: int) -> bool:
+        # Asked by the search loops with the total placements so far (a stopping
+        # search always takes a last checkpoint)
+        return 0 <= self._checkpoint_nodes <= placements or time.perf_counter() >= self._checkpoint_time
+
+    def _saveCheckpoint(self, kind: str, frames: list[list[int]], running: SolveStats, **state) -> None:
+        # Called by the search loops once checkpointDue() said so; `running` holds the
+        # counters of the search so far (not yet added to self.stats), `state` is
+        # search-specific (restart cutoff, ...)
+        stats: SolveStats = replace(self.stats, techniques=dict(self.stats.techniques), phases=dict(self.stats.phases), samples=[])
+        stats.merge(running)
+        stats.elapsed += time.perf_counter() - self._solve_started
+        stats.cpu += time.process_time() - self._solve_cpu
+        self.writeCheckpoint(self.checkpoint_path, kind, frames, stats, **state)
+        self._armCheckpoint(stats.placements)
+
+    def writeCheckpoint(self, path: str, kind: str, frames: list[list[int]], stats: SolveStats, **state) -> None:
+        counters: dict = asdict(stats)
+        del counters["samples"]
+        options: dict = {
+            "cell_order": self.cell_order,
+            "value_order": self.value_order,
+            "restarts": self.restarts,
+            "sample_every": self.sample_every,
+            "every_nodes": self.checkpoint_every_nodes,
+            "every_seconds": self.checkpoint_every_seconds,
+            **state,
+        }
+        if self.restarts or self.value_order == "random":
+            options["random"] = self.random.getstate()
+        write_checkpoint(path, Checkpoint(
+            kind, self.algorithm, self.grid.board_size, self.grid.layout.variant, self.board.snapshot(), frames, counters, options,
+        ))
+
+    def saveCheckpoint(self, path: str) -> None:
+        # Checkpoint of the stepping search, between two step() calls
+        frames: list[list[int]] = [[row, column, *values] for row, column, values in self._backtrack_stack]
+        self.writeCheckpoint(path, "heuristic", frames, self.stats)
+
+    @classmethod
+    def resume(cls, path: str, layout: Layout | None = None) -> "SudokuEngine":
+        # Engine that continues the search saved in `path`: solve() (or step(), for a
+        # checkpoint of the stepping search) picks up exactly where it stopped, with the
+        # counters of the earlier run, and keeps checkpointing to the same file.
+        # Jigsaw and Killer layouts cannot be rebuilt from their name, pass them again.
+        checkpoint: Checkpoint = read_checkpoint(path)
+        if layout is None:
+            layout = get_layout(checkpoint.board_size, checkpoint.variant)
+        elif (layout.board_size, layout.variant) != (checkpoint.board_size, checkpoint.variant):
+            raise ValueError(f"Checkpoint {path} is for a {checkpoint.board_size}x{checkpoint.board_size} {checkpoint.variant} board")
+        board: SudokuBoard = SudokuBoard.empty(checkpoint.board_size)
+        board.restore(checkpoint.board)
+
+        options: dict = checkpoint.options
+        engine: SudokuEngine = cls(
+            board,
+            checkpoint.algorithm,
+            options["cell_order"],
+            options["value_order"],
+            options["restarts"],
+            sample_every=options["sample_every"],
+            layout=layout,
+        )
+        if "random" in options:
+            version, internal, gauss = options["random"]
+            engine.random.setstate((version, tuple(internal), gauss))
+        counters: dict = dict(checkpoint.stats)
+        counters["phases"] = {phase: tuple(times) for phase, times in counters["phases"].items()}
+        engine.stats = SolveStats(**counters)
+        engine.setCheckpoint(path, options["every_nodes"], options["every_seconds"])
+        if checkpoint.kind == "heuristic":
+            engine._backtrack_stack = [(row, column, values) for row, column, *values in checkpoint.frames]
+        engine._resume = checkpoint
+        return engine
+
+    def nextCell(self) -> tuple[int, int] | None:
+        return self.chooseCell(self.grid, self.random if self.restarts else None)
+
+    def _frame(self, row: int, column: int) -> tuple[int, int, list[int]]:
+        values: list[int] = self.orderValues(self.grid, row, column, self.random)
+        values.reverse()
+        return (row, column, values)
+
+    def start(self) -> bool:
+        # Seed the stepping search; returns False when there is nothing to solve
+        self._backtrack_stack.clear()
+        self.stats = SolveStats()
+        self._started = time.perf_counter()
+        self._deepest = None
+        self._armBudget()
+        start = self.nextCell()
+        self.solved = start is None
+        if start is None:
+            return False
+
+        self._backtrack_stack.append(self._frame(start[0], start[1]))
+        return True
+
+    def step(self) -> bool:
+        # One backtracking step; returns False once the search is over
+        if len(self._backtrack_stack) == 0:
+            self._finishSteps()
+            return False
+
+        row, column, values = self._backtrack_stack.pop()
+
+        # Coming back to a cell after its subtree failed: take the old value off first
+        if self.board[row, column] != 0:
+            self.grid.unplace(row, column)
+
+        if values:
+            number: int = values.pop()
+            self.grid.place(row, column, number)
+            self.stats.placements += 1
+            self._notify(row, column, number)
+            if self.sample_every and self.stats.placements % self.sample_every == 0:
+                self.sample(self.stats.placements, self.stats.backtracks, len(self._backtrack_stack) + 1)
+
+            self._backtrack_stack.append((row, column, values))
+            if self.stats.placements % CANCEL_CHECK_INTERVAL == 0 and self.overBudget(self.stats.placements):
+                self._backtrack_stack.clear()
+                self._finishSteps()
+                return False
+
+            new_cell = self.nextCell()
+            if new_cell is None:
+                self.solved = True
+                self._finishSteps()
+                return False
+            self._backtrack_stack.append(self._frame(new_cell[0], new_cell[1]))
+            if len(self._backtrack_stack) > self.stats.max_depth:
+                self.stats.max_depth = len(self._backtrack_stack)
+                self._deepest = self.board.snapshot()
+        else:
+            self.stats.backtracks += 1
+            self._notify(row, column, 0)
+
+        return True
+
+    def _finishSteps(self) -> None:
+        # The stepped search is over; time it like solve() would
+        if self.stats.elapsed == 0.0:
+            self.stats.elapsed = time.perf_counter() - self._started
+            self._fire("finish", self.stats)
+
+    def countSolutions(self, limit: int = 2, max_nodes: int = 0) -> int:
+        # Number of solutions of the current board, counting stops at `limit`
+        # (limit=2 is a uniqueness check). Runs on the engine's grid and undoes its
+        # own placements, so the board is left exactly as it was. With `max_nodes`,
+        # a count that needs more placements than that gives up and returns `limit`.
+        grid: CandidateGrid = self.grid
+        if not grid.isConsistent():
+            return 0
+
+        count: int = 0
+        index: int = self._fewestCandidates()
+        if index == -1:
+            return 1
+
+        # frames are (flat cell index, mask of the digits still to try)
+        stack: list[tuple[int, int]] = [(index, grid.candidatesAt(index))]
+        budget: int = self.stats.placements + max_nodes if max_nodes else -1
+        while stack:
+            index, free = stack.pop()
+            if grid.cells[index] != 0:
+                grid.unplaceAt(index)
+            if not free:
+                self.stats.backtracks += 1
+                continue
+
+            bit: int = free & -free
+            grid.placeAt(index, bit.bit_length() - 1)
+            self.stats.placements += 1
+            stack.append((index, free ^ bit))
+            if self.stats.placements == budget:
+                count = limit
+                break
+
+            next_index: int = self._fewestCandidates()
+            if next_index != -1:
+                stack.append((next_index, grid.candidatesAt(next_index)))
+                continue
+            count += 1
+            if count >= limit:
+                break
+
+        for index, _ in stack:
+            if grid.cells[index] != 0:
+                grid.unplaceAt(index)
+        return count
+
+    def _fewestCandidates(self) -> int:
+        # Empty cell with the fewest candidates (flat index), -1 when the board is full
+        grid: CandidateGrid = self.grid
+        unit_masks: list[int] = grid.unit_masks
+        core_of: tuple[tuple[int, int, int], ...] = grid.core_of
+        extra_of = grid.extra_of if grid.has_extra else None
+        cage_of = grid.cage_of if grid.has_cages else None
+        full_mask: int = grid.full_mask
+        empty: int = grid.empty
+        best: int = -1
+        best_count: int = grid.board_size + 1
+        while empty:
+            bit: int = empty & -empty
+            empty ^= bit
+            index: int = bit.bit_length() - 1
+            a, b, c = core_of[index]
+            used: int = unit_masks[a] | unit_masks[b] | unit_masks[c]
+            if extra_of is not None:
+                for unit in extra_of[index]:
+                    used |= unit_masks[unit]
+            free: int = full_mask & ~used
+            if cage_of is not None and cage_of[index] is not None:
+                free &= grid.layout.cageDigits(cage_of[index], unit_masks[cage_of[index][0]])
+            count: int = free.bit_count()
+            if count < best_count:
+                best, best_count = index, count
+                if count <= 1:
+                    break
+        return best
+
+    def _notify(self, row: int, column: int, value: int) -> None:
+        if self.on_change is not None:
+            self.on_change(row, column, value)
+        if self.trace is not None:
+            self.trace.record(row * self.grid.board_size + column, value)
+
+    def solve(self, algorithm: str | None = None) -> SolveResult:
+        name: str = algorithm or self.algorithm
+        strategy: Callable[[SudokuEngine], bool] = get_strategy(name)
+        if self._resume is not None and name != self._resume.algorithm:
+            raise ValueError(f"The checkpoint was taken by {self._resume.algorithm!r}, it cannot be resumed with {name!r}")
+        if self.trace is not None and name not in TRACEABLE:
+            raise ValueError(f"{name!r} solves cannot be traced, expected one of: {', '.join(TRACEABLE)}")
+        if self.trace is not None and self._resume is not None and self._resume.kind != "heuristic":
+            raise ValueError("A checkpoint of the row-major search cannot be resumed with a trace")
+        started: float = time.perf_counter()
+        cpu: float = time.process_time()
+        self._solve_started, self._solve_cpu = started, cpu
+        if self._resume is None:
+            # start() resets the stats; the phase lands in the new ones when the block exits
+            with self.phase("start"):
+                searching: bool = self.start()
+        else:
+            # the checkpoint's stats and search state are already in place
+            searching = True
+            self._deepest = None
+            self._armBudget()
+        if searching:
+            self._armCheckpoint(self.stats.placements)
+            with self.phase("search"):
+                self.solved = strategy(self)
+        self.stats.elapsed += time.perf_counter() - started
+        self.stats.cpu += time.process_time() - cpu
+        self._fire("finish", self.stats)
+        result: SolveResult = self.result()
+        # A cancel only stops the solve that was running (or about to run)
+        self.cancelled = False
+        self._resume = None
+        return result
+
+
+@register_strategy("backtrack")
+def backtrack(engine: SudokuEngine) -> bool:
+    engine._backtrack_stack.clear()
+    if engine._resume is not None:
+        # continue in the loop that took the checkpoint
+        heuristic: bool = engine._resume.kind == "heuristic"
+    else:
+        heuristic = engine.cell_order != "row-major" or engine.value_order != "ascending" or engine.restarts or engine.trace is not None
+    if heuristic:
+        return heuristic_backtrack(engine)
+
+    # Row-major, ascending search with everything pulled into locals and the grid
+    # updates inlined, so the loop does no attribute lookups or callbacks.
+    # Frames are (flat cell index, mask of the digits still to try).
+    grid: CandidateGrid = engine.grid
+    cells = grid.cells
+    full_mask: int = grid.full_mask
+    unit_masks: list[int] = grid.unit_masks
+    core_of: tuple[tuple[int, int, int], ...] = grid.core_of
+    # Units past the core (diagonals, windows, cages) and Killer cage totals, None
+    # when the layout has none so that classic boards pay nothing for them
+    extra_of = grid.extra_of if grid.has_extra else None
+    cage_of = grid.cage_of if grid.has_cages else None
+    cage_digits = grid.layout.cageDigits
+    empty: int = grid.empty
+    placements: int = 0
+    backtracks: int = 0
+    max_depth: int = 1
+    sample_every: int = engine.sample_every
+    next_sample: int = sample_every or -1
+    next_check: int = CANCEL_CHECK_INTERVAL
+    checkpointing: bool = engine.checkpoint_path is not None
+    snapshot: Callable[[], bytes] = engine.board.snapshot
+    deepest: bytes | None = None
+    solved: bool = False
+
+    stack: list[tuple[int, int]]
+    if engine._resume is not None:
+        # the board already holds the values of every frame but the last one
+        stack = [(index, free) for index, free in engine._resume.frames]
+        max_depth = len(stack)
+    else:
+        index: int = (empty & -empty).bit_length() - 1
+        stack = [(index, grid.candidatesAt(index))]
+    while stack:
+        index, free = stack.pop()
+        a, b, c = core_of[index]
+
+        value: int = cells[index]
+        if value != 0:
+            mask: int = ~(1 << value)
+            unit_masks[a] &= mask
+            unit_masks[b] &= mask
+            unit_masks[c] &= mask
+            if extra_of is not None:
+                for unit in extra_of[index]:
+                    unit_masks[unit] &= mask
+            cells[index] = 0
+            empty |= 1 << index
+
+        if not free:
+            backtracks += 1
+            continue
+
+        bit: int = free & -free
+        cells[index] = bit.bit_length() - 1
+        unit_masks[a] |= bit
+        unit_masks[b] |= bit
+        unit_masks[c] |= bit
+        if extra_of is not None:
+            for unit in extra_of[index]:
+                unit_masks[unit] |= bit
+        empty &= ~(1 << index)
+        placements += 1
+        stack.append((index, free & ~bit))
+        if placements == next_sample:
+            engine.sample(engine.stats.placements + placements, engine.stats.backtracks + backtracks, len(stack))
+            next_sample += sample_every
+
+        if empty == 0:
+            solved = True
+            break
+        index = (empty & -empty).bit_length() - 1
+        a, b, c = core_of[index]
+        used: int = unit_masks[a] | unit_masks[b] | unit_masks[c]
+        if extra_of is not None:
+            for unit in extra_of[index]:
+                used |= unit_masks[unit]
+        free = full_mask & ~used
+        if cage_of is not None and cage_of[index] is not None:
+            free &= cage_digits(cage_of[index], unit_masks[cage_of[index][0]])
+        stack.append((index, free))
+        if len(stack) > max_depth:
+            max_depth = len(stack)
+            deepest = snapshot()
+        # Checked once the next cell is on the stack, so that a checkpoint resumes
+        # with exactly the cell this loop would pop next
+        if placements == next_check:
+            next_check += CANCEL_CHECK_INTERVAL
+            stopping: bool = engine.stopping(engine.stats.placements + placements)
+            if checkpointing and (stopping or engine.checkpointDue(engine.stats.placements + placements)):
+                running: SolveStats = SolveStats(placements=placements, backtracks=backtracks, max_depth=max_depth)
+                engine._saveCheckpoint("backtrack", [list(frame) for frame in stack], running)
+            if stopping:
+                break
+
+    grid.empty = empty
+    if deepest is not None:
+        engine._deepest = deepest
+    engine.stats.placements += placements
+    engine.stats.backtracks += backtracks
+    engine.stats.max_depth = max(engine.stats.max_depth, max_depth)
+    return solved
+
+
+def heuristic_backtrack(engine: SudokuEngine) -> bool:
+    # Backtracking with the engine's cell and value orders. With restarts, each attempt
+    # gives up after `cutoff` placements, undoes everything and starts over with a
+    # doubled cutoff; an attempt that exhausts its tree proves there is no solution.
+    grid: CandidateGrid = engine.grid
+    cutoff: int = RESTART_CUTOFF if engine.restarts else -1
+    checkpointing: bool = engine.checkpoint_path is not None
+    # records a cell emptied on the way back and every placement
+    trace: TraceWriter | None = engine.trace
+    board_size: int = grid.board_size
+    resume: Checkpoint | None = engine._resume
+    if resume is not None:
+        cutoff = resume.options.get("cutoff", cutoff)
+
+    while True:
+        stack: list[tuple[int, int, list[int]]]
+        placements: int
+        if resume is not None:
+            # Placements of the interrupted attempt are in the restored stats and
+            # counted again below, like the attempt had never stopped
+            stack = [(row, column, values) for row, column, *values in resume.frames]
+            placements = resume.options.get("attempt", 0)
+            engine.stats.placements -= placements
+            resume = None
+        else:
+            cell = engine.nextCell()
+            if cell is None:
+                return True
+            stack = [engine._frame(cell[0], cell[1])]
+            placements = 0
+
+        while stack:
+            row, column, values = stack[-1]
+            if engine.board[row, column] != 0:
+                grid.unplace(row, column)
+                if trace is not None and not values:
+                    trace.record(row * board_size + column, 0)
+            if not values:
+                stack.pop()
+                engine.stats.backtracks += 1
+                continue
+
+            value: int = values.pop()
+            grid.place(row, column, value)
+            if trace is not None:
+                trace.record(row * board_size + column, value)
+            placements += 1
+            if engine.sample_every and placements % engine.sample_every == 0:
+                engine.sample(engine.stats.placements + placements, engine.stats.backtracks, len(stack))
+            cell = engine.nextCell()
+            if cell is None:
+                engine.stats.placements += placements
+                return True
+            stack.append(engine._frame(cell[0], cell[1]))
+            if len(stack) > engine.stats.max_depth:
+                engine.stats.max_depth = len(stack)
+                engine._deepest = engine.board.snapshot()
+
+            if placements == cutoff:
+                break
+            if placements % CANCEL_CHECK_INTERVAL == 0:
+                stopping: bool = engine.stopping(engine.stats.placements + placements)
+                if checkpointing and (stopping or engine.checkpointDue(engine.stats.placements + placements)):
+                    frames: list[list[int]] = [[row, column, *values] for row, column, values in stack]
+                    engine._saveCheckpoint("heuristic", frames, SolveStats(placements=placements), cutoff=cutoff, attempt=placements)
+                if stopping:
+                    engine.stats.placements += placements
+                    return False
+        else:
+            engine.stats.placements += placements
+            return False
+
+        for row, column, _ in stack:
+            if engine.board[row, column] != 0:
+                grid.unplace(row, column)
+                if trace is not None:
+                    trace.record(row * board_size + column, 0)
+        engine.stats.placements += placements
+        engine.stats.restarts += 1
+        cutoff *= 2
+
+
+@register_strategy("dlx")
+def dancing_links(engine: SudokuEngine) -> bool:
+    # imported on first use, like the propagator below, to keep this module light
+    try:
+        from src.sudoku_dlx import solve_dlx
+    except ModuleNotFoundError:
+        from sudoku_dlx import solve_dlx
+    engine._backtrack_stack.clear()
+    base: int = engine.stats.placements
+    checkpoint_due: Callable[[int], bool] | None = None
+    on_checkpoint: Callable[[list[int], int, int, int], None] | None = None
+    if engine.checkpoint_path is not None:
+
+        def checkpoint_due(placements: int) -> bool:
+            return engine.checkpointDue(base + placements)
+
+        def on_checkpoint(chosen: list[int], placements: int, backtracks: int, max_depth: int) -> None:
+            running: SolveStats = SolveStats(placements=placements, backtracks=backtracks, max_depth=max_depth)
+            engine._saveCheckpoint("dlx", [[node] for node in chosen], running)
+
+    solved, placements, backtracks, max_depth = solve_dlx(
+        engine.grid,
+        engine.sample_every,
+        engine.sample,
+        should_stop=lambda placements: engine.stopping(base + placements),
+        check_every=CANCEL_CHECK_INTERVAL,
+        resume=[node for node, in engine._resume.frames] if engine._resume is not None else None,
+        checkpoint_due=checkpoint_due,
+        on_checkpoint=on_checkpoint,
+    )
+    engine.stats.placements += placements
+    engine.stats.backtracks += backtracks
+    engine.stats.max_depth = max(engine.stats.max_depth, max_depth)
+    return solved
+
+
+@register_strategy("propagate")
+def propagate(engine: SudokuEngine) -> bool:
+    # Singles, pairs/triples and locked candidates before the search and after
+    # every guess; "guess" in the technique counters is the number of branches tried
+    try:
+        from src.sudoku_propagation import Propagator, solve_propagate
+    except ModuleNotFoundError:
+        from sudoku_propagation import Propagator, solve_propagate
+    engine._backtrack_stack.clear()
+    propagator: Propagator = Propagator(engine.grid.board_size, layout=engine.grid.layout)
+    propagator.sample_every = engine.sample_every
+    propagator.on_sample = engine.sample
+    base: int = engine.stats.placements
+    propagator.should_stop = lambda guesses: engine.stopping(base + guesses)
+
+    def counters() -> SolveStats:
+        return SolveStats(
+            placements=propagator.counts["guess"],
+            backtracks=propagator.backtracks,
+            max_depth=propagator.max_depth,
+            eliminations=propagator.eliminations,
+            techniques=dict(propagator.counts),
+        )
+
+    if engine.checkpoint_path is not None:
+        propagator.checkpoint_due = lambda guesses: engine.checkpointDue(base + guesses)
+        propagator.on_checkpoint = lambda frames: engine._saveCheckpoint("propagate", frames, counters())
+    resume: list[list[int]] | None = engine._resume.frames if engine._resume is not None else None
+    solved: bool = solve_propagate(engine.grid, propagator, resume)
+    # merge() adds the counters, which also keeps the technique counts of a resumed search
+    engine.stats.merge(counters())
+    return solved
+
+
+def solve(board: SudokuBoard | list[list[int]], algorithm: str = "backtrack", **options) -> SolveResult:
+    # Convenience wrapper that leaves the caller's board untouched;
+    # options are passed on to SudokuEngine (cell_order, value_order, ...)
+    board = board.copy() if isinstance(board, SudokuBoard) else SudokuBoard.fromRows(board)
+    return SudokuEngine(board, algorithm, **options).solve()
+
+
+def count_solutions(board: SudokuBoard | list[list[int]], limit: int = 2, layout: Layout | None = None) -> int:
+    # Like solve(), leaves the caller's board untouched
+    board = board.copy() if isinstance(board, SudokuBoard) else SudokuBoard.fromRows(board)
+    return SudokuEngine(board, layout=layout).countSolutions(limit)
@@ -0,0 +1,225 @@
+import argparse
+import os
+import random
+import sys
+from collections import deque
+from typing import Callable, Iterator
+
+try:
+    from src.sudoku_core import CandidateGrid, SudokuBoard
+    from src.sudoku_engine import SudokuEngine
+    from src.sudoku_io import write_lines
+    from src.sudoku_propagation import Propagator
+except ModuleNotFoundError:
+    from sudoku_core import CandidateGrid, SudokuBoard
+    from sudoku_engine import SudokuEngine
+    from sudoku_io import write_lines
+    from sudoku_propagation import Propagator
+
+
+# Puzzle generator: a random full grid, then clues are taken away (in 180 degree
+# symmetric pairs) as long as the puzzle keeps exactly one solution and does not
+# get harder than the target difficulty.
+# Usage: python -m src.sudoku_generator -n 10000 -d medium -o puzzles.txt --workers 8
+
+# Difficulty by the techniques a puzzle needs (see sudoku_propagation): the first
+# level whose techniques, together with those of the levels before it, solve the
+# puzzle. "expert" puzzles cannot be finished without guessing.
+DIFFICULTIES: dict[str, tuple[str, ...]] = {
+    "easy": ("naked_single", "hidden_single"),
+    "medium": ("pointing", "claiming"),
+    "hard": ("naked_pair", "naked_triple"),
+    "expert": ("guess",),
+}
+_RANKS: dict[str, int] = {name: rank for rank, name in enumerate(DIFFICULTIES)}
+
+# Full grids tried per puzzle before generate_puzzle gives up on a difficulty
+MAX_ATTEMPTS: int = 1000
+
+# Placements a uniqueness check may take on boards larger than 9x9 before the clue
+# is kept anyway; proving uniqueness of a sparse 16x16 board can take minutes, so
+# large puzzles end up with somewhat more clues than strictly needed
+CARVE_MAX_NODES: int = 2000
+
+
+# Up to this size full grids come from a randomized search; larger ones from a
+# shuffled pattern grid, since the search's running time has a heavy tail there
+SEARCH_GRID_LIMIT: int = 16
+
+
+def _patternGrid(board_size: int, rng: random.Random) -> SudokuBoard:
+    # The base pattern (box * (y % box) + y // box + x) % n is a valid grid; relabeling
+    # the digits and shuffling bands, stacks and the lines inside them keeps it valid
+    box: int = int(board_size ** (1 / 2))
+    digits: list[int] = rng.sample(range(1, board_size + 1), board_size)
+    rows: list[int] = [band * box + row for band in rng.sample(range(box), box) for row in rng.sample(range(box), box)]
+    columns: list[int] = [stack * box + column for stack in rng.sample(range(box), box) for column in rng.sample(range(box), box)]
+    if rng.random() < 0.5:
+        rows, columns = columns, rows
+    return SudokuBoard.fromRows([
+        [digits[(box * (y % box) + y // box + x) % board_size] for x in columns] for y in rows
+    ])
+
+
+def random_full_grid(board_size: int = 9, rng: random.Random | None = None) -> SudokuBoard:
+    rng = rng or random.Random()
+    if board_size > SEARCH_GRID_LIMIT:
+        return _patternGrid(board_size, rng)
+    engine: SudokuEngine = SudokuEngine(
+        SudokuBoard.empty(board_size),
+        cell_order="mrv",
+        value_order="random",
+        seed=rng.getrandbits(64),
+    )
+    engine.solve()
+    return engine.board
+
+
+def grade(grid: CandidateGrid) -> str:
+    # Difficulty of the grid's puzzle; the grid itself is not modified
+    techniques: tuple[str, ...] = ()
+    for difficulty, added in DIFFICULTIES.items():
+        if difficulty == "expert":
+            break
+        techniques += added
+        propagator: Propagator = Propagator(grid.board_size, techniques, grid.layout)
+        candidates, done = propagator.load(grid)
+        if propagator.propagate(candidates, done) and propagator.pickCell(candidates, done) == -1:
+            return difficulty
+    return "expert"
+
+
+def _carve(
+    engine: SudokuEngine,
+    rng: random.Random,
+    limit: int,
+    should_stop: Callable[[], bool] | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> bool:
+    # Remove clues while the puzzle stays unique and no harder than rank `limit`.
+    # Returns False when `should_stop` cut it short (the board is still a unique
+    # puzzle, with more clues); on_progress gets (cells tried, cells to try).
+    grid: CandidateGrid = engine.grid
+    cells = grid.cells
+    last: int = len(cells) - 1
+    max_nodes: int = CARVE_MAX_NODES if grid.board_size > 9 else 0
+    order: list[int] = [index for index in range(len(cells)) if index <= last - index]
+    rng.shuffle(order)
+
+    for tried, index in enumerate(order):
+        if should_stop is not None and should_stop():
+            return False
+        if on_progress is not None:
+            on_progress(tried, len(order))
+        pair: tuple[int, ...] = (index,) if index == last - index else (index, last - index)
+        removed: list[tuple[int, int]] = [(cell, cells[cell]) for cell in pair]
+        for cell, _ in removed:
+            grid.unplaceAt(cell)
+        if engine.countSolutions(2, max_nodes) == 1 and (limit == len(DIFFICULTIES) - 1 or _RANKS[grade(grid)] <= limit):
+            continue
+        for cell, value in removed:
+            grid.placeAt(cell, value)
+    return True
+
+
+def generate_puzzle(
+    difficulty: str | None = None,
+    board_size: int = 9,
+    seed: int | None = None,
+    rng: random.Random | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> SudokuBoard:
+    # A puzzle with exactly one solution; with `difficulty`, one that grades exactly that.
+    # Once `should_stop` returns True the clues removed so far are kept: the puzzle
+    # is returned as it is, still unique but possibly easier than `difficulty`.
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f"Unknown difficulty {difficulty!r}, expected one of: {', '.join(DIFFICULTIES)}")
+    rng = rng or random.Random(seed)
+    limit: int = _RANKS[difficulty] if difficulty is not None else len(DIFFICULTIES) - 1
+
+    for _ in range(MAX_ATTEMPTS):
+        engine: SudokuEngine = SudokuEngine(random_full_grid(board_size, rng))
+        finished: bool = _carve(engine, rng, limit, should_stop, on_progress)
+        if not finished or difficulty is None or grade(engine.grid) == difficulty:
+            return engine.board
+    raise RuntimeError(f"No {difficulty} puzzle found in {MAX_ATTEMPTS} attempts")
+
+
+def generate_chunk(count: int, difficulty: str | None, board_size: int, seed: int | None) -> list[str]:
+    rng: random.Random = random.Random(seed)
+    return [generate_puzzle(difficulty, board_size, rng=rng).toString() for _ in range(count)]
+
+
+def generate_stream(
+    count: int,
+    difficulty: str | None = None,
+    board_size: int = 9,
+    workers: int = 1,
+    chunk_size: int = 64,
+    seed: int | None = None,
+) -> Iterator[str]:
+    # Yields `count` distinct puzzles. Every chunk gets its own seed (derived from
+    # `seed`, so a seeded run is reproducible) and at most 2 * workers chunks are in flight.
+    rng: random.Random = random.Random(seed)
+    seen: set[str] = set()
+
+    def accept(puzzles: list[str]) -> Iterator[str]:
+        for puzzle in puzzles:
+            if len(seen) < count and puzzle not in seen:
+                seen.add(puzzle)
+                yield puzzle
+
+    if workers <= 1:
+        while len(seen) < count:
+            yield from accept(generate_chunk(min(chunk_size, count - len(seen)), difficulty, board_size, rng.getrandbits(64)))
+        return
+
+    from concurrent.futures import Future, ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        while len(seen) < count:
+            while len(pending) < 2 * workers:
+                pending.append(pool.submit(generate_chunk, chunk_size, difficulty, board_size, rng.getrandbits(64)))
+            yield from accept(pending.popleft().result())
+        for future in pending:
+            future.cancel()
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate sudoku puzzles with a unique solution, one per line.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of puzzles")
+    parser.add_argument("-d", "--difficulty", choices=list(DIFFICULTIES), help="required difficulty (default: any)")
+    parser.add_argument("-s", "--board-size", type=int, default=9, help="board size (a perfect square: 4, 9, 16, 25, ...)")
+    parser.add_argument("-o", "--output", default="-", help="puzzle file ('-' for stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("-c", "--chunk-size", type=int, default=64, help="puzzles generated by a worker at a time")
+    parser.add_argument("--seed", type=int, help="random seed for a reproducible run")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    if arguments.chunk_size < 1:
+        print("--chunk-size must be at least 1", file=sys.stderr)
+        return 2
+
+    target = sys.stdout if arguments.output == "-" else open(arguments.output, "w", encoding="utf-8")
+    try:
+        puzzles: Iterator[str] = generate_stream(
+            arguments.count,
+            difficulty=arguments.difficulty,
+            board_size=arguments.board_size,
+            workers=arguments.workers,
+            chunk_size=arguments.chunk_size,
+            seed=arguments.seed,
+        )
+        write_lines(target, puzzles)
+    finally:
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import random
+from typing import Callable
+
+try:
+    from src.sudoku_core import CandidateGrid
+    from src.sudoku_layout import get_layout
+except ModuleNotFoundError:
+    from sudoku_core import CandidateGrid
+    from sudoku_layout import get_layout
+
+
+# Variable ordering: (grid, rng) -> the next empty cell to branch on, or None when the
+# board is full. rng is only given when ties should be broken randomly (restarts).
+CELL_ORDERS: dict[str, Callable[[CandidateGrid, random.Random | None], tuple[int, int] | None]] = {}
+
+# Value ordering: (grid, row, column, rng) -> the cell's legal digits in the order to try them
+VALUE_ORDERS: dict[str, Callable[[CandidateGrid, int, int, random.Random | None], list[int]]] = {}
+
+
+def register_cell_order(name: str) -> Callable:
+    def decorator(order: Callable) -> Callable:
+        CELL_ORDERS[name] = order
+        return order
+    return decorator
+
+
+def register_value_order(name: str) -> Callable:
+    def decorator(order: Callable) -> Callable:
+        VALUE_ORDERS[name] = order
+        return order
+    return decorator
+
+
+def get_cell_order(name: str) -> Callable[[CandidateGrid, random.Random | None], tuple[int, int] | None]:
+    if name not in CELL_ORDERS:
+        raise ValueError(f"Unknown cell order {name!r}, expected one of: {', '.join(sorted(CELL_ORDERS))}")
+    return CELL_ORDERS[name]
+
+
+def get_value_order(name: str) -> Callable[[CandidateGrid, int, int, random.Random | None], list[int]]:
+    if name not in VALUE_ORDERS:
+        raise ValueError(f"Unknown value order {name!r}, expected one of: {', '.join(sorted(VALUE_ORDERS))}")
+    return VALUE_ORDERS[name]
+
+
+def peer_masks(board_size: int) -> tuple[int, ...]:
+    # For every cell, a bitset (same layout as CandidateGrid.empty) of its row, column
+    # and box peers; other variants have theirs in grid.layout.peer_masks
+    return get_layout(board_size).peer_masks
+
+
+def _cells(bitset: int):
+    # Indices of the set bits of a cell bitset
+    while bitset:
+        bit: int = bitset & -bitset
+        bitset ^= bit
+        yield bit.bit_length() - 1
+
+
+@register_cell_order("row-major")
+def row_major(grid: CandidateGrid, rng: random.Random | None = None) -> tuple[int, int] | None:
+    return grid.firstEmpty()
+
+
+def _minimumRemaining(grid: CandidateGrid, rng: random.Random | None, degree: bool) -> tuple[int, int] | None:
+    # Fewest candidates first; with `degree`, ties go to the cell with the most empty
+    # peers (it constrains the rest of the search the most)
+    board_size: int = grid.board_size
+    peers: tuple[int, ...] = grid.layout.peer_masks
+    best: int = -1
+    best_key: tuple[int, int] = (board_size + 1, 0)
+    ties: int = 0
+    for index in _cells(grid.empty):
+        count: int = grid.candidatesAt(index).bit_count()
+        if count > best_key[0]:
+            continue
+        key: tuple[int, int] = (count, -(grid.empty & peers[index]).bit_count() if degree else 0)
+        if key < best_key:
+            best, best_key, ties = index, key, 1
+        elif key == best_key and rng is not None:
+            # reservoir sampling keeps every tied cell equally likely
+            ties += 1
+            if rng.randrange(ties) == 0:
+                best = index
+        if count == 0:
+            break
+    if best == -1:
+        return None
+    return divmod(best, board_size)
+
+
+@register_cell_order("mrv")
+def minimum_remaining_values(grid: CandidateGrid, rng: random.Random | None = None) -> tuple[int, int] | None:
+    return _minimumRemaining(grid, rng, degree=False)
+
+
+@register_cell_order("mrv-degree")
+def minimum_remaining_values_degree(grid: CandidateGrid, rng: random.Random | None = None) -> tuple[int, int] | None:
+    return _minimumRemaining(grid, rng, degree=True)
+
+
+def _digits(mask: int) -> list[int]:
+    digits: list[int] = []
+    while mask:
+        bit: int = mask & -mask
+        mask ^= bit
+        digits.append(bit.bit_length() - 1)
+    return digits
+
+
+@register_value_order("ascending")
+def ascending(grid: CandidateGrid, row: int, column: int, rng: random.Random | None = None) -> list[int]:
+    return _digits(grid.candidates(row, column))
+
+
+@register_value_order("random")
+def shuffled(grid: CandidateGrid, row: int, column: int, rng: random.Random | None = None) -> list[int]:
+    digits: list[int] = _digits(grid.candidates(row, column))
+    (rng or random).shuffle(digits)
+    return digits
+
+
+@register_value_order("lcv")
+def least_constraining_value(grid: CandidateGrid, row: int, column: int, rng: random.Random | None = None) -> list[int]:
+    # Try first the digits that remove the fewest candidates from the empty peers
+    board_size: int = grid.board_size
+    empty_peers: int = grid.empty & grid.layout.peer_masks[row * board_size + column]
+    peer_candidates: list[int] = [grid.candidatesAt(index) for index in _cells(empty_peers)]
+    digits: list[int] = _digits(grid.candidates(row, column))
+    return sorted(digits, key=lambda digit: sum((mask >> digit) & 1 for mask in peer_candidates))
@@ -0,0 +1,34 @@
+from typing import Iterable, Iterator, TextIO
+
+try:
+    from src.sudoku_core import SudokuBoard
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard
+
+# Line-per-puzzle text format: board_size * board_size characters in row-major
+# order, symbols for givens and "." or "0" for blanks (e.g. 81 characters for 9x9,
+# 256 for 16x16 with "A".."G" for 10..16; see sudoku_core.SYMBOLS)
+
+
+def parse_puzzle(text: str) -> SudokuBoard:
+    return SudokuBoard.fromString(text)
+
+
+def format_board(board: SudokuBoard | list[list[int]]) -> str:
+    if not isinstance(board, SudokuBoard):
+        board = SudokuBoard.fromRows(board)
+    return board.toString()
+
+
+def read_puzzles(lines: Iterable[str]) -> Iterator[str]:
+    # Lazily yields the puzzle lines of a file or stream, skipping blank lines and # comments
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def write_lines(stream: TextIO, lines: Iterable[str]) -> None:
+    for line in lines:
+        stream.write(line)
+        stream.write("\n")
@@ -0,0 +1,220 @@
+from functools import lru_cache
+from itertools import combinations
+from typing import Callable, Iterable, Sequence
+
+
+# The constraint graph of a board: "units" are groups of cells that must hold
+# different digits (rows, columns, boxes, diagonals, jigsaw regions, windows, cages)
+# and "cages" additionally have to add up to a total (Killer Sudoku). A Layout
+# precomputes, once, the units every cell belongs to and its peers, so the search
+# engines only ever index tables and never have to know which variant they solve.
+# Cells are numbered y * board_size + x, like SudokuBoard.cells.
+
+# Unit kinds that are lines of the grid (see Propagator.lockedCandidates)
+LINES: frozenset[str] = frozenset({"row", "column"})
+
+
+class Layout:
+    # Built through get_layout(), jigsaw_layout() or killer_layout(), which cache one
+    # instance per board size and variant; treat it as immutable.
+    #   units       tuple of cell tuples, classic layouts start with the rows, then
+    #               the columns, then the boxes
+    #   kinds       "row", "column", "box", ... for every unit
+    #   houses      indices of the units that hold every digit exactly once
+    #   units_of    for every cell, the indices of its units
+    #   core_of     for every cell, its first three units (rows, columns and boxes or
+    #               regions), which the hot loops read with one tuple unpack
+    #   extra_of    for every cell, the rest of its units (empty for classic boards)
+    #   house_bits  for every cell, a bitset of the houses it is in (bit = position
+    #               in `houses`)
+    #   peers       for every cell, the other cells of its units
+    #   peer_masks  the same as bitsets (bit = cell index, like CandidateGrid.empty)
+    #   cage_of     for every cell, (unit index, total, cell count) of its cage or None
+
+    def __init__(
+        self,
+        board_size: int,
+        variant: str,
+        units: Sequence[tuple[str, Sequence[int]]],
+        cages: Sequence[tuple[Sequence[int], int]] = (),
+    ) -> None:
+        cell_count: int = board_size * board_size
+        first_cage: int = len(units)
+        units = list(units) + [("cage", cells) for cells, _ in cages]
+        # Cells in fewer than three units get single-cell units (always satisfied)
+        # so that every cell has a full core
+        counts: list[int] = [0] * cell_count
+        for _, cells in units:
+            for cell in cells:
+                if 0 <= cell < cell_count:
+                    counts[cell] += 1
+        units += [("cell", (cell,)) for cell in range(cell_count) for _ in range(3 - counts[cell])]
+        for kind, cells in units:
+            if len(set(cells)) != len(cells) or not 0 < len(cells) <= board_size:
+                raise ValueError(f"Invalid layout: a {kind} must have 1 to {board_size} distinct cells")
+            if any(not 0 <= cell < cell_count for cell in cells):
+                raise ValueError(f"Invalid layout: a {kind} has a cell outside the board")
+
+        self.board_size: int = board_size
+        self.box_size: int = int(board_size ** (1 / 2))
+        self.variant: str = variant
+        self.full_mask: int = (1 << (board_size + 1)) - 2
+        self.units: tuple[tuple[int, ...], ...] = tuple(tuple(cells) for _, cells in units)
+        self.kinds: tuple[str, ...] = tuple(kind for kind, _ in units)
+        self.houses: tuple[int, ...] = tuple(
+            unit for unit, cells in enumerate(self.units) if len(cells) == board_size and self.kinds[unit] != "cage"
+        )
+
+        units_of: list[list[int]] = [[] for _ in range(cell_count)]
+        for unit, cells in enumerate(self.units):
+            for cell in cells:
+                units_of[cell].append(unit)
+        self.units_of: tuple[tuple[int, ...], ...] = tuple(map(tuple, units_of))
+        self.core_of: tuple[tuple[int, int, int], ...] = tuple(tuple(units[:3]) for units in units_of)
+        self.extra_of: tuple[tuple[int, ...], ...] = tuple(tuple(units[3:]) for units in units_of)
+        #whether any cell has extra units, so classic boards skip them altogether
+        self.has_extra: bool = any(self.extra_of)
+
+        house_bits: list[int] = [0] * cell_count
+        for position, unit in enumerate(self.houses):
+            for cell in self.units[unit]:
+                house_bits[cell] |= 1 << position
+        self.house_bits: tuple[int, ...] = tuple(house_bits)
+
+        peers: list[tuple[int, ...]] = []
+        peer_masks: list[int] = []
+        for cell in range(cell_count):
+            others: set[int] = {peer for unit in units_of[cell] for peer in self.units[unit]}
+            others.discard(cell)
+            peers.append(tuple(sorted(others)))
+            peer_masks.append(sum(1 << peer for peer in others))
+        self.peers: tuple[tuple[int, ...], ...] = tuple(peers)
+        self.peer_masks: tuple[int, ...] = tuple(peer_masks)
+
+        cage_of: list[tuple[int, int, int] | None] = [None] * cell_count
+        for offset, (cells, total) in enumerate(cages):
+            for cell in cells:
+                if cage_of[cell] is not None:
+                    raise ValueError("Invalid layout: cages overlap")
+                cage_of[cell] = (first_cage + offset, total, len(cells))
+        self.cage_of: tuple[tuple[int, int, int] | None, ...] = tuple(cage_of)
+        self.cages: tuple[tuple[int, int, int], ...] = tuple(
+            (first_cage + offset, total, len(cells)) for offset, (cells, total) in enumerate(cages)
+        )
+
+    def cageDigits(self, cage: tuple[int, int, int], used: int) -> int:
+        # Digits the open cells of `cage` can still take, given the mask of its placed digits
+        _, total, count = cage
+        return cage_digits(self.board_size, total, count, used)
+
+    def __repr__(self) -> str:
+        return f"Layout({self.board_size}x{self.board_size}, {self.variant!r})"
+
+
+@lru_cache(maxsize=65536)
+def cage_digits(board_size: int, total: int, count: int, used: int) -> int:
+    # Union of the digits of every way to fill the open cells of a cage of `count`
+    # cells adding up to `total`, when the digits in `used` are already placed in it.
+    # A full cage gives every digit if its sum is right and none otherwise.
+    placed: list[int] = [digit for digit in range(1, board_size + 1) if used >> digit & 1]
+    remaining: int = total - sum(placed)
+    open_cells: int = count - len(placed)
+    full_mask: int = (1 << (board_size + 1)) - 2
+    if open_cells == 0:
+        return full_mask if remaining == 0 else 0
+    allowed: int = 0
+    free: list[int] = [digit for digit in range(1, board_size + 1) if not used >> digit & 1]
+    for digits in combinations(free, open_cells):
+        if sum(digits) == remaining:
+            for digit in digits:
+                allowed |= 1 << digit
+    return allowed
+
+
+# Variants by name: board_size -> list of (kind, cells) units
+VARIANTS: dict[str, Callable[[int], list[tuple[str, tuple[int, ...]]]]] = {}
+
+
+def register_variant(name: str) -> Callable:
+    def decorator(builder: Callable[[int], list[tuple[str, tuple[int, ...]]]]) -> Callable:
+        VARIANTS[name] = builder
+        return builder
+    return decorator
+
+
+def _lines(board_size: int) -> list[tuple[str, tuple[int, ...]]]:
+    size: int = board_size
+    return (
+        [("row", tuple(y * size + x for x in range(size))) for y in range(size)]
+        + [("column", tuple(y * size + x for y in range(size))) for x in range(size)]
+    )
+
+
+def _square(board_size: int, top: int, left: int, side: int) -> tuple[int, ...]:
+    return tuple((top + y) * board_size + left + x for y in range(side) for x in range(side))
+
+
+@register_variant("classic")
+def classic(board_size: int) -> list[tuple[str, tuple[int, ...]]]:
+    box: int = int(board_size ** (1 / 2))
+    if box * box != board_size:
+        raise ValueError(f"Invalid layout: {board_size} is not a square board size")
+    boxes = [("box", _square(board_size, top, left, box)) for top in range(0, board_size, box) for left in range(0, board_size, box)]
+    return _lines(board_size) + boxes
+
+
+@register_variant("x")
+def diagonals(board_size: int) -> list[tuple[str, tuple[int, ...]]]:
+    # X-Sudoku: both main diagonals hold every digit as well
+    return classic(board_size) + [
+        ("diagonal", tuple(i * board_size + i for i in range(board_size))),
+        ("diagonal", tuple(i * board_size + board_size - 1 - i for i in range(board_size))),
+    ]
+
+
+@register_variant("windoku")
+def windows(board_size: int) -> list[tuple[str, tuple[int, ...]]]:
+    # Windoku: extra boxes one cell in from the edges with a one-cell gap between
+    # them (the four shaded windows of a 9x9)
+    box: int = int(board_size ** (1 / 2))
+    starts: range = range(1, board_size - box, box + 1)
+    return classic(board_size) + [("window", _square(board_size, top, left, box)) for top in starts for left in starts]
+
+
+@lru_cache(maxsize=None)
+def get_layout(board_size: int, variant: str = "classic") -> Layout:
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant {variant!r}, expected one of: {', '.join(sorted(VARIANTS))}")
+    return Layout(board_size, variant, VARIANTS[variant](board_size))
+
+
+def jigsaw_layout(regions: Iterable[int]) -> Layout:
+    # Jigsaw (irregular) Sudoku: rows, columns and the given regions, where regions
+    # has one region id per cell and every region has board_size cells
+    return _jigsaw(tuple(regions))
+
+
+@lru_cache(maxsize=64)
+def _jigsaw(regions: tuple[int, ...]) -> Layout:
+    board_size: int = int(len(regions) ** (1 / 2))
+    if board_size * board_size != len(regions):
+        raise ValueError(f"Invalid layout: {len(regions)} region ids is not a square board")
+    cells: dict[int, list[int]] = {}
+    for cell, region in enumerate(regions):
+        cells.setdefault(region, []).append(cell)
+    if any(len(members) != board_size for members in cells.values()):
+        raise ValueError(f"Invalid layout: every region must have {board_size} cells")
+    return Layout(board_size, "jigsaw", _lines(board_size) + [("region", tuple(members)) for members in cells.values()])
+
+
+def killer_layout(board_size: int, cages: Iterable[tuple[Iterable[int], int]], variant: str = "classic") -> Layout:
+    # Killer Sudoku on top of a variant: every cage (cells, total) holds different
+    # digits that add up to its total. Cages need not cover the whole board.
+    return _killer(board_size, tuple((tuple(cells), total) for cells, total in cages), variant)
+
+
+@lru_cache(maxsize=64)
+def _killer(board_size: int, cages: tuple[tuple[tuple[int, ...], int], ...], variant: str) -> Layout:
+    base: Layout = get_layout(board_size, variant)
+    units = list(zip(base.kinds, base.units))
+    return Layout(board_size, f"killer-{variant}" if variant != "classic" else "killer", units, cages)
@@ -0,0 +1,264 @@
+import argparse
+import heapq
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+try:
+    from src.sudoku_core import CandidateGrid, SudokuBoard
+    from src.sudoku_engine import SolveResult, SolveStats, SudokuEngine, count_solutions
+    from src.sudoku_heuristics import get_cell_order
+    from src.sudoku_io import parse_puzzle
+    from src.sudoku_layout import Layout
+except ModuleNotFoundError:
+    from sudoku_core import CandidateGrid, SudokuBoard
+    from sudoku_engine import SolveResult, SolveStats, SudokuEngine, count_solutions
+    from sudoku_heuristics import get_cell_order
+    from sudoku_io import parse_puzzle
+    from sudoku_layout import Layout
+
+
+# Parallel search of one hard board. The top levels of the search tree are expanded
+# into independent subproblems (boards with a few more cells filled in) that are
+# handed to a process pool. Every worker searches a subproblem with the ordinary
+# SudokuEngine backtracking, in slices of `slice_nodes` placements: a subproblem
+# that is not finished after a slice is split into the untried branches of its
+# search stack (the checkpoint frames of the stopped search) and those go back to
+# the queue, where idle workers take them. Long subtrees are so broken up among all
+# workers, and the first solution found stops every worker. The queue hands out
+# subproblems in the order the serial search would visit them, so one worker does
+# the serial search's work plus a little overhead per slice.
+# Usage: python -m src.sudoku_parallel "<puzzle>" --workers 8 [--count]
+
+# Subproblems per worker made before the pool starts
+SPLIT_FACTOR: int = 8
+
+# Placements a worker spends on a subproblem before it splits it up
+SLICE_NODES: int = 100_000
+
+# Worker state, set by the pool initializer
+_layout: Layout | None = None
+_stop = None
+
+
+class _SliceEngine(SudokuEngine):
+    # Stops as soon as another worker has found the answer, and keeps the frames of
+    # its checkpoint in memory (it only takes one when it stops) instead of writing them
+    open_frames: tuple[str, list[list[int]]] | None = None
+
+    def stopping(self, placements: int) -> bool:
+        return _stop.is_set() or super().stopping(placements)
+
+    def writeCheckpoint(self, path: str, kind: str, frames: list[list[int]], stats: SolveStats, **state) -> None:
+        self.open_frames = (kind, frames)
+
+
+def _initWorker(layout: Layout | None, stop) -> None:
+    global _layout, _stop
+    _layout, _stop = layout, stop
+
+
+def _board(snapshot: bytes, board_size: int) -> SudokuBoard:
+    board: SudokuBoard = SudokuBoard.empty(board_size)
+    board.restore(snapshot)
+    return board
+
+
+def open_branches(board: SudokuBoard, kind: str, frames: list[list[int]]) -> list[bytes]:
+    # The part of a stopped backtracking search that is still to do, as board
+    # snapshots: the board itself (the subtree under the current path, whose last
+    # frame has not been tried yet) and, for every frame below it, the board up to
+    # that frame with each of the frame's untried digits. Branches come in the order
+    # the stopped search would have visited them.
+    board_size: int = board.board_size
+    branches: list[bytes] = [board.snapshot()]
+    prefix: SudokuBoard = board.copy()
+    for frame in reversed(frames[:-1]):
+        if kind == "backtrack":
+            index, free = frame
+            digits: list[int] = [digit for digit in range(1, board_size + 1) if free >> digit & 1]
+        else:
+            # values are tried from the end of the list
+            row, column, *values = frame
+            index = row * board_size + column
+            digits = values[::-1]
+        prefix.cells[index] = 0
+        for digit in digits:
+            prefix.cells[index] = digit
+            branches.append(prefix.snapshot())
+            prefix.cells[index] = 0
+    return branches
+
+
+def solve_part(snapshot: bytes, board_size: int, cell_order: str, value_order: str, slice_nodes: int) -> tuple[str, object, SolveStats]:
+    # One slice of work on a subproblem; runs in a pool worker. Returns
+    # ("solved", solution snapshot, stats), ("done", None, stats) when the subtree has
+    # no solution, ("split", [subproblem snapshots], stats) when the slice ran out, or
+    # ("stopped", None, stats) when another worker was faster.
+    engine: _SliceEngine = _SliceEngine(_board(snapshot, board_size), "backtrack", cell_order, value_order, layout=_layout)
+    if _stop.is_set():
+        return "stopped", None, engine.stats
+    engine.setBudget(nodes=slice_nodes)
+    # no periodic checkpoints, only the one taken when the slice stops
+    engine.setCheckpoint("<memory>", every_nodes=0, every_seconds=0)
+    result: SolveResult = engine.solve()
+    if result.solved:
+        return "solved", result.board.snapshot(), result.stats
+    if result.timed_out and engine.open_frames is not None:
+        return "split", open_branches(engine.board, *engine.open_frames), result.stats
+    if result.timed_out or _stop.is_set():
+        return "stopped", None, result.stats
+    return "done", None, result.stats
+
+
+def count_part(snapshot: bytes, board_size: int, limit: int) -> int:
+    # Solutions of a subproblem, up to `limit`; runs in a pool worker
+    if _stop.is_set():
+        return 0
+    return count_solutions(_board(snapshot, board_size), limit, layout=_layout)
+
+
+def split_board(
+    board: SudokuBoard,
+    parts: int,
+    layout: Layout | None = None,
+    cell_order: str = "mrv",
+) -> list[SudokuBoard]:
+    # Expands the search tree breadth first (branching on the cell picked by
+    # `cell_order`) until there are at least `parts` subproblems or the tree is
+    # exhausted, and returns them in depth-first order. Their solutions are exactly
+    # the board's: branches without candidates are dropped, and finished boards are
+    # kept as they are.
+    choose_cell = get_cell_order(cell_order)
+    finished: list[tuple[tuple[int, ...], SudokuBoard]] = []
+    # (digits chosen on the way down, board)
+    queue: deque[tuple[tuple[int, ...], SudokuBoard]] = deque([((), board.copy())])
+    while queue and len(queue) + len(finished) < parts:
+        path, current = queue.popleft()
+        grid: CandidateGrid = CandidateGrid(current, layout)
+        cell: tuple[int, int] | None = choose_cell(grid, None)
+        if cell is None:
+            finished.append((path, current))
+            continue
+        row, column = cell
+        free: int = grid.candidates(row, column)
+        for digit in range(1, board.board_size + 1):
+            if free >> digit & 1:
+                child: SudokuBoard = current.copy()
+                child[row, column] = digit
+                queue.append((path + (digit,), child))
+    return [part for _, part in sorted(finished + list(queue), key=lambda item: item[0])]
+
+
+def _pool(workers: int, layout: Layout | None):
+    # The stop flag is inherited by the workers, so setting it reaches running slices
+    stop = multiprocessing.Event()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_initWorker, initargs=(layout, stop)), stop
+
+
+def solve_parallel(
+    board: SudokuBoard | list[list[int]],
+    workers: int = os.cpu_count() or 1,
+    layout: Layout | None = None,
+    cell_order: str = "mrv",
+    value_order: str = "ascending",
+    slice_nodes: int = SLICE_NODES,
+) -> SolveResult:
+    # Solve one board with `workers` processes. Leaves the caller's board untouched;
+    # stats add up the work of every worker (elapsed is the wall time of the call).
+    started: float = time.perf_counter()
+    board = board.copy() if isinstance(board, SudokuBoard) else SudokuBoard.fromRows(board)
+    board_size: int = board.board_size
+    stats: SolveStats = SolveStats()
+    if not CandidateGrid(board, layout).isConsistent():
+        return SolveResult(False, board, stats)
+
+    parts: list[SudokuBoard] = split_board(board, max(workers, 1) * SPLIT_FACTOR, layout, cell_order)
+    # (position in the serial search order, board snapshot); the positions of the
+    # branches of a split subproblem extend the subproblem's own
+    queue: list[tuple[tuple[int, ...], bytes]] = [((position,), part.snapshot()) for position, part in enumerate(parts)]
+    running: dict[Future, tuple[int, ...]] = {}
+    solution: bytes | None = None
+    pool, stop = _pool(workers, layout)
+    with pool:
+        while (queue or running) and solution is None:
+            while queue and len(running) < max(workers, 1):
+                position, snapshot = heapq.heappop(queue)
+                running[pool.submit(solve_part, snapshot, board_size, cell_order, value_order, slice_nodes)] = position
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                position = running.pop(future)
+                status, payload, part_stats = future.result()
+                stats.merge(part_stats)
+                if status == "solved" and solution is None:
+                    solution = payload
+                    # running slices notice within CANCEL_CHECK_INTERVAL placements
+                    stop.set()
+                elif status == "split":
+                    for offset, branch in enumerate(payload):
+                        heapq.heappush(queue, (position + (offset,), branch))
+
+    if solution is not None:
+        board.restore(solution)
+    stats.elapsed = time.perf_counter() - started
+    return SolveResult(solution is not None, board, stats)
+
+
+def count_parallel(
+    board: SudokuBoard | list[list[int]],
+    limit: int = 2,
+    workers: int = os.cpu_count() or 1,
+    layout: Layout | None = None,
+) -> int:
+    # Number of solutions, counting stops at `limit` (limit=2 is a uniqueness check).
+    # Every subproblem is counted to the end by one worker, so the board is split
+    # finer than for solving.
+    board = board.copy() if isinstance(board, SudokuBoard) else SudokuBoard.fromRows(board)
+    if not CandidateGrid(board, layout).isConsistent():
+        return 0
+    parts: list[SudokuBoard] = split_board(board, max(workers, 1) * SPLIT_FACTOR * 4, layout)
+    count: int = 0
+    pool, stop = _pool(workers, layout)
+    with pool:
+        futures: list[Future] = [pool.submit(count_part, part.snapshot(), board.board_size, limit) for part in parts]
+        for future in futures:
+            count += future.result()
+            if count >= limit:
+                stop.set()
+                for other in futures:
+                    other.cancel()
+                break
+    return min(count, limit)
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solve one hard sudoku on several cores.")
+    parser.add_argument("puzzle", help="the puzzle, one character per cell ('.' or '0' for blanks)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--cell-order", default="mrv", help="cell heuristic of the workers' search")
+    parser.add_argument("--slice-nodes", type=int, default=SLICE_NODES, help="placements before a worker splits its subproblem")
+    parser.add_argument("--count", type=int, nargs="?", const=2, help="count solutions up to this limit instead (default 2)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    try:
+        board: SudokuBoard = parse_puzzle(arguments.puzzle)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    if arguments.count is not None:
+        print(count_parallel(board, arguments.count, arguments.workers))
+        return 0
+    result: SolveResult = solve_parallel(board, arguments.workers, cell_order=arguments.cell_order, slice_nodes=arguments.slice_nodes)
+    print(result.board.toString() if result.solved else "unsolvable")
+    print(f"{result.stats.placements} placements, {result.stats.elapsed:.3f} s", file=sys.stderr)
+    return 0 if result.solved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
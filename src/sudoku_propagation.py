@@ -0,0 +1,348 @@
+from itertools import combinations
+from typing import Callable
+
+try:
+    from src.sudoku_core import CandidateGrid
+    from src.sudoku_layout import LINES, Layout, get_layout
+except ModuleNotFoundError:
+    from sudoku_core import CandidateGrid
+    from sudoku_layout import LINES, Layout, get_layout
+
+
+TECHNIQUES: tuple[str, ...] = (
+    "naked_single",
+    "hidden_single",
+    "naked_pair",
+    "naked_triple",
+    "pointing",
+    "claiming",
+    "guess",
+)
+
+
+def unit_tables(board_size: int) -> tuple[tuple[tuple[int, ...], ...], ...]:
+    # Cells are numbered y * board_size + x. Returns (rows, columns, boxes, peers)
+    # of the classic layout, built once per board size.
+    layout: Layout = get_layout(board_size)
+    return (
+        layout.units[:board_size],
+        layout.units[board_size:2 * board_size],
+        layout.units[2 * board_size:3 * board_size],
+        layout.peers,
+    )
+
+
+class Propagator:
+    # Human-style inference on a flat list of candidate masks (one per cell, bit d
+    # set = digit d still possible). A state is the candidate list plus a bytearray
+    # marking the cells whose single digit has already been removed from their peers.
+    # counts records how often each technique made progress. `techniques` restricts
+    # propagate() to a subset (singles always run), e.g. to grade puzzles.
+    # `layout` is the variant's constraint graph (classic by default): hidden singles
+    # and locked candidates work on its houses, naked subsets on every unit, and
+    # Killer cage totals are enforced whenever a cage cell is decided.
+
+    def __init__(self, board_size: int, techniques: tuple[str, ...] = TECHNIQUES, layout: Layout | None = None) -> None:
+        if layout is None:
+            layout = get_layout(board_size)
+        self.board_size: int = board_size
+        self.techniques: frozenset[str] = frozenset(techniques)
+        self.full_mask: int = (1 << (board_size + 1)) - 2
+        self.layout: Layout = layout
+        self.peers: tuple[tuple[int, ...], ...] = layout.peers
+        self.units: tuple[tuple[int, ...], ...] = layout.units
+        self.houses: tuple[tuple[int, ...], ...] = tuple(layout.units[unit] for unit in layout.houses)
+        self.house_lines: tuple[bool, ...] = tuple(layout.kinds[unit] in LINES for unit in layout.houses)
+        self.house_bits: tuple[int, ...] = layout.house_bits
+        self.cage_of: tuple[tuple[int, int, int] | None, ...] = layout.cage_of
+
+        self.counts: dict[str, int] = dict.fromkeys(TECHNIQUES, 0)
+        self.eliminations: int = 0
+        self.backtracks: int = 0
+        self.max_depth: int = 0
+        #candidates at the deepest point of the search, and whether should_stop ended it
+        self.deepest: list[int] | None = None
+        self.stopped: bool = False
+
+        #called with (guesses, backtracks, depth) every sample_every guesses
+        self.sample_every: int = 0
+        self.on_sample: Callable[[int, int, int], None] | None = None
+        #polled with the guess count before every guess; the search gives up (and sets
+        #`stopped`) when it returns True
+        self.should_stop: Callable[[int], bool] | None = None
+        #asked with the guess count before every guess; when it returns True,
+        #on_checkpoint gets the search frames as [cell, digits still to try] lists
+        self.checkpoint_due: Callable[[int], bool] | None = None
+        self.on_checkpoint: Callable[[list[list[int]]], None] | None = None
+
+    def load(self, grid: CandidateGrid) -> tuple[list[int], bytearray]:
+        # Givens are already reflected in the grid's masks, so they start out done
+        candidates: list[int] = []
+        done: bytearray = bytearray(self.board_size * self.board_size)
+        for cell, value in enumerate(grid.cells):
+            if value == 0:
+                candidates.append(grid.candidatesAt(cell))
+            else:
+                candidates.append(1 << value)
+                done[cell] = 1
+        return candidates, done
+
+    def assign(self, candidates: list[int], done: bytearray, cell: int, bit: int) -> bool:
+        candidates[cell] = bit
+        done[cell] = 1
+        keep: int = ~bit
+        for peer in self.peers[cell]:
+            if candidates[peer] & bit:
+                candidates[peer] &= keep
+                self.eliminations += 1
+                if candidates[peer] == 0:
+                    return False
+        cage = self.cage_of[cell]
+        if cage is not None:
+            return self.restrictCage(candidates, done, cage)
+        return True
+
+    def restrictCage(self, candidates: list[int], done: bytearray, cage: tuple[int, int, int]) -> bool:
+        # Keep only the digits that can still make up the cage's total in its open cells
+        cells: tuple[int, ...] = self.units[cage[0]]
+        used: int = 0
+        for cell in cells:
+            if done[cell]:
+                used |= candidates[cell]
+        allowed: int = self.layout.cageDigits(cage, used)
+        if allowed == 0:
+            return False
+        for cell in cells:
+            if not done[cell] and candidates[cell] & ~allowed:
+                candidates[cell] &= allowed
+                self.eliminations += 1
+                if candidates[cell] == 0:
+                    return False
+        return True
+
+    def propagate(self, candidates: list[int], done: bytearray) -> bool:
+        # Apply the techniques, cheapest first, until none of them makes progress.
+        # Returns False if the state turned out to be contradictory.
+        while True:
+            progress: int = self.nakedSingles(candidates, done)
+            if progress == 0:
+                progress = self.hiddenSingles(candidates, done)
+            if progress == 0 and "naked_pair" in self.techniques:
+                progress = self.nakedSubsets(candidates, 2, "naked_pair")
+            if progress == 0 and "naked_triple" in self.techniques:
+                progress = self.nakedSubsets(candidates, 3, "naked_triple")
+            if progress == 0 and self.techniques & {"pointing", "claiming"}:
+                progress = self.lockedCandidates(candidates)
+            if progress < 0:
+                return False
+            if progress == 0:
+                return True
+
+    # Each technique returns 1 on progress, 0 when it found nothing, -1 on a contradiction
+
+    def nakedSingles(self, candidates: list[int], done: bytearray) -> int:
+        progress: int = 0
+        for cell, mask in enumerate(candidates):
+            if done[cell] or mask & (mask - 1):
+                continue
+            if mask == 0:
+                return -1
+            self.counts["naked_single"] += 1
+            if not self.assign(candidates, done, cell, mask):
+                return -1
+            progress = 1
+        return progress
+
+    def hiddenSingles(self, candidates: list[int], done: bytearray) -> int:
+        progress: int = 0
+        for unit in self.houses:
+            once: int = 0
+            twice: int = 0
+            for cell in unit:
+                mask: int = candidates[cell]
+                twice |= once & mask
+                once |= mask
+            if once != self.full_mask:
+                return -1
+
+            hidden: int = once & ~twice
+            while hidden:
+                bit: int = hidden & -hidden
+                hidden ^= bit
+                for cell in unit:
+                    if candidates[cell] & bit:
+                        break
+                else:
+                    return -1
+                if candidates[cell] != bit:
+                    self.counts["hidden_single"] += 1
+                    if not self.assign(candidates, done, cell, bit):
+                        return -1
+                    progress = 1
+        return progress
+
+    def nakedSubsets(self, candidates: list[int], size: int, technique: str) -> int:
+        # `size` cells of a unit whose candidates together are exactly `size` digits
+        # own those digits, so no other cell of the unit can take them
+        for unit in self.units:
+            open_cells: list[int] = [cell for cell in unit if 2 <= candidates[cell].bit_count() <= size]
+            if len(open_cells) < size:
+                continue
+            for subset in combinations(open_cells, size):
+                union: int = 0
+                for cell in subset:
+                    union |= candidates[cell]
+                if union.bit_count() != size:
+                    continue
+
+                changed: bool = False
+                for cell in unit:
+                    if cell not in subset and candidates[cell] & union:
+                        candidates[cell] &= ~union
+                        self.eliminations += 1
+                        changed = True
+                        if candidates[cell] == 0:
+                            return -1
+                if changed:
+                    self.counts[technique] += 1
+                    return 1
+        return 0
+
+    def lockedCandidates(self, candidates: list[int]) -> int:
+        # A digit whose candidates in one house all lie in a second house too is removed
+        # from the rest of the second house. Pointing: from a box (or any other house
+        # that is not a line), e.g. onto a row. Claiming: from a line, e.g. onto a box.
+        houses: tuple[tuple[int, ...], ...] = self.houses
+        house_bits: tuple[int, ...] = self.house_bits
+        for position, unit in enumerate(houses):
+            technique: str = "claiming" if self.house_lines[position] else "pointing"
+            if technique not in self.techniques:
+                continue
+            digits: int = 0
+            for cell in unit:
+                mask: int = candidates[cell]
+                if mask & (mask - 1):
+                    digits |= mask
+
+            while digits:
+                bit: int = digits & -digits
+                digits ^= bit
+                common: int = ~(1 << position)
+                for cell in unit:
+                    if candidates[cell] & bit:
+                        common &= house_bits[cell]
+                while common > 0:
+                    other: int = common & -common
+                    common ^= other
+                    changed: bool = False
+                    for cell in houses[other.bit_length() - 1]:
+                        if cell not in unit and candidates[cell] & bit:
+                            candidates[cell] &= ~bit
+                            self.eliminations += 1
+                            changed = True
+                            if candidates[cell] == 0:
+                                return -1
+                    if changed:
+                        self.counts[technique] += 1
+                        return 1
+        return 0
+
+    def pickCell(self, candidates: list[int], done: bytearray) -> int:
+        # Open cell with the fewest candidates, or -1 when every cell is decided
+        best: int = -1
+        best_count: int = self.board_size + 1
+        for cell, mask in enumerate(candidates):
+            if done[cell]:
+                continue
+            count: int = mask.bit_count()
+            if count < best_count:
+                best, best_count = cell, count
+                if count <= 2:
+                    break
+        return best
+
+    def search(self, candidates: list[int], done: bytearray, resume: list[list[int]] | None = None) -> list[int] | None:
+        # Depth-first search that propagates after every guess. Every frame owns its
+        # own copy of the state, so backtracking is just dropping the frame.
+        # `resume` is a checkpoint (see on_checkpoint) of a search from the same state.
+        counters: tuple[dict[str, int], int] = (dict(self.counts), self.eliminations)
+        if not self.propagate(candidates, done):
+            return None
+        cell: int = self.pickCell(candidates, done)
+        if cell == -1:
+            return candidates
+
+        stack: list[tuple[list[int], bytearray, int, int]] = [(candidates, done, cell, candidates[cell])]
+        self.deepest = candidates
+        if resume:
+            stack = self.replay(candidates, done, resume)
+            # the replayed work was counted by the search that took the checkpoint
+            self.counts, self.eliminations = counters
+        while stack:
+            candidates, done, cell, remaining = stack.pop()
+            if remaining == 0:
+                continue
+
+            self.stopped = self.should_stop is not None and self.should_stop(self.counts["guess"])
+            if self.checkpoint_due is not None and (self.stopped or self.checkpoint_due(self.counts["guess"])):
+                self.on_checkpoint([[frame[2], frame[3]] for frame in stack] + [[cell, remaining]])
+            if self.stopped:
+                return None
+            bit: int = remaining & -remaining
+            stack.append((candidates, done, cell, remaining ^ bit))
+
+            child: list[int] = candidates[:]
+            child_done: bytearray = done[:]
+            self.counts["guess"] += 1
+            if self.sample_every and self.counts["guess"] % self.sample_every == 0 and self.on_sample is not None:
+                self.on_sample(self.counts["guess"], self.backtracks, len(stack))
+            if not self.assign(child, child_done, cell, bit) or not self.propagate(child, child_done):
+                self.backtracks += 1
+                continue
+
+            next_cell: int = self.pickCell(child, child_done)
+            if next_cell == -1:
+                return child
+            stack.append((child, child_done, next_cell, child[next_cell]))
+            if len(stack) > self.max_depth:
+                self.max_depth = len(stack)
+                self.deepest = child
+        return None
+
+    def replay(self, candidates: list[int], done: bytearray, frames: list[list[int]]) -> list[tuple[list[int], bytearray, int, int]]:
+        # Rebuild the search stack of a checkpoint from the propagated root state.
+        # Digits are tried lowest first, so the guess that led from one frame to the
+        # next is the highest digit of the cell that is no longer left to try.
+        stack: list[tuple[list[int], bytearray, int, int]] = []
+        for position, (cell, remaining) in enumerate(frames):
+            stack.append((candidates, done, cell, remaining))
+            if position + 1 < len(frames):
+                tried: int = candidates[cell] & ~remaining
+                candidates, done = candidates[:], done[:]
+                self.assign(candidates, done, cell, 1 << (tried.bit_length() - 1))
+                self.propagate(candidates, done)
+        return stack
+
+
+def solve_propagate(grid: CandidateGrid, propagator: Propagator | None = None, resume: list[list[int]] | None = None) -> bool:
+    # Solve the grid's board in place; technique counters are left on the propagator.
+    # The search never writes to the board, so a checkpoint only needs its frames.
+    # A search stopped by should_stop leaves the cells decided at its deepest point
+    # on the board.
+    if propagator is None:
+        propagator = Propagator(grid.board_size, layout=grid.layout)
+    candidates, done = propagator.load(grid)
+    solution: list[int] | None = propagator.search(candidates, done, resume)
+    if solution is None:
+        if propagator.stopped and propagator.deepest is not None:
+            cells = grid.cells
+            for cell, mask in enumerate(propagator.deepest):
+                if cells[cell] == 0 and mask and mask & (mask - 1) == 0:
+                    grid.placeAt(cell, mask.bit_length() - 1)
+        return False
+
+    cells = grid.cells
+    for cell, mask in enumerate(solution):
+        if cells[cell] == 0:
+            grid.placeAt(cell, mask.bit_length() - 1)
+    return True
@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+try:
+    from src.sudoku_cache import SolveCache
+    from src.sudoku_core import SudokuBoard
+    from src.sudoku_engine import STRATEGIES, SolveResult, SudokuEngine
+    from src.sudoku_io import parse_puzzle
+except ModuleNotFoundError:
+    from sudoku_cache import SolveCache
+    from sudoku_core import SudokuBoard
+    from sudoku_engine import STRATEGIES, SolveResult, SudokuEngine
+    from sudoku_io import parse_puzzle
+
+
+# Local HTTP/JSON solve service. Concurrent requests are coalesced into micro-batches
+# (a batch goes out when it is full or MAX_DELAY after its first puzzle) that run on
+# a process pool whose workers are started, and have their solver imported and
+# warmed up, before the first request is accepted. Every worker keeps a SolveCache.
+# Usage: python -m src.sudoku_service --port 8080 --workers 4
+#
+#   POST /solve  {"puzzle": "53..7...."}                  -> {"status": "solved", "solution": "534678..."}
+#   POST /solve  {"puzzles": ["53..7....", ...], "algorithm": "dlx", "timeout": 2}
+#                                                         -> {"results": [{"status": ..., "solution": ...}, ...]}
+#   GET  /health                                          -> {"status": "ok", "pending": 0, ...}
+#
+# A result's status is "solved", "unsolvable", "invalid" (with an "error" message) or
+# "timeout" (with the deepest "partial" assignment), when a single solve takes longer
+# than solve_limit seconds, so that no puzzle can hold on to a worker.
+# Requests that wait longer than their timeout get 504, and when more than
+# max_pending puzzles are queued new requests get 503 with a Retry-After header.
+
+# Puzzles per micro-batch, and how long the first puzzle of a batch waits for company
+MAX_BATCH: int = 64
+MAX_DELAY: float = 0.002
+
+DEFAULT_TIMEOUT: float = 10.0
+# Wall seconds one solve may take in a worker
+DEFAULT_SOLVE_LIMIT: float = 10.0
+MAX_BODY: int = 4 * 1024 * 1024
+
+REASONS: dict[int, str] = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+# ---------------------------
+# Worker side
+# ---------------------------
+
+# Per-process cache, created by the pool initializer
+_cache: SolveCache | None = None
+
+WARMUP_PUZZLE: str = "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79"
+
+
+def _warmUp(cache_bytes: int) -> None:
+    # Pool initializer: build the cache and run every strategy once, so that imports,
+    # table construction and the like are paid before the first request
+    global _cache
+    _cache = SolveCache(cache_bytes) if cache_bytes > 0 else None
+    for algorithm in STRATEGIES:
+        SudokuEngine(parse_puzzle(WARMUP_PUZZLE), algorithm).solve()
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def solve_puzzles(lines: list[str], algorithm: str, solve_limit: float = 0.0) -> list[dict]:
+    # One result dict per puzzle line; runs in a pool worker. Every solve stops after
+    # `solve_limit` seconds (0: no limit).
+    results: list[dict] = []
+    for line in lines:
+        try:
+            board: SudokuBoard = parse_puzzle(line)
+        except ValueError as error:
+            results.append({"status": "invalid", "error": str(error)})
+            continue
+        engine: SudokuEngine = SudokuEngine(board, algorithm)
+        if not engine.grid.isConsistent():
+            results.append({"status": "invalid", "error": "Invalid puzzle: conflicting givens"})
+            continue
+        result: SolveResult | None = _cache.get(board) if _cache is not None else None
+        if result is None:
+            puzzle: SudokuBoard = board.copy()
+            engine.setBudget(solve_limit)
+            result = engine.solve()
+            if _cache is not None:
+                _cache.put(puzzle, result)
+        if result.solved:
+            results.append({"status": "solved", "solution": result.board.toString()})
+        elif result.timed_out:
+            results.append({"status": "timeout", "partial": result.partial.toString()})
+        else:
+            results.append({"status": "unsolvable"})
+    return results
+
+
+# ---------------------------
+# Service side
+# ---------------------------
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: dict[str, str] | None = None) -> None:
+        super().__init__(message)
+        self.status: int = status
+        self.headers: dict[str, str] = headers or {}
+
+
+@dataclass
+class _Batch:
+    lines: list[str] = field(default_factory=list)
+    futures: list[asyncio.Future] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class SolveService:
+    # The batcher and the HTTP front end; start() warms the pool and opens the socket
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: int = os.cpu_count() or 1,
+        max_batch: int = MAX_BATCH,
+        max_delay: float = MAX_DELAY,
+        max_pending: int = 10_000,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache_bytes: int = 64 * 1024 * 1024,
+        solve_limit: float = DEFAULT_SOLVE_LIMIT,
+    ) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.workers: int = max(workers, 1)
+        self.max_batch: int = max_batch
+        self.max_delay: float = max_delay
+        self.max_pending: int = max_pending
+        self.timeout: float = timeout
+        self.cache_bytes: int = cache_bytes
+        self.solve_limit: float = solve_limit
+
+        self.pool: ProcessPoolExecutor | None = None
+        self.server: asyncio.AbstractServer | None = None
+        # puzzles accepted and not answered yet
+        self.pending: int = 0
+        self.batches: dict[str, _Batch] = {}
+        # at most 2 batches per worker run at a time; the rest wait here
+        self.slots: asyncio.Semaphore | None = None
+        self.solved: int = 0
+        self.started: float = 0.0
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warmUp, initargs=(self.cache_bytes,))
+        # one task per worker forces every process to start (and warm up) now
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ready) for _ in range(self.workers)))
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        self.server = await asyncio.start_server(self._handleConnection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started = time.monotonic()
+
+    async def serveForever(self) -> None:
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # Batching
+
+    def submit(self, lines: list[str], algorithm: str) -> list[asyncio.Future]:
+        # Queue puzzles for the next batch of their algorithm; raises 503 when full
+        if self.pending + len(lines) > self.max_pending:
+            raise HTTPError(503, "Too many pending puzzles, try again later", {"Retry-After": "1"})
+        loop = asyncio.get_running_loop()
+        futures: list[asyncio.Future] = []
+        for line in lines:
+            batch: _Batch = self.batches.setdefault(algorithm, _Batch())
+            future: asyncio.Future = loop.create_future()
+            batch.lines.append(line)
+            batch.futures.append(future)
+            futures.append(future)
+            self.pending += 1
+            if len(batch.lines) >= self.max_batch:
+                self._flush(algorithm)
+            elif batch.timer is None:
+                batch.timer = loop.call_later(self.max_delay, self._flush, algorithm)
+        return futures
+
+    def _flush(self, algorithm: str) -> None:
+        batch: _Batch | None = self.batches.pop(algorithm, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        asyncio.get_running_loop().create_task(self._run(batch, algorithm))
+
+    async def _run(self, batch: _Batch, algorithm: str) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async with self.slots:
+                results: list[dict] = await loop.run_in_executor(self.pool, solve_puzzles, batch.lines, algorithm, self.solve_limit)
+        except Exception as error:
+            results = [{"status": "error", "error": str(error)}] * len(batch.lines)
+        self.pending -= len(batch.lines)
+        self.solved += len(batch.lines)
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    # HTTP
+
+    async def _handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._readRequest(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload = await self._route(method, path, body)
+                    extra: dict[str, str] = {}
+                except HTTPError as error:
+                    status, payload, extra = error.status, {"error": str(error)}, error.headers
+                keep_alive: bool = headers.get("connection", "").lower() != "close"
+                self._respond(writer, status, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as error:
+            self._respond(writer, error.status, {"error": str(error)}, error.headers, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _readRequest(self, reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str], bytes] | None:
+        try:
+            head: bytes = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request headers too large") from None
+        lines: list[str] = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+        headers: dict[str, str] = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length: int = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(413, f"Request body larger than {MAX_BODY} bytes")
+        body: bytes = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, headers: dict[str, str], keep_alive: bool) -> None:
+        body: bytes = json.dumps(payload).encode("utf-8")
+        lines: list[str] = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return 200, {
+                "status": "ok",
+                "workers": self.workers,
+                "pending": self.pending,
+                "solved": self.solved,
+                "uptime": time.monotonic() - self.started,
+            }
+        if path != "/solve":
+            raise HTTPError(404, f"No such endpoint: {path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+        return 200, await self._solve(body)
+
+    async def _solve(self, body: bytes) -> dict:
+        try:
+            request = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPError(400, "Body is not valid JSON") from None
+        if not isinstance(request, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+
+        single: bool = "puzzle" in request
+        lines = [request["puzzle"]] if single else request.get("puzzles")
+        if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+            raise HTTPError(400, 'Expected "puzzle": string or "puzzles": [string, ...]')
+        algorithm = request.get("algorithm", "propagate")
+        if algorithm not in STRATEGIES:
+            raise HTTPError(400, f"Unknown algorithm {algorithm!r}, expected one of: {', '.join(sorted(STRATEGIES))}")
+        timeout = request.get("timeout", self.timeout)
+        if not isinstance(timeout, (int, float)) or timeout < 0:
+            raise HTTPError(400, '"timeout" must be a non-negative number of seconds')
+
+        futures: list[asyncio.Future] = self.submit([line.strip() for line in lines], algorithm)
+        try:
+            results: list[dict] = await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, f"Not solved within {timeout} s") from None
+        return results[0] if single else {"results": results}
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the sudoku solver over HTTP/JSON on localhost.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("-p", "--port", type=int, default=8080, help="port to listen on (0 for any free port)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="puzzles per micro-batch")
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY, help="seconds a batch waits to fill up")
+    parser.add_argument("--max-pending", type=int, default=10_000, help="queued puzzles before requests are refused")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="default per-request timeout in seconds")
+    parser.add_argument("--solve-limit", type=float, default=DEFAULT_SOLVE_LIMIT, help="seconds one solve may take (0 for no limit)")
+    parser.add_argument("--cache-mb", type=int, default=64, help="solve cache per worker in MiB (0 disables it)")
+    return parser.parse_args(argv)
+
+
+async def serve(arguments: argparse.Namespace) -> None:
+    service: SolveService = SolveService(
+        host=arguments.host,
+        port=arguments.port,
+        workers=arguments.workers,
+        max_batch=arguments.max_batch,
+        max_delay=arguments.max_delay,
+        max_pending=arguments.max_pending,
+        timeout=arguments.timeout,
+        cache_bytes=arguments.cache_mb * 1024 * 1024,
+        solve_limit=arguments.solve_limit,
+    )
+    await service.start()
+    print(f"Serving on http://{service.host}:{service.port} with {service.workers} workers", file=sys.stderr)
+    try:
+        await service.serveForever()
+    finally:
+        await service.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    try:
+        asyncio.run(serve(arguments))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
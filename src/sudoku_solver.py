@@ -1,35 +1,112 @@
-import copy
-from dataclasses import dataclass
+import time
+from dataclasses import replace
+from typing import Callable
 
 from PySide6.QtCore import Signal, QObject, QThread
 
 try:
-    from src.sudoku_visualizer import SudokuObserver
+    from src.sudoku_cache import SolveCache
+    from src.sudoku_core import CandidateGrid, SudokuBoard, SudokuState
+    from src.sudoku_engine import SudokuEngine, SolveResult, SolveSample, SolveStats
+    from src.sudoku_generator import generate_puzzle
+    from src.sudoku_trace import Trace, TracePlayer
 except ModuleNotFoundError:
-    from sudoku_visualizer import SudokuObserver
+    from sudoku_cache import SolveCache
+    from sudoku_core import CandidateGrid, SudokuBoard, SudokuState
+    from sudoku_engine import SudokuEngine, SolveResult, SolveSample, SolveStats
+    from sudoku_generator import generate_puzzle
+    from sudoku_trace import Trace, TracePlayer
 
 
-@dataclass
-class SudokuState:
-    board: list[list[int]]
-    original_board: list[list[int]] | None
-    board_size: int
-    box_size: int
-    horizontal_spacing: int
-    vertical_spacing: int
-    time_delay: float
-    clear_screen: int
-    no_of_newlines: int
+# Background solves report progress at most this often (seconds)
+PROGRESS_INTERVAL: float = 0.1
 
+
+class SolveWorker(QObject):
+    # Runs one engine solve on a worker thread. The engine works on its own copy of
+    # the board, so the GUI thread never sees a half-updated board; the result
+    # reaches it through the queued `done` signal.
+    progress: Signal = Signal(int, float, int) #placements, placements per second, depth
+    done: Signal = Signal(object) #SolveResult
+
+    def __init__(self, engine: SudokuEngine, algorithm: str) -> None:
+        super().__init__()
+        self.engine: SudokuEngine = engine
+        self.algorithm: str = algorithm
+        self._last_progress: float = 0.0
+        self.engine.sample_every = 2048
+        self.engine.addHook("sample", self._sampled)
+
+    def _sampled(self, sample: SolveSample) -> None:
+        if sample.elapsed - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = sample.elapsed
+        self.progress.emit(sample.placements, sample.placements / sample.elapsed, sample.depth)
+
+    def run(self) -> None:
+        self.done.emit(self.engine.solve(self.algorithm))
+
+    def cancel(self) -> None:
+        # Called from the GUI thread; the search notices within ~1000 placements
+        self.engine.cancel()
+
+
+class GenerateWorker(QObject):
+    # Creates a random puzzle on a worker thread, like SolveWorker; large boards take
+    # up to a minute. cancel() stops carving and keeps the clues removed so far, so
+    # a cancelled worker still delivers a puzzle with exactly one solution.
+    progress: Signal = Signal(int) #percent of the clues tried
+    done: Signal = Signal(object) #SudokuBoard
+
+    def __init__(self, board_size: int) -> None:
+        super().__init__()
+        self.board_size: int = board_size
+        self.cancelled: bool = False
+        self._percent: int = -1
+
+    def _progressed(self, tried: int, total: int) -> None:
+        percent: int = tried * 100 // total
+        if percent != self._percent:
+            self._percent = percent
+            self.progress.emit(percent)
+
+    def run(self) -> None:
+        self.done.emit(generate_puzzle(
+            board_size=self.board_size,
+            should_stop=lambda: self.cancelled,
+            on_progress=self._progressed,
+        ))
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+# Qt adapter over the headless SudokuEngine: it turns the engine's changes into signals
 class SudokuSolver(QObject):
     #signal for when a board value gets changed
     value_changed: Signal = Signal(int, int, int) #row, column, value
 
+    #coalesced changes of a stepped solve: [(row, column, value), ...], latest value per cell
+    cells_changed: Signal = Signal(list)
+
     finished: Signal = Signal()
 
+    #progress of a background solve: placements, placements per second, depth
+    progress: Signal = Signal(int, float, int)
+
+    #setBoard() switched to a board of another size
+    board_resized: Signal = Signal(int) #board size
+
+    #progress of generatePuzzle(), in percent, and the new puzzle is on the board
+    generate_progress: Signal = Signal(int)
+    generated: Signal = Signal()
+
+    #the replay of an open trace moved to another event
+    trace_moved: Signal = Signal(int) #position
+
     def __init__(
         self,
-        board: list[list[int]],
+        board: SudokuBoard | list[list[int]],
         show_process: bool = False,
         horizontal_spacing: int = 2,
         vertical_spacing: int = 1,
@@ -37,18 +114,23 @@ class SudokuSolver(QObject):
         clear_screen: bool = True,
         no_of_newlines: int = 2,
         algorithm: str = "backtrack",
+        cell_order: str = "row-major",
+        value_order: str = "ascending",
+        cache: SolveCache | None = None,
     ) -> None:
         
         super().__init__()
 
-        original_board: list[list[int]] = copy.deepcopy(board)
-        board_size: int = len(board)
-        box_size: int = int(board_size ** (1 / 2))
+        # cells changed by steps since the last flushChanges(), flat index -> value
+        self._pending: dict[int, int] = {}
+
+        self._attachEngine(SudokuEngine(board, algorithm, cell_order, value_order))
+        board = self.engine.board
         self.state: SudokuState = SudokuState(
             board,
-            original_board,
-            board_size,
-            box_size,
+            board.copy(),
+            board.board_size,
+            board.box_size,
             horizontal_spacing,
             vertical_spacing,
             time_delay,
@@ -56,15 +138,36 @@ class SudokuSolver(QObject):
             no_of_newlines
         )
         self.algorithm: str = algorithm
+        #cell order of 9x9 and smaller boards (larger ones always step with "mrv")
+        self.cell_order: str = cell_order
         self.show_process: bool = show_process
+        #fast solves are looked up in (and added to) this cache
+        self.cache: SolveCache | None = cache
+
+        self._thread: QThread | None = None
+        self._worker: SolveWorker | GenerateWorker | None = None
+        self._puzzle: SudokuBoard | None = None
+
+        #replay of a recorded solve on the board (see openTrace())
+        self.trace_player: TracePlayer | None = None
+
+    def _attachEngine(self, engine: SudokuEngine) -> None:
+        self.engine: SudokuEngine = engine
+        self.engine.on_change = self._recordChange
+        self.grid: CandidateGrid = self.engine.grid
+        self._pending.clear()
 
-        self._backtrack_stack = []
+    @property
+    def stats(self) -> SolveStats:
+        # Counters and timings of the last (or running) solve
+        return self.engine.stats
 
     def setCellValue(self, row: int, column: int, value: int):
         if self.isMoveValid((row, column), value):
-            self.state.board[row][column] = value
+            self.grid.erase(row, column)
+            self.grid.place(row, column, value)
         elif value == 0:
-            self.state.board[row][column] = 0
+            self.grid.erase(row, column)
         else:
             return False
         return True
@@ -79,92 +182,256 @@ class SudokuSolver(QObject):
         # Check if the puzzle has invalid non-zero values
         for y in range(self.state.board_size):
             for x in range(self.state.board_size):
-                value = self.state.board[y][x]
+                value = self.state.board[y, x]
                 if value != 0 and not self.isMoveValid((y, x), value):
                     raise Exception(
                         f"Invalid board: Conflict at (row:{y}, col:{x}) with value {value}"
                     )
                 
     def clearBoard(self):
+        self.trace_player = None
+        self.state.board.clear()
+        self.grid.load()
         for y in range(self.state.board_size):
             for x in range(self.state.board_size):
-                self.state.board[y][x] = 0
                 self.value_changed.emit(y, x, 0)
 
+    def setBoard(self, board: SudokuBoard) -> None:
+        # Replace the puzzle (e.g. with a generated one). A board of another size gets
+        # a new engine and board_resized is emitted before the values.
+        self.trace_player = None
+        if board.board_size != self.state.board_size:
+            # row-major stepping gets lost on 16x16 and larger boards
+            cell_order: str = self.cell_order if board.board_size <= 9 else "mrv"
+            self._attachEngine(SudokuEngine(board.copy(), self.algorithm, cell_order, self.engine.value_order))
+            self.state = replace(
+                self.state,
+                board=self.engine.board,
+                original_board=self.engine.board.copy(),
+                board_size=board.board_size,
+                box_size=board.box_size,
+            )
+            self.board_resized.emit(board.board_size)
+        self.state.board.restore(board.snapshot())
+        self.state.original_board.restore(board.snapshot())
+        self.grid.load()
+        for index, value in enumerate(self.state.board.cells):
+            self.value_changed.emit(*divmod(index, self.state.board_size), value)
+
     def isMoveValid(self, position: tuple[int, int], number: int) -> bool:
         if number > self.state.board_size or number < 1:
             return False
-        
-        pos_x: int = position[1]
-        pos_y: int = position[0]
-
-        # Check whether column has same number
-        for y in range(self.state.board_size):
-            if self.state.board[y][pos_x] == number and pos_y != y:
-                return False
-        # Check whether row has same number
-        for x in range(self.state.board_size):
-            if self.state.board[pos_y][x] == number and pos_x != x:
-                return False
-
-        # Check whether square has same number
-        box_x: int = pos_x // self.state.box_size
-        box_y: int = pos_y // self.state.box_size
-
-        for y in range(
-            box_y * self.state.box_size,
-            (box_y * self.state.box_size) + self.state.box_size,
-        ):
-            for x in range(
-                box_x * self.state.box_size,
-                (box_x * self.state.box_size) + self.state.box_size,
-            ):
-                if self.state.board[y][x] == number and (y, x) != position:
-                    return False
 
-        return True
+        row, column = position
+        # The masks include the cell's own value, so fall back to scanning the peers
+        # when the cell already holds the number being checked
+        if self.state.board[row, column] == number:
+            return not self.grid.peerHas(row, column, number)
+        return self.grid.isLegal(row, column, number)
 
     def findEmpty(self) -> tuple[int, int] | None:
-        for y in range(self.state.board_size):
-            for x in range(self.state.board_size):
-                if self.state.board[y][x] == 0:
-                    return (y, x)
-        return None
+        return self.grid.firstEmpty()
     
-    def _step(self):
-        if not self._backTrackStep():
+    def _recordChange(self, row: int, column: int, value: int) -> None:
+        self._pending[row * self.state.board_size + column] = value
+
+    def flushChanges(self) -> None:
+        # Push the changes collected since the last flush as a single signal
+        if not self._pending:
+            return
+        board_size: int = self.state.board_size
+        changes: list[tuple[int, int, int]] = [(*divmod(index, board_size), value) for index, value in self._pending.items()]
+        self._pending.clear()
+        self.cells_changed.emit(changes)
+
+    def openTrace(self, trace: Trace) -> None:
+        # Show a recorded solve instead of solving: the board becomes the trace's
+        # puzzle, and seekTrace()/replaySteps() move it through the recorded search
+        self.setBoard(trace.boardAt(0))
+        self.trace_player = TracePlayer(trace, self.state.board)
+        self.trace_moved.emit(0)
+
+    def seekTrace(self, position: int) -> None:
+        # Jump to any event of the open trace (scrubbing), with one cells_changed
+        for row, column, value in self.trace_player.seek(position):
+            self._pending[row * self.state.board_size + column] = value
+        self.grid.load()
+        self.flushChanges()
+        self.trace_moved.emit(self.trace_player.position)
+
+    def replaySteps(self, count: int = 1) -> bool:
+        # The trace counterpart of runSteps(): `count` events on (back when negative).
+        # Returns False (and emits finished) at either end of the trace.
+        self.seekTrace(self.trace_player.position + count)
+        running: bool = self.trace_player.position != (len(self.trace_player.trace) if count > 0 else 0)
+        if not running:
             self.finished.emit()
+        return running
 
-    def solve(self):
-        start = self.findEmpty()
-        if start is None:
-            print(None)
+    def runSteps(self, max_steps: int | None = None, max_seconds: float | None = None) -> bool:
+        # Advance a stepped solve by up to `max_steps` steps and/or for about `max_seconds`,
+        # then flush the changes once. Returns False (and emits finished) when the search is over.
+        deadline: float | None = time.perf_counter() + max_seconds if max_seconds is not None else None
+        steps: int = 0
+        running: bool = True
+        while running:
+            running = self.engine.step()
+            steps += 1
+            if steps == max_steps:
+                break
+            # the clock is only read every 256 steps
+            if deadline is not None and steps & 255 == 0 and time.perf_counter() >= deadline:
+                break
+        self.flushChanges()
+        if not running:
             self.finished.emit()
+        return running
+
+    def _step(self):
+        self.runSteps(max_steps=1)
+
+    def solve(self, mode: str = "fast", algorithm: str | None = None) -> SolveResult | None:
+        # "fast" runs the whole search in one call (with `algorithm`, defaulting to the
+        # one given to the constructor), "step" only seeds a backtracking search so
+        # that runSteps() can be driven by a timer, and "background" solves on a worker
+        # thread (finished is emitted once the result is back on this thread)
+        if mode == "step":
+            if not self.engine.start():
+                self.finished.emit()
+            return None
+        if mode == "background":
+            self._solveInBackground(algorithm or self.algorithm)
+            return None
+
+        board: SudokuBoard = self.state.board
+        before: bytes = board.snapshot()
+        result: SolveResult | None = self.cache.get(board) if self.cache is not None else None
+        if result is not None:
+            self.engine.stats = result.stats
+            self.engine.solved = result.solved
+            if result.solved:
+                board.restore(result.board.snapshot())
+                self.grid.load()
+        else:
+            puzzle: SudokuBoard | None = board.copy() if self.cache is not None else None
+            result = self.engine.solve(algorithm)
+            if puzzle is not None:
+                self.cache.put(puzzle, result)
+        self.state.technique_counts = dict(result.stats.techniques)
+        for index, value in enumerate(board.cells):
+            if value != before[index]:
+                self.value_changed.emit(*divmod(index, board.board_size), value)
+        self.finished.emit()
+        return result
+
+    def _solveInBackground(self, algorithm: str) -> None:
+        # A cache hit is answered right away, without a thread
+        if self._thread is not None:
             return
+        if self.cache is not None:
+            result: SolveResult | None = self.cache.get(self.state.board)
+            if result is not None:
+                self._applyResult(result)
+                return
+        #the puzzle as it was when the solve started, for the cache
+        self._puzzle = self.state.board.copy() if self.cache is not None else None
+        engine: SudokuEngine = SudokuEngine(
+            self.state.board.copy(),
+            algorithm,
+            self.engine.cell_order,
+            self.engine.value_order,
+        )
+        self._startThread(SolveWorker(engine, algorithm), self.progress, self._backgroundDone)
 
-        self._backtrack_stack.append((start[0], start[1], 1))
+    def _startThread(self, worker: SolveWorker | GenerateWorker, progress: Signal, done: Callable[[object], None]) -> None:
+        self._thread = QThread()
+        self._worker = worker
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.progress.connect(progress)
+        self._worker.done.connect(self._thread.quit)
+        self._worker.done.connect(done)
+        self._thread.start()
 
-    def _backTrackStep(self):       
-        if len(self._backtrack_stack) == 0:
-            return False
-        
-        row, column, number = self._backtrack_stack.pop()
+    def generatePuzzle(self, board_size: int | None = None) -> None:
+        # Create a random puzzle (of the current size by default) on a worker thread;
+        # it replaces the board through setBoard() and `generated` is emitted.
+        # cancel() cuts the generation short.
+        if self._thread is not None:
+            return
+        self._startThread(GenerateWorker(board_size or self.state.board_size), self.generate_progress, self._generatedDone)
+
+    def _generatedDone(self, board: SudokuBoard) -> None:
+        if self._thread is None:
+            return
+        self._joinThread()
+        self._thread = None
+        self._worker = None
+        self.setBoard(board)
+        self.generated.emit()
 
-        if self.isMoveValid((row, column), number):
-            self.state.board[row][column] = number
-            self.value_changed.emit(row, column, number)
+    def _backgroundDone(self, result: SolveResult) -> None:
+        # Runs on the GUI thread: copy the solution in and report the changes
+        if self._thread is None:
+            # shutdown() already waited for the thread, the result is not wanted
+            return
+        self._joinThread()
+        self._thread = None
+        self._worker = None
+        if self._puzzle is not None:
+            self.cache.put(self._puzzle, result)
+            self._puzzle = None
+        self._applyResult(result)
 
-            self._backtrack_stack.append((row, column, number + 1))
+    def _applyResult(self, result: SolveResult) -> None:
+        # Copy a background (or cached) solution in and report the changes
+        self.engine.stats = result.stats
+        self.engine.solved = result.solved
+        self.state.technique_counts = dict(result.stats.techniques)
+        if result.solved:
+            board: SudokuBoard = self.state.board
+            before: bytes = board.snapshot()
+            board.restore(result.board.snapshot())
+            self.grid.load()
+            for index, value in enumerate(board.cells):
+                if value != before[index]:
+                    self._pending[index] = value
+            self.flushChanges()
+        self.finished.emit()
 
-            new_cell = self.findEmpty()
-            if new_cell is None:
-                return False
-            self._backtrack_stack.append((new_cell[0], new_cell[1], 1))
-        else:
-            if number < self.state.board_size:
-                self._backtrack_stack.append((row, column, number + 1))
-            else:
-                self.state.board[row][column] = 0
-                self.value_changed.emit(row, column, 0)
+    def isSolving(self) -> bool:
+        return self._thread is not None
+
+    def cancel(self) -> None:
+        # Stop a background solve (finished follows once the worker has returned) or
+        # cut a puzzle generation short
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def shutdown(self) -> None:
+        # Stop a background solve or generation and wait for its thread, so that Qt does not destroy
+        # a running QThread when the application quits
+        if self._thread is None:
+            return
+        self.cancel()
+        # the done -> quit connection is queued to this thread, which is not going
+        # back to its event loop, so quit directly
+        self._thread.quit()
+        self._joinThread()
+        self._thread = None
+        self._worker = None
+        self._puzzle = None
+
+    def _joinThread(self) -> None:
+        # QThread.wait() holds the GIL, so a worker still running Python could never
+        # finish; sleep (which releases it) until the thread is out of Python code
+        while self._thread.isRunning():
+            time.sleep(0.005)
+        self._thread.wait()
+
+    def countSolutions(self, limit: int = 2) -> int:
+        # Solutions of the current board, up to `limit`; the board is left as it is
+        return self.engine.countSolutions(limit)
 
-        return True
\ No newline at end of file
+    def _backTrackStep(self):
+        return self.engine.step()
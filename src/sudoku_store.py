@@ -0,0 +1,324 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from typing import Iterable, Iterator
+
+try:
+    from src.sudoku_core import SudokuBoard, parse_symbols
+    from src.sudoku_engine import STRATEGIES, SudokuEngine
+    from src.sudoku_io import read_puzzles, write_lines
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard, parse_symbols
+    from sudoku_engine import STRATEGIES, SudokuEngine
+    from sudoku_io import read_puzzles, write_lines
+
+
+# Binary puzzle store: a 16-byte header followed by fixed-size records, so record N
+# starts at HEADER.size + N * record_size and reading it is one slice of the mapped
+# file. A record is a status byte, the puzzle cells and the solution cells.
+# With "byte" packing every cell is one byte and puzzles/solutions come back as
+# zero-copy SudokuBoard views of the mapping (writable ones when the store is opened
+# for writing, so a solver can fill a solution straight into the file). "nibble"
+# packing (boards up to 15x15) halves the size; its boards are unpacked copies.
+# Usage:
+#   python -m src.sudoku_store import puzzles.txt corpus.sdk [--packing nibble]
+#   python -m src.sudoku_store solve corpus.sdk [-a dlx]
+#   python -m src.sudoku_store export corpus.sdk [--solutions] [-o out.txt]
+
+MAGIC: bytes = b"SDKSTORE"
+VERSION: int = 1
+# magic, version, board size, packing (0 = byte, 1 = nibble), 5 reserved bytes
+HEADER: struct.Struct = struct.Struct("<8sBBB5x")
+PACKINGS: tuple[str, ...] = ("byte", "nibble")
+
+# Record status byte
+UNSOLVED: int = 0
+SOLVED: int = 1
+UNSOLVABLE: int = 2
+INVALID: int = 3  # the source line could not be parsed; the puzzle cells are blank
+
+_HIGH: bytes = bytes(byte >> 4 for byte in range(256))
+_LOW: bytes = bytes(byte & 0x0F for byte in range(256))
+
+
+def _pack(cells: bytes) -> bytes:
+    # Two cells per byte, first cell in the high nibble. Shifting the whole number
+    # left by 4 moves every cell of `high` into its byte's high nibble at once.
+    high: bytes = cells[0::2]
+    low: bytes = cells[1::2].ljust(len(high), b"\x00")
+    return ((int.from_bytes(high, "big") << 4) | int.from_bytes(low, "big")).to_bytes(len(high), "big")
+
+
+def _unpack(data: bytes, cell_count: int) -> bytes:
+    cells: bytearray = bytearray(2 * len(data))
+    cells[0::2] = data.translate(_HIGH)
+    cells[1::2] = data.translate(_LOW)
+    return bytes(cells[:cell_count])
+
+
+class PuzzleStore:
+    # Reader (and in-place updater with writable=True) over a memory-mapped store.
+    # Board views keep the mapping alive: drop them before calling close().
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path: str = path
+        self.writable: bool = writable
+        self.file = open(path, "r+b" if writable else "rb")
+        header: bytes = self.file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            self.file.close()
+            raise ValueError(f"Invalid puzzle store {path}: file is too short")
+        magic, version, self.board_size, packing = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or packing >= len(PACKINGS):
+            self.file.close()
+            raise ValueError(f"Invalid puzzle store {path}: unknown header")
+        self.packing: str = PACKINGS[packing]
+        self.cell_count: int = self.board_size * self.board_size
+        self.field_size: int = self.cell_count if self.packing == "byte" else (self.cell_count + 1) // 2
+        self.record_size: int = 1 + 2 * self.field_size
+
+        size: int = os.fstat(self.file.fileno()).st_size
+        self.count: int = (size - HEADER.size) // self.record_size
+        self.map: mmap.mmap | None = None
+        self.view: memoryview | None = None
+        if size > HEADER.size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+            self.view = memoryview(self.map)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _offset(self, index: int) -> int:
+        if not 0 <= index < self.count:
+            raise IndexError(f"record {index} out of range for a store of {self.count}")
+        return HEADER.size + index * self.record_size
+
+    def _board(self, start: int) -> SudokuBoard:
+        if self.packing == "byte":
+            return SudokuBoard(self.view[start:start + self.field_size], self.board_size)
+        board: SudokuBoard = SudokuBoard.empty(self.board_size)
+        board.restore(_unpack(bytes(self.view[start:start + self.field_size]), self.cell_count))
+        return board
+
+    def status(self, index: int) -> int:
+        return self.view[self._offset(index)]
+
+    def puzzle(self, index: int) -> SudokuBoard:
+        return self._board(self._offset(index) + 1)
+
+    def solution(self, index: int) -> SudokuBoard | None:
+        # The stored solution, None unless the record is SOLVED
+        offset: int = self._offset(index)
+        if self.view[offset] != SOLVED:
+            return None
+        return self._board(offset + 1 + self.field_size)
+
+    def setSolution(self, index: int, solution: SudokuBoard | None, status: int = SOLVED) -> None:
+        offset: int = self._offset(index)
+        start: int = offset + 1 + self.field_size
+        if solution is not None:
+            cells: bytes = solution.snapshot()
+            self.view[start:start + self.field_size] = cells if self.packing == "byte" else _pack(cells)
+        self.view[offset] = status
+
+    def solveRecord(self, index: int, algorithm: str = "propagate") -> int:
+        # Solve record `index` and store the result; returns the new status. With byte
+        # packing the engine works directly on the solution cells in the mapping.
+        status: int = self.status(index)
+        if status != UNSOLVED:
+            return status
+        offset: int = self._offset(index)
+        # slice of the mapping the board lives in (byte packing); it is released
+        # even when the solve raises, as a live slice keeps close() from unmapping
+        cells: memoryview | None = None
+        try:
+            if self.packing == "byte":
+                start: int = offset + 1 + self.field_size
+                self.view[start:start + self.field_size] = self.view[offset + 1:start]
+                cells = self.view[start:start + self.field_size]
+                board: SudokuBoard = SudokuBoard(cells, self.board_size)
+            else:
+                board = self.puzzle(index)
+            engine: SudokuEngine = SudokuEngine(board, algorithm)
+            solved: bool = engine.grid.isConsistent() and engine.solve().solved
+        finally:
+            if cells is not None:
+                cells.release()
+        if not solved:
+            self.setSolution(index, None, UNSOLVABLE)
+            return UNSOLVABLE
+        self.setSolution(index, None if self.packing == "byte" else board, SOLVED)
+        return SOLVED
+
+    def flush(self) -> None:
+        if self.map is not None and self.writable:
+            self.map.flush()
+
+    def close(self) -> None:
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.map is not None:
+            self.flush()
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+
+class PuzzleStoreWriter:
+    # Append-only writer; creates the file (and header) or appends to an existing
+    # store with the same board size and packing
+
+    def __init__(self, path: str, board_size: int = 9, packing: str = "byte") -> None:
+        if packing not in PACKINGS:
+            raise ValueError(f"Unknown packing {packing!r}, expected one of: {', '.join(PACKINGS)}")
+        if packing == "nibble" and board_size > 15:
+            raise ValueError("Nibble packing only holds boards up to 15x15")
+        if board_size > 255:
+            raise ValueError("Puzzle stores hold boards up to 255x255")
+        self.board_size: int = board_size
+        self.packing: str = packing
+        self.cell_count: int = board_size * board_size
+        self.field_size: int = self.cell_count if packing == "byte" else (self.cell_count + 1) // 2
+        header: bytes = HEADER.pack(MAGIC, VERSION, board_size, PACKINGS.index(packing))
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as existing:
+                if existing.read(HEADER.size) != header:
+                    raise ValueError(f"Puzzle store {path} has another board size or packing")
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(header)
+        self.blank: bytes = bytes(self.field_size)
+
+    def __enter__(self) -> "PuzzleStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _field(self, cells: bytes) -> bytes:
+        return cells if self.packing == "byte" else _pack(cells)
+
+    def appendCells(self, cells: bytes, solution: bytes | None = None, status: int | None = None) -> None:
+        # cells: one byte per cell (as SudokuBoard.snapshot() or parse_symbols give them)
+        if len(cells) != self.cell_count:
+            raise ValueError(f"Invalid board: expected {self.cell_count} cells, got {len(cells)}")
+        if status is None:
+            status = UNSOLVED if solution is None else SOLVED
+        self.file.write(bytes((status,)))
+        self.file.write(self._field(cells))
+        self.file.write(self.blank if solution is None else self._field(solution))
+
+    def append(self, board: SudokuBoard, solution: SudokuBoard | None = None) -> None:
+        if board.board_size != self.board_size:
+            raise ValueError("Invalid board: board size does not match the store")
+        self.appendCells(board.snapshot(), None if solution is None else solution.snapshot())
+
+    def appendInvalid(self) -> None:
+        # Placeholder for an unparsable line, so record numbers keep matching line numbers
+        self.appendCells(bytes(self.cell_count), status=INVALID)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def import_text(lines: Iterable[str], path: str, board_size: int = 9, packing: str = "byte") -> int:
+    # Append the puzzle lines (see sudoku_io) to the store at `path`; returns the number of records written
+    count: int = 0
+    cell_count: int = board_size * board_size
+    with PuzzleStoreWriter(path, board_size, packing) as writer:
+        for line in read_puzzles(lines):
+            try:
+                cells: bytes = parse_symbols(line)
+            except ValueError:
+                cells = b""
+            if len(cells) == cell_count and max(cells) <= board_size:
+                writer.appendCells(cells)
+            else:
+                writer.appendInvalid()
+            count += 1
+    return count
+
+
+def export_text(path: str, solutions: bool = False) -> Iterator[str]:
+    # Puzzle lines, or with `solutions` one answer per record in the CLI's format
+    with PuzzleStore(path) as store:
+        for index in range(len(store)):
+            status: int = store.status(index)
+            if not solutions:
+                yield store.puzzle(index).toString()
+            elif status == SOLVED:
+                yield store.solution(index).toString()
+            elif status == UNSOLVABLE:
+                yield "unsolvable"
+            elif status == INVALID:
+                yield "Invalid puzzle"
+            else:
+                yield "unsolved"
+
+
+def solve_store(path: str, algorithm: str = "propagate") -> dict[int, int]:
+    # Solve every unsolved record in place; returns the number of records per status
+    counts: dict[int, int] = dict.fromkeys((UNSOLVED, SOLVED, UNSOLVABLE, INVALID), 0)
+    with PuzzleStore(path, writable=True) as store:
+        for index in range(len(store)):
+            counts[store.solveRecord(index, algorithm)] += 1
+    return counts
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert, solve and export binary puzzle stores.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="append a text puzzle file to a store")
+    importer.add_argument("input", help="puzzle file, one puzzle per line ('-' for stdin)")
+    importer.add_argument("store", help="store file (created if missing)")
+    importer.add_argument("-s", "--board-size", type=int, default=9, help="board size")
+    importer.add_argument("--packing", choices=PACKINGS, default="byte", help="cell packing of a new store")
+
+    solver = commands.add_parser("solve", help="solve every unsolved record in place")
+    solver.add_argument("store", help="store file")
+    solver.add_argument("-a", "--algorithm", default="propagate", choices=sorted(STRATEGIES), help="search strategy")
+
+    exporter = commands.add_parser("export", help="write the puzzles (or solutions) as text")
+    exporter.add_argument("store", help="store file")
+    exporter.add_argument("-o", "--output", default="-", help="text file ('-' for stdout)")
+    exporter.add_argument("--solutions", action="store_true", help="write the solutions instead of the puzzles")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    if arguments.command == "import":
+        source = sys.stdin if arguments.input == "-" else open(arguments.input, encoding="utf-8")
+        try:
+            count: int = import_text(source, arguments.store, arguments.board_size, arguments.packing)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(f"{count} puzzles written to {arguments.store}", file=sys.stderr)
+    elif arguments.command == "solve":
+        counts: dict[int, int] = solve_store(arguments.store, arguments.algorithm)
+        print(f"{counts[SOLVED]} solved, {counts[UNSOLVABLE]} unsolvable, {counts[INVALID]} invalid", file=sys.stderr)
+    else:
+        target = sys.stdout if arguments.output == "-" else open(arguments.output, "w", encoding="utf-8")
+        try:
+            write_lines(target, export_text(arguments.store, arguments.solutions))
+        finally:
+            if target is not sys.stdout:
+                target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import sys
+import time
+from typing import ClassVar
+
+try:
+    from src.sudoku_core import SudokuBoard, SudokuState, to_symbol
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard, SudokuState, to_symbol
+
+
+# Terminal output; kept apart from sudoku_visualizer so that it works without Qt
+
+
+class ANSIColors:
+    YELLOW_BOLD: ClassVar[str]  = "\033[1;33m"
+    GREEN_BOLD:  ClassVar[str]  = "\033[1;32m"
+    WHITE_BOLD:  ClassVar[str]  = "\033[1;37m"
+    END:         ClassVar[str]  = "\033[0m"
+
+
+class SudokuObserver:
+
+    def run(self):
+        pass
+
+    def renderUI(self):
+        pass
+
+
+class SudokuTerminalVisualizer(SudokuObserver):
+    # Incremental renderer: the first frame draws the whole board, later frames only
+    # move the cursor to the cells that changed since the last drawn frame and rewrite
+    # those. Every frame is one write to the stream. With `fps`, frames that come in
+    # faster than that are skipped (the next drawn frame catches up on every change).
+    def __init__(self, time_delay: int = 0, fps: float = 0, stream=None):
+        self.stream = stream or sys.stdout
+        self.time_delay = time_delay
+        self.fps: float = fps
+        self.drawn: list[int] | None = None  # cell values of the last drawn frame
+        self.last_frame: float = 0.0
+        self.stream.write("\033[2J\033[H")
+        self.stream.flush()
+
+    def invalidate(self):
+        # Redraw the whole board on the next frame (after a resize or foreign output)
+        self.drawn = None
+
+    def print(self, state, force: bool = False):
+        now: float = time.perf_counter()
+        if not force and self.fps > 0 and self.drawn is not None and now - self.last_frame < 1 / self.fps:
+            return
+        self.last_frame = now
+
+        cells = state.board.cells
+        frame: str = self.fullFrame(state) if self.drawn is None or len(self.drawn) != len(cells) else self.diffFrame(state)
+        self.drawn = list(cells)
+        if frame:
+            self.stream.write(frame)
+            self.stream.flush()
+
+        if self.time_delay > 0:
+            time.sleep(self.time_delay)
+
+    def replayTrace(self, player, speed: float = 1000.0, end: int | None = None) -> None:
+        # Play a recorded solve (a sudoku_trace.TracePlayer) from its current position
+        # to `end` (the last event by default; an earlier one plays backwards) at
+        # `speed` events per second, one frame per 1 / fps seconds. speed=0 jumps
+        # straight to `end`.
+        board: SudokuBoard = player.board
+        puzzle: SudokuBoard = board.copy()
+        puzzle.restore(player.trace.puzzle)
+        state: SudokuState = SudokuState(board, puzzle, board.board_size, board.box_size, 2, 1, 0, True, 2)
+        end = len(player.trace) if end is None else max(0, min(end, len(player.trace)))
+        direction: int = 1 if end >= player.position else -1
+        per_frame: int = abs(end - player.position)
+        if speed > 0:
+            # without a frame rate every event is drawn
+            per_frame = max(1, round(speed / self.fps)) if self.fps > 0 else 1
+        self.print(state, force=True)
+        next_frame: float = time.perf_counter()
+        while player.position != end:
+            target: int = player.position + direction * per_frame
+            player.seek(min(target, end) if direction > 0 else max(target, end))
+            self.print(state, force=True)
+            if speed > 0:
+                next_frame += per_frame / speed
+                time.sleep(max(0.0, next_frame - time.perf_counter()))
+
+    def cellWidth(self, state) -> int:
+        # Wide enough for the largest symbol plus a space
+        return max(state.horizontal_spacing, len(to_symbol(state.board_size)) + 1)
+
+    def cellText(self, state, index: int, width: int) -> str:
+        value: int = state.board.cells[index]
+        if value == 0:  # Empty cells
+            return f"{ANSIColors.YELLOW_BOLD}{'-':<{width}}{ANSIColors.END}"
+        original = state.original_board
+        if original is not None and value != original.cells[index]:  # solution values
+            return f"{ANSIColors.GREEN_BOLD}{to_symbol(value):<{width}}{ANSIColors.END}"
+        return f"{ANSIColors.WHITE_BOLD}{to_symbol(value):<{width}}{ANSIColors.END}"  # given numbers
+
+    def cellPosition(self, state, index: int, width: int) -> tuple[int, int]:
+        # 1-based terminal (line, column) of a cell: every box boundary above/left of
+        # it adds a separator line/column
+        y, x = divmod(index, state.board_size)
+        return y + y // state.box_size + 2, (x + x // state.box_size + 1) * width + 1
+
+    def fullFrame(self, state) -> str:
+        size, box = state.board_size, state.box_size
+        width: int = self.cellWidth(state)
+        # One column per cell and per box separator, plus the closing |
+        line: str = f"{ANSIColors.WHITE_BOLD}{'-' * ((size + size // box) * width + 1)}{ANSIColors.END}\n"
+        separator: str = f"{ANSIColors.WHITE_BOLD}{'|':<{width}}{ANSIColors.END}"
+        parts: list[str] = ["\033[H"]
+        for y in range(size):
+            if y % box == 0:
+                parts.append(line)
+            for x in range(size):
+                if x % box == 0:
+                    parts.append(separator)
+                parts.append(self.cellText(state, y * size + x, width))
+            parts.append(f"{ANSIColors.WHITE_BOLD}|{ANSIColors.END}\n")
+        parts.append(line.rstrip("\n"))
+        return "".join(parts)
+
+    def diffFrame(self, state) -> str:
+        width: int = self.cellWidth(state)
+        parts: list[str] = []
+        for index, (value, drawn) in enumerate(zip(state.board.cells, self.drawn)):
+            if value == drawn:
+                continue
+            line, column = self.cellPosition(state, index, width)
+            parts.append(f"\033[{line};{column}H{self.cellText(state, index, width)}")
+        if parts:
+            # park the cursor at the end of the board, where a full frame leaves it
+            parts.append(f"\033[{state.board_size + state.board_size // state.box_size + 1};1H")
+        return "".join(parts)
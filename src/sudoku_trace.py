@@ -0,0 +1,317 @@
+import argparse
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
+try:
+    from src.sudoku_core import SudokuBoard
+except ModuleNotFoundError:
+    from sudoku_core import SudokuBoard
+
+
+# Solve traces: every change a backtracking search makes to the board, recorded as
+# it happens (see SudokuEngine.setTrace) so that the solve can be shown later, at
+# any speed, forwards or backwards, without running the solver again.
+# File layout: a fixed header, the puzzle (SudokuBoard.snapshot()) and then one
+# varint per event. An event sets a cell to a value (0 = the cell is emptied); it
+# is stored as zigzag(cell - previous event's cell) * (board_size + 1) + value, so
+# the short jumps of a backtracking search take one or two bytes per event.
+# The writer streams: events are buffered and appended to the file every
+# FLUSH_BYTES, and the event count is not stored, so a trace of a solve that
+# crashed (or is still running) can be read up to its last flush.
+# Usage: python -m src.sudoku_trace record "<puzzle>" solve.trace
+#        python -m src.sudoku_trace replay solve.trace --speed 2000
+#        python -m src.sudoku_trace info solve.trace
+
+MAGIC: bytes = b"SDKTRACE"
+VERSION: int = 1
+# magic, version, board size, puzzle length in bytes
+HEADER: struct.Struct = struct.Struct("<8sBHI")
+
+# Bytes a TraceWriter collects before it writes them out
+FLUSH_BYTES: int = 1 << 16
+
+# A loaded trace keeps a board snapshot every this many events, so a far seek
+# replays at most this many events
+KEYFRAME_INTERVAL: int = 4096
+
+
+class TraceWriter:
+    # Appends events to a trace file (or any binary stream); record() is called for
+    # every change of the search, so it only encodes into a buffer. Use it as a
+    # context manager or close() it, which writes the rest of the buffer.
+
+    def __init__(self, target: str | BinaryIO, board: SudokuBoard, flush_bytes: int = FLUSH_BYTES) -> None:
+        self._owns_stream: bool = isinstance(target, str)
+        self.stream: BinaryIO = open(target, "wb") if isinstance(target, str) else target
+        self.board_size: int = board.board_size
+        self.flush_bytes: int = flush_bytes
+        self.events: int = 0
+        #bytes written to the stream so far, header included
+        self.size: int = 0
+        self._radix: int = board.board_size + 1
+        self._last: int = 0
+        self._buffer: bytearray = bytearray()
+        puzzle: bytes = board.snapshot()
+        self._write(HEADER.pack(MAGIC, VERSION, board.board_size, len(puzzle)) + puzzle)
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def record(self, index: int, value: int) -> None:
+        # Cell `index` (y * board_size + x) now holds `value`
+        delta: int = index - self._last
+        self._last = index
+        token: int = ((delta << 1) if delta >= 0 else (-delta << 1) - 1) * self._radix + value
+        buffer: bytearray = self._buffer
+        while token >= 0x80:
+            buffer.append(token & 0x7F | 0x80)
+            token >>= 7
+        buffer.append(token)
+        self.events += 1
+        if len(buffer) >= self.flush_bytes:
+            self.flush()
+
+    def _write(self, data: bytes) -> None:
+        self.stream.write(data)
+        self.size += len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write(self._buffer)
+            self._buffer.clear()
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.stream.closed:
+            return
+        self.flush()
+        if self._owns_stream:
+            self.stream.close()
+
+
+@dataclass
+class Trace:
+    board_size: int
+    #board cells (SudokuBoard.snapshot()) before the first event
+    puzzle: bytes
+    #one entry per event: the cell, its value before and its value after the event
+    cells: array = field(default_factory=lambda: array("I"))
+    before: array = field(default_factory=lambda: array("B"))
+    after: array = field(default_factory=lambda: array("B"))
+    #board snapshot after every KEYFRAME_INTERVAL events, starting with the puzzle
+    keyframes: list[bytes] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def boardAt(self, position: int) -> SudokuBoard:
+        # The board after the first `position` events
+        position = max(0, min(position, len(self.cells)))
+        keyframe: int = position // KEYFRAME_INTERVAL
+        board: SudokuBoard = SudokuBoard.empty(self.board_size)
+        board.restore(self.keyframes[keyframe])
+        board_cells = board.cells
+        trace_cells, after = self.cells, self.after
+        for event in range(keyframe * KEYFRAME_INTERVAL, position):
+            board_cells[trace_cells[event]] = after[event]
+        return board
+
+
+def read_trace(source: str | bytes) -> Trace:
+    # Decode a whole trace file (or its bytes). An event cut off at the end (a
+    # crash while the buffer was written) is left out.
+    if isinstance(source, str):
+        with open(source, "rb") as stream:
+            data: bytes = stream.read()
+    else:
+        data = source
+    if len(data) < HEADER.size:
+        raise ValueError("Invalid trace: file is too short")
+    magic, version, board_size, puzzle_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Invalid trace: unknown header")
+    offset: int = HEADER.size + puzzle_length
+    if len(data) < offset or board_size == 0:
+        raise ValueError("Invalid trace: truncated header")
+
+    board: SudokuBoard = SudokuBoard.empty(board_size)
+    if puzzle_length != len(board.cells) * board.cells.itemsize:
+        raise ValueError(f"Invalid trace: the puzzle does not fit a {board_size}x{board_size} board")
+    # values are kept with the board's own cell width
+    typecode: str = board.cells.typecode
+    trace: Trace = Trace(board_size, bytes(data[HEADER.size:offset]), before=array(typecode), after=array(typecode))
+    board.restore(trace.puzzle)
+    trace.keyframes.append(trace.puzzle)
+
+    board_cells = board.cells
+    cells, before, after = trace.cells, trace.before, trace.after
+    cell_count: int = board_size * board_size
+    radix: int = board_size + 1
+    last: int = 0
+    token: int = 0
+    shift: int = 0
+    for byte in memoryview(data)[offset:]:
+        token |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        zigzag, value = divmod(token, radix)
+        last += -((zigzag + 1) >> 1) if zigzag & 1 else zigzag >> 1
+        if not 0 <= last < cell_count:
+            raise ValueError(f"Invalid trace: event {len(cells)} is outside the board")
+        cells.append(last)
+        before.append(board_cells[last])
+        after.append(value)
+        board_cells[last] = value
+        if len(cells) % KEYFRAME_INTERVAL == 0:
+            trace.keyframes.append(board.snapshot())
+        token = shift = 0
+    return trace
+
+
+class TracePlayer:
+    # Moves a board through a trace: seek() jumps to any event, and returns the
+    # cells that changed as (row, column, value), like the changes of a stepped
+    # solve. Nearby positions are reached by applying (or, going back, undoing) the
+    # events in between, far ones from the closest keyframe. The board may be one
+    # that is on screen; it is set to the trace's puzzle first.
+
+    def __init__(self, trace: Trace, board: SudokuBoard | None = None) -> None:
+        if board is not None and board.board_size != trace.board_size:
+            raise ValueError(f"The trace is of a {trace.board_size}x{trace.board_size} board")
+        self.trace: Trace = trace
+        self.board: SudokuBoard = board if board is not None else SudokuBoard.empty(trace.board_size)
+        self.board.restore(trace.puzzle)
+        #number of events applied to the board
+        self.position: int = 0
+
+    def atEnd(self) -> bool:
+        return self.position == len(self.trace)
+
+    def step(self, count: int = 1) -> list[tuple[int, int, int]]:
+        # `count` events forward, or back when negative
+        return self.seek(self.position + count)
+
+    def seek(self, position: int) -> list[tuple[int, int, int]]:
+        trace: Trace = self.trace
+        position = max(0, min(position, len(trace)))
+        board_cells = self.board.cells
+        board_size: int = trace.board_size
+        changed: list[int]
+        if abs(position - self.position) <= KEYFRAME_INTERVAL:
+            trace_cells: array = trace.cells
+            # cell -> its value before the seek
+            touched: dict[int, int] = {}
+            if position >= self.position:
+                after: array = trace.after
+                for event in range(self.position, position):
+                    cell: int = trace_cells[event]
+                    touched.setdefault(cell, board_cells[cell])
+                    board_cells[cell] = after[event]
+            else:
+                before: array = trace.before
+                for event in range(self.position - 1, position - 1, -1):
+                    cell = trace_cells[event]
+                    touched.setdefault(cell, board_cells[cell])
+                    board_cells[cell] = before[event]
+            changed = [cell for cell, value in touched.items() if board_cells[cell] != value]
+        else:
+            old: array = board_cells[:]
+            self.board.restore(trace.boardAt(position).snapshot())
+            changed = [cell for cell, (value, new) in enumerate(zip(old, board_cells)) if value != new]
+        self.position = position
+        return [(*divmod(cell, board_size), board_cells[cell]) for cell in changed]
+
+
+def record_solve(
+    board: SudokuBoard,
+    path: str,
+    cell_order: str = "row-major",
+    value_order: str = "ascending",
+    max_seconds: float = 0.0,
+):
+    # Solve `board` in place with backtracking and write the trace of the search to
+    # `path`; returns the SolveResult
+    try:
+        from src.sudoku_engine import SudokuEngine
+    except ModuleNotFoundError:
+        from sudoku_engine import SudokuEngine
+    engine = SudokuEngine(board, "backtrack", cell_order, value_order)
+    engine.setBudget(seconds=max_seconds)
+    with TraceWriter(path, engine.board) as trace:
+        engine.setTrace(trace)
+        return engine.solve()
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record solve traces and replay them in the terminal.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recorder = commands.add_parser("record", help="solve a puzzle and write the trace of the search")
+    recorder.add_argument("puzzle", help="the puzzle, one character per cell ('.' or '0' for blanks)")
+    recorder.add_argument("trace", help="trace file")
+    recorder.add_argument("--cell-order", default="row-major", help="cell heuristic of the search")
+    recorder.add_argument("--value-order", default="ascending", help="value heuristic of the search")
+    recorder.add_argument("--time-limit", type=float, default=0.0, help="stop the search after this many seconds")
+
+    player = commands.add_parser("replay", help="animate a trace in the terminal")
+    player.add_argument("trace", help="trace file")
+    player.add_argument("--speed", type=float, default=1000.0, help="events per second (0 jumps to the end)")
+    player.add_argument("--fps", type=float, default=30.0, help="frames per second")
+    player.add_argument("--start", type=int, default=0, help="event to start at")
+    player.add_argument("--end", type=int, help="event to stop at (before --start plays backwards)")
+
+    info = commands.add_parser("info", help="print the size of a trace")
+    info.add_argument("trace", help="trace file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arguments: argparse.Namespace = parse_arguments(argv)
+    if arguments.command == "record":
+        try:
+            from src.sudoku_io import parse_puzzle
+        except ModuleNotFoundError:
+            from sudoku_io import parse_puzzle
+        try:
+            board: SudokuBoard = parse_puzzle(arguments.puzzle)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 2
+        result = record_solve(board, arguments.trace, arguments.cell_order, arguments.value_order, arguments.time_limit)
+        print(result.board.toString() if result.solved else "timeout" if result.timed_out else "unsolvable")
+        print(f"{result.stats.placements} placements, {result.stats.backtracks} backtracks", file=sys.stderr)
+        return 0 if result.solved else 1
+
+    try:
+        trace: Trace = read_trace(arguments.trace)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    if arguments.command == "info":
+        size: int = os.path.getsize(arguments.trace) - HEADER.size - len(trace.puzzle)
+        placements: int = sum(1 for value in trace.after if value)
+        print(f"{trace.board_size}x{trace.board_size} board, {len(trace)} events ({placements} placements)")
+        print(f"{size} bytes of events, {size / max(len(trace), 1):.2f} bytes per event")
+        return 0
+
+    try:
+        from src.sudoku_terminal import SudokuTerminalVisualizer
+    except ModuleNotFoundError:
+        from sudoku_terminal import SudokuTerminalVisualizer
+    player: TracePlayer = TracePlayer(trace)
+    player.seek(arguments.start)
+    SudokuTerminalVisualizer(fps=arguments.fps).replayTrace(player, arguments.speed, arguments.end)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
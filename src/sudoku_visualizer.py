@@ -1,19 +1,23 @@
-from typing import ClassVar
-import sys
-import time
-
-from PySide6.QtWidgets import QMainWindow, QWidget, QTableWidget, QPushButton, QLineEdit, QComboBox, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel, QHeaderView, QTableWidgetItem, QStyledItemDelegate, QButtonGroup
+from PySide6.QtWidgets import QMainWindow, QWidget, QTableWidget, QPushButton, QLineEdit, QComboBox, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel, QHeaderView, QTableWidgetItem, QStyledItemDelegate, QButtonGroup, QSlider
 from PySide6.QtCore import Qt, QRect, QTimer
 from PySide6.QtGui import QPen, QColor
 
+try:
+    from src.sudoku_core import to_symbol
+    from src.sudoku_terminal import ANSIColors, SudokuObserver, SudokuTerminalVisualizer
+except ModuleNotFoundError:
+    from sudoku_core import to_symbol
+    from sudoku_terminal import ANSIColors, SudokuObserver, SudokuTerminalVisualizer
+
+# Board sizes offered by the GUI
+BOARD_SIZES: tuple[int, ...] = (4, 9, 16, 25, 36)
+
 
-class ANSIColors:
-    YELLOW_BOLD: ClassVar[str]  = "\033[1;33m"
-    GREEN_BOLD:  ClassVar[str]  = "\033[1;32m"
-    WHITE_BOLD:  ClassVar[str]  = "\033[1;37m"
-    END:         ClassVar[str]  = "\033[0m"
-    
 class SudokuDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None, box_size: int = 3):
+        super().__init__(parent)
+        self.box_size: int = box_size
+
     def paint(self, painter, option, index):
         # Draw the default cell content
         super().paint(painter, option, index)
@@ -28,91 +32,35 @@ class SudokuDelegate(QStyledItemDelegate):
 
         # Draw borders manually
         # Top border
-        painter.setPen(thick_pen if row % 3 == 0 else thin_pen)
+        painter.setPen(thick_pen if row % self.box_size == 0 else thin_pen)
         painter.drawLine(rect.topLeft(), rect.topRight())
 
         # Left border
-        painter.setPen(thick_pen if col % 3 == 0 else thin_pen)
+        painter.setPen(thick_pen if col % self.box_size == 0 else thin_pen)
         painter.drawLine(rect.topLeft(), rect.bottomLeft())
 
-        # Bottom border (only for last row or if it's 3rd row)
+        # Bottom border (only for last row or the last row of a box)
         if row == index.model().rowCount() - 1:
             painter.setPen(thick_pen)
         else:
-            painter.setPen(thick_pen if (row + 1) % 3 == 0 else thin_pen)
+            painter.setPen(thick_pen if (row + 1) % self.box_size == 0 else thin_pen)
         painter.drawLine(rect.bottomLeft(), rect.bottomRight())
 
-        # Right border (only for last column or if it's 3rd column)
+        # Right border (only for last column or the last column of a box)
         if col == index.model().columnCount() - 1:
             painter.setPen(thick_pen)
         else:
-            painter.setPen(thick_pen if (col + 1) % 3 == 0 else thin_pen)
+            painter.setPen(thick_pen if (col + 1) % self.box_size == 0 else thin_pen)
         painter.drawLine(rect.topRight(), rect.bottomRight())
 
-class SudokuObserver:
-
-    def run(self):
-        pass
-
-    def renderUI(self):
-        pass
-
-
-class SudokuTerminalVisualizer(SudokuObserver):
-    def __init__(self, time_delay: int = 0):
-        print("\033[2J\033[H")
-        self.time_delay = time_delay
-
-    def print(self, state):
-        sys.stdout.write("\033[H") #moves the cursor to the top (doesnt clear screen)
-
-        # BOARD_SIZE * PUZZLE_HORIZONTOL_SPACE is for every number
-        # BOARD_SIZE//BOX_WIDTH is the number of |'s in the puzzle. Multiply it with PUZZLE_HORIZONTOL_SPACE to get the full space
-        # + 1 for the last |
-        horizontol_line_length: int = (
-            (state.board_size * state.horizontal_spacing)
-            + ((state.board_size // state.box_size) * state.horizontal_spacing)
-            + 1
-        )
-
-        board_row: str = ""
-        for y in range(state.board_size):
-            if y % state.box_size == 0:  # put horizontol line at top
-                board_row += (f"{ANSIColors.WHITE_BOLD}{'-' * horizontol_line_length}{ANSIColors.END}\n")
-
-            for x in range(state.board_size):
-                if x % state.box_size == 0:  # put | every BOX_WIDTH
-                    board_row += (f"{ANSIColors.WHITE_BOLD}{'|':<{state.horizontal_spacing}}{ANSIColors.END}")
-
-                # Print the numbers (if original board is given then solution numbers are colored differently)
-                value: int = state.board[y][x]
-                if value == 0: # Empty cells
-                    board_row += (f"{ANSIColors.YELLOW_BOLD}{'-':<{state.horizontal_spacing}}{ANSIColors.END}")
-                elif state.original_board and value != state.original_board[y][x]: #solution values
-                    board_row += (f"{ANSIColors.GREEN_BOLD}{value:<{state.horizontal_spacing}}{ANSIColors.END}")
-                else:  # given numbers
-                    board_row += (f"{ANSIColors.WHITE_BOLD}{value:<{state.horizontal_spacing}}")
-
-                if x == state.board_size - 1:  # put | at the right edge
-                    board_row += (f"{ANSIColors.WHITE_BOLD}|{ANSIColors.END}\n")
-
-            if y == state.board_size - 1:
-                board_row += (f"{ANSIColors.WHITE_BOLD}{'-' * horizontol_line_length}{ANSIColors.END}")
-            
-        sys.stdout.write(board_row)
-        sys.stdout.flush()
-
-        if self.time_delay > 0:
-            time.sleep(self.time_delay)
-
-
 class SudokuGUIVisualizer(QMainWindow, SudokuObserver):
-    def __init__(self, window_geometry: QRect = QRect(400, 150, 800, 500)):
+    def __init__(self, window_geometry: QRect = QRect(400, 150, 800, 500), board_size: int = 9):
         super().__init__()
         self.window_geometry: QRect = window_geometry
+        self.board_size: int = board_size
         self.initUI()
 
-    def __new__(cls, window_geometry: QRect= QRect(400, 150, 800, 500)):
+    def __new__(cls, window_geometry: QRect= QRect(400, 150, 800, 500), board_size: int = 9):
         if not hasattr(cls, "instance"):
             cls.instance: SudokuGUIVisualizer = super(SudokuGUIVisualizer, cls).__new__(cls, window_geometry)
         return cls.instance
@@ -204,20 +152,12 @@ class SudokuGUIVisualizer(QMainWindow, SudokuObserver):
         #QTableWidget
         self.board: QTableWidget = QTableWidget(self.central_widget)
         self.horizotal_layout.addWidget(self.board)
-        self.board.setColumnCount(9)
-        self.board.setRowCount(9)
         self.board.verticalHeader().setVisible(False)
         self.board.horizontalHeader().setVisible(False)
         self.board.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.board.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.board.setItemDelegate(SudokuDelegate(self.board))
         self.board.setSelectionMode(QTableWidget.NoSelection)
-        self.board.setCurrentCell(-1, -1)
-
-        for y in range(9):
-            for x in range(9):
-                self.board.setItem(y, x, QTableWidgetItem())
-                self.board.item(y, x).setTextAlignment(Qt.AlignCenter)
+        self.setBoardSize(self.board_size)
         self.sidebar_widgets: list[QWidget] = []
         #Load example button
         self.load_example: QPushButton = QPushButton("Load Example Puzzle")
@@ -228,6 +168,13 @@ class SudokuGUIVisualizer(QMainWindow, SudokuObserver):
         self.sidebar_widgets.append(self.create_puzzle)
 
 
+        #Board size combo box
+        self.board_size_combo_box: QComboBox = QComboBox()
+        for size in BOARD_SIZES:
+            self.board_size_combo_box.addItem(f"{size}x{size}", size)
+        self.board_size_combo_box.setCurrentIndex(max(self.board_size_combo_box.findData(self.board_size), 0))
+        self.sidebar_widgets.append(self.board_size_combo_box)
+
         #Fast/Slow solve combo box
         self.solve_mode_combo_box: QComboBox = QComboBox()
         self.solve_mode_combo_box.addItem("Fast")
@@ -256,6 +203,15 @@ class SudokuGUIVisualizer(QMainWindow, SudokuObserver):
         self.clear_button: QPushButton = QPushButton("Clear Board")
         self.sidebar_widgets.append(self.clear_button)
 
+        #Load trace button: Solve then replays the recorded solve (Slow mode animates it)
+        self.load_trace: QPushButton = QPushButton("Load Solve Trace")
+        self.sidebar_widgets.append(self.load_trace)
+
+        #Trace slider, scrubs through a loaded trace
+        self.trace_slider: QSlider = QSlider(Qt.Horizontal)
+        self.trace_slider.setVisible(False)
+        self.sidebar_widgets.append(self.trace_slider)
+
         #Time label
         self.time_label: QLabel = QLabel("Timer: ")
         self.sidebar_widgets.append(self.time_label)
@@ -286,6 +242,43 @@ class SudokuGUIVisualizer(QMainWindow, SudokuObserver):
             else:
                 widget.setDisabled(value)
     
+    def setBoardSize(self, board_size: int):
+        # Rebuild the table for a board_size x board_size board; thick lines around the
+        # boxes and a font that shrinks with the number of cells
+        self.board_size = board_size
+        self.board.setColumnCount(board_size)
+        self.board.setRowCount(board_size)
+        self.board.setItemDelegate(SudokuDelegate(self.board, int(board_size ** (1 / 2))))
+        self.board.setStyleSheet(f"QTableWidget {{ font-size: {max(35 * 9 // board_size, 10)}px; }}")
+        for y in range(board_size):
+            for x in range(board_size):
+                self.board.setItem(y, x, QTableWidgetItem())
+                self.board.item(y, x).setTextAlignment(Qt.AlignCenter)
+        self.board.setCurrentCell(-1, -1)
+
+    def setCells(self, changes: list[tuple[int, int, int]]):
+        # Apply a batch of (row, column, value) changes with a single repaint
+        self.board.setUpdatesEnabled(False)
+        self.board.blockSignals(True)
+        for row, column, value in changes:
+            self.board.item(row, column).setText(to_symbol(value))
+        self.board.blockSignals(False)
+        self.board.setUpdatesEnabled(True)
+
+    def setTraceLength(self, events: int):
+        # Show the slider for a trace of `events` events, hide it for none
+        self.trace_slider.blockSignals(True)
+        self.trace_slider.setRange(0, events)
+        self.trace_slider.setValue(0)
+        self.trace_slider.blockSignals(False)
+        self.trace_slider.setVisible(events > 0)
+
+    def setTracePosition(self, position: int):
+        # Follow the replay without seeking again
+        self.trace_slider.blockSignals(True)
+        self.trace_slider.setValue(position)
+        self.trace_slider.blockSignals(False)
+
     def toggleEditCells(self, toggle: str):
         for row in range(self.board.rowCount()):
             for column in range(self.board.columnCount()):
@@ -0,0 +1,13 @@
+import pytest
+from benchmarks.bench_imports import ENTRY_POINTS, measure
+
+# ---------------------------
+# Import hygiene
+# ---------------------------
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_non_gui_modules_do_not_load_qt(module):
+    assert measure(module)["loaded"] == []
+
+def test_gui_entry_point_still_loads_qt():
+    assert "PySide6" in measure("src.sudoku_visualizer")["loaded"]
@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.sudoku_batch import (
+    boards_from_candidates,
+    boards_from_strings,
+    candidates_from_boards,
+    propagate_singles,
+    solve_batch,
+    unpack_candidates,
+)
+
+VALID_PUZZLE = "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79"
+UNSOLVABLE_PUZZLE = "12345678.........9" + "." * 63
+CONFLICTING_PUZZLE = "55" + "." * 79
+
+# ---------------------------
+# Batch solving
+# ---------------------------
+
+def test_boards_from_strings(valid_board):
+    boards = boards_from_strings([VALID_PUZZLE, VALID_PUZZLE.replace(".", "0")])
+    assert boards.shape == (2, 9, 9)
+    assert boards[0].tolist() == valid_board
+    assert boards[1].tolist() == valid_board
+
+def test_boards_from_strings_with_letters():
+    boards = boards_from_strings(["AG" + "." * 253 + "9"])
+    assert boards.shape == (1, 16, 16)
+    assert boards[0, 0, :2].tolist() == [10, 16] and boards[0, 15, 15] == 9
+
+def test_candidate_tensor(valid_board):
+    candidates = candidates_from_boards(np.array([valid_board]))
+    tensor = unpack_candidates(candidates)
+    assert tensor.shape == (1, 9, 9, 9)
+    assert tensor[0, 0, 0].tolist() == [d == 5 for d in range(1, 10)]
+    assert tensor[0, 0, 2].all()
+
+def test_singles_solve_easy_board(valid_board, valid_board_solution):
+    candidates = candidates_from_boards(np.array([valid_board]))
+    contradiction = propagate_singles(candidates)
+    assert contradiction.tolist() == [False]
+    assert boards_from_candidates(candidates)[0].tolist() == valid_board_solution
+
+def test_solve_batch(valid_board_solution):
+    boards = boards_from_strings([VALID_PUZZLE, UNSOLVABLE_PUZZLE, CONFLICTING_PUZZLE, VALID_PUZZLE])
+    solutions, solved = solve_batch(boards)
+    assert solved.tolist() == [True, False, False, True]
+    assert solutions[0].tolist() == valid_board_solution
+    assert solutions[3].tolist() == valid_board_solution
+
+def test_remainder_goes_to_scalar_search():
+    # Needs more than singles
+    puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+    boards = boards_from_strings([puzzle])
+    candidates = candidates_from_boards(boards)
+    propagate_singles(candidates)
+    assert (boards_from_candidates(candidates) == 0).any()
+
+    solutions, solved = solve_batch(boards)
+    assert solved.tolist() == [True]
+    assert all(sorted(row) == list(range(1, 10)) for row in solutions[0].tolist())
@@ -0,0 +1,107 @@
+import pytest
+from src.sudoku_cache import SolveCache, canonical_form, transforms
+from src.sudoku_core import SudokuBoard
+from src.sudoku_engine import SolveResult, solve
+from src.sudoku_solver import SudokuSolver
+
+# ---------------------------
+# Canonical form
+# ---------------------------
+
+def rotate(rows):
+    return [list(row) for row in zip(*rows[::-1])]
+
+def relabel(rows, digits=(7, 3, 9, 1, 5, 2, 8, 4, 6)):
+    return [[digits[value - 1] if value else 0 for value in row] for row in rows]
+
+def swap_bands(rows):
+    return rows[3:6] + rows[0:3] + rows[6:9]
+
+def test_transforms_are_permutations():
+    for permutation in transforms(9):
+        assert sorted(permutation) == list(range(81))
+    assert len(transforms(9)) == 8 * 6 * 6
+    assert len(transforms(16)) == 8
+
+@pytest.mark.parametrize("change", [rotate, relabel, swap_bands, lambda rows: relabel(swap_bands(rotate(rows)))])
+def test_equivalent_puzzles_share_a_canonical_form(valid_board, change):
+    board = SudokuBoard.fromRows(valid_board)
+    other = SudokuBoard.fromRows(change(valid_board))
+    assert other != board
+    assert canonical_form(other)[0] == canonical_form(board)[0]
+
+def test_different_puzzles_differ(valid_board):
+    other = [row[:] for row in valid_board]
+    other[0][2] = 4
+    assert canonical_form(SudokuBoard.fromRows(other))[0] != canonical_form(SudokuBoard.fromRows(valid_board))[0]
+
+# ---------------------------
+# Cache
+# ---------------------------
+
+def test_solution_is_mapped_back(valid_board):
+    cache = SolveCache()
+    first = cache.solve(SudokuBoard.fromRows(valid_board))
+    assert first.solved and not first.cached
+
+    puzzle = SudokuBoard.fromRows(relabel(rotate(valid_board)))
+    result = cache.solve(puzzle)
+    assert result.cached and result.solved
+    assert result.board == solve(puzzle).board
+    assert puzzle.cells.count(0) == 51
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_exact_repeats_and_unsolvable(valid_board):
+    cache = SolveCache()
+    board = SudokuBoard.fromRows(valid_board)
+    cache.put(board, solve(board))
+    assert cache.get(board).cached
+
+    unsolvable = SudokuBoard.fromString("12345678.........9" + "." * 63)
+    assert cache.solve(unsolvable).solved is False
+    result = cache.get(unsolvable)
+    assert result.cached and result.solved is False and result.board == unsolvable
+
+def test_cancelled_results_are_not_stored(valid_board):
+    cache = SolveCache()
+    board = SudokuBoard.fromRows(valid_board)
+    cache.put(board, SolveResult(False, board.copy(), cancelled=True))
+    assert len(cache) == 0
+
+def test_lru_eviction_respects_the_memory_bound(valid_board):
+    cache = SolveCache(max_bytes=1000)
+    boards = [SudokuBoard.fromRows(valid_board)]
+    for value in range(1, 4):
+        board = SudokuBoard.fromRows(valid_board)
+        board[8, 0] = value
+        boards.append(board)
+    for board in boards:
+        cache.solve(board)
+        assert cache.size <= 1000
+    assert len(cache) < 2 * len(boards)
+    assert cache.get(boards[-1]) is not None
+    assert cache.get(boards[0]) is None
+
+def test_persistent_tier(tmp_path, valid_board):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SolveCache(path=path)
+    cache.solve(SudokuBoard.fromRows(valid_board))
+    cache.close()
+
+    cache = SolveCache(path=path)
+    puzzle = SudokuBoard.fromRows(swap_bands(valid_board))
+    result = cache.get(puzzle)
+    assert result is not None and result.board == solve(puzzle).board
+    cache.close()
+
+def test_solver_uses_the_cache(valid_board, valid_board_solution):
+    cache = SolveCache()
+    assert SudokuSolver(valid_board, cache=cache).solve().cached is False
+
+    changes = []
+    solver = SudokuSolver(valid_board, cache=cache)
+    solver.value_changed.connect(lambda *change: changes.append(change))
+    result = solver.solve()
+    assert result.cached and solver.state.board == valid_board_solution
+    assert len(changes) == 51
+    assert solver.findEmpty() is None
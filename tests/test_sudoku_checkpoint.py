@@ -0,0 +1,105 @@
+import pytest
+from src.sudoku_checkpoint import Checkpoint, read_checkpoint, write_checkpoint
+from src.sudoku_core import SudokuBoard
+from src.sudoku_engine import SudokuEngine
+from src.sudoku_layout import get_layout
+
+# Needs thousands of placements from every backtracking configuration
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+
+class StopAtCheckpoint(SudokuEngine):
+    # Cancels itself right after its first checkpoint, like a process that dies
+    def writeCheckpoint(self, *arguments, **state):
+        super().writeCheckpoint(*arguments, **state)
+        self.cancel()
+
+CONFIGURATIONS = [
+    ("backtrack", {}),
+    ("backtrack", {"cell_order": "mrv", "value_order": "lcv"}),
+    ("backtrack", {"restarts": True, "seed": 3}),
+    ("dlx", {}),
+    ("propagate", {}),
+]
+
+# ---------------------------
+# File format
+# ---------------------------
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "solve.ckpt")
+    checkpoint = Checkpoint(
+        "backtrack", "backtrack", 9, "classic", bytes(range(81)), [[3, 1022], [70000, 2], []], {"placements": 7}, {"cutoff": 256},
+    )
+    write_checkpoint(path, checkpoint)
+    assert read_checkpoint(path) == checkpoint
+
+def test_rejects_bad_files(tmp_path):
+    path = tmp_path / "solve.ckpt"
+    path.write_bytes(b"SDKCKPT")
+    with pytest.raises(ValueError):
+        read_checkpoint(str(path))
+    write_checkpoint(str(path), Checkpoint("dlx", "dlx", 4, "classic", bytes(16), [[5]]))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        read_checkpoint(str(path))
+    with pytest.raises(ValueError):
+        write_checkpoint(str(path), Checkpoint("bogo", "dlx", 4, "classic", bytes(16), []))
+
+# ---------------------------
+# Resuming solves
+# ---------------------------
+
+@pytest.mark.parametrize("algorithm, options", CONFIGURATIONS)
+def test_resume_continues_where_it_stopped(tmp_path, algorithm, options):
+    path = str(tmp_path / "solve.ckpt")
+    expected = SudokuEngine(SudokuBoard.fromString(HARD), algorithm, **options).solve()
+
+    engine = StopAtCheckpoint(SudokuBoard.fromString(HARD), algorithm, **options)
+    engine.setCheckpoint(path, every_nodes=1)
+    stopped = engine.solve()
+    assert stopped.cancelled is True
+    assert 0 < read_checkpoint(path).stats["placements"] < expected.stats.placements
+
+    result = SudokuEngine.resume(path).solve()
+    assert result.solved is True
+    assert result.board == expected.board
+    assert result.stats.placements == expected.stats.placements
+    assert result.stats.backtracks == expected.stats.backtracks
+    assert result.stats.restarts == expected.stats.restarts
+
+def test_cancel_saves_a_checkpoint(tmp_path):
+    path = str(tmp_path / "solve.ckpt")
+    engine = SudokuEngine(SudokuBoard.fromString(HARD))
+    engine.setCheckpoint(path, every_seconds=0)
+    engine.addHook("phase", lambda name, *_: engine.cancel() if name == "start" else None)
+    assert engine.solve().cancelled is True
+    assert read_checkpoint(path).kind == "backtrack"
+    assert SudokuEngine.resume(path).solve().solved is True
+
+def test_resume_stepping_search(tmp_path, valid_board, valid_board_solution):
+    path = str(tmp_path / "steps.ckpt")
+    engine = SudokuEngine(valid_board)
+    engine.start()
+    for _ in range(20):
+        engine.step()
+    engine.saveCheckpoint(path)
+
+    resumed = SudokuEngine.resume(path)
+    while resumed.step():
+        pass
+    assert resumed.board == valid_board_solution
+    assert resumed.stats.placements + resumed.stats.backtracks > 20
+
+def test_resume_checks_layout_and_algorithm(tmp_path):
+    path = str(tmp_path / "solve.ckpt")
+    engine = StopAtCheckpoint(SudokuBoard.fromString(HARD), "dlx")
+    engine.setCheckpoint(path, every_nodes=1)
+    engine.solve()
+    with pytest.raises(ValueError):
+        SudokuEngine.resume(path, layout=get_layout(9, "x"))
+    with pytest.raises(ValueError, match="resumed with 'propagate'"):
+        SudokuEngine.resume(path).solve("propagate")
+    resumed = SudokuEngine.resume(path)
+    resumed.algorithm = "backtrack"
+    with pytest.raises(ValueError, match="resumed with 'backtrack'"):
+        resumed.solve()
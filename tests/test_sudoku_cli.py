@@ -0,0 +1,37 @@
+import pytest
+from src.sudoku_cli import main, solve_stream
+
+VALID_PUZZLE = "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79"
+VALID_SOLUTION = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+UNSOLVABLE_PUZZLE = "12345678.........9" + "." * 63
+
+# ---------------------------
+# Batch solving
+# ---------------------------
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_stream_keeps_order(workers):
+    puzzles = [VALID_PUZZLE, UNSOLVABLE_PUZZLE, "55" + "." * 79, "abc"] * 5
+    answers = list(solve_stream(iter(puzzles), workers=workers, chunk_size=3))
+    assert answers == [VALID_SOLUTION, "unsolvable", "Invalid puzzle: conflicting givens",
+                       "Invalid puzzle: 3 characters is not a square board"] * 5
+
+def test_solve_stream_budgets():
+    hard = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+    assert list(solve_stream(iter([hard, VALID_PUZZLE]), max_nodes=1)) == ["timeout", VALID_SOLUTION]
+
+def test_main_writes_solutions(tmp_path):
+    source = tmp_path / "puzzles.txt"
+    target = tmp_path / "solutions.txt"
+    source.write_text(f"{VALID_PUZZLE}\n{VALID_PUZZLE}\n")
+    assert main([str(source), "-o", str(target), "--workers", "1", "--algorithm", "dlx"]) == 0
+    assert target.read_text().splitlines() == [VALID_SOLUTION, VALID_SOLUTION]
+
+def test_main_prints_stats(tmp_path, capsys):
+    source = tmp_path / "puzzles.txt"
+    source.write_text(f"{VALID_PUZZLE}\n{VALID_PUZZLE}\n")
+    assert main([str(source), "--workers", "1", "--algorithm", "backtrack", "--stats"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [VALID_SOLUTION, VALID_SOLUTION]
+    assert "max depth" in captured.err
+    assert "search" in captured.err
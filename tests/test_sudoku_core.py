@@ -0,0 +1,98 @@
+import pytest
+from src.sudoku_core import CandidateGrid, SudokuBoard, from_symbol, to_symbol
+
+# ---------------------------
+# Tests for CandidateGrid
+# ---------------------------
+
+@pytest.fixture
+def grid(valid_board):
+    return CandidateGrid(valid_board)
+
+def test_first_empty(grid):
+    assert grid.firstEmpty() == (0, 2)
+
+def test_candidates(grid):
+    # (0, 2) sees 5, 3, 7 in its row, 8 in its column and 6, 9, 8 in its box
+    candidates = [d for d in range(1, 10) if (grid.candidates(0, 2) >> d) & 1]
+    assert candidates == [1, 2, 4]
+
+def test_place_and_unplace(grid):
+    grid.place(0, 2, 4)
+    assert grid.board[0][2] == 4
+    assert grid.isLegal(0, 5, 4) is False
+    assert grid.firstEmpty() == (0, 3)
+
+    grid.unplace(0, 2)
+    assert grid.board[0][2] == 0
+    assert grid.isLegal(0, 5, 4) is True
+    assert grid.firstEmpty() == (0, 2)
+
+def test_next_candidate(grid):
+    assert grid.nextCandidate(0, 2, 1) == 1
+    assert grid.nextCandidate(0, 2, 3) == 4
+    assert grid.nextCandidate(0, 2, 5) == 0
+
+def test_erase_keeps_duplicates(valid_board):
+    valid_board[0][2] = 5  # duplicate of the 5 at (0, 0)
+    grid = CandidateGrid(valid_board)
+    grid.erase(0, 2)
+    assert grid.isLegal(0, 5, 5) is False
+
+def test_empty_count(grid):
+    assert grid.emptyCount() == 51
+
+# ---------------------------
+# Tests for SudokuBoard
+# ---------------------------
+
+def test_board_indexing(valid_board):
+    board = SudokuBoard.fromRows(valid_board)
+    assert len(board) == 9
+    assert board[0][1] == board[0, 1] == 3
+    board[8][0] = 1
+    assert board.cells[72] == 1
+    assert board == valid_board[:8] + [[1] + valid_board[8][1:]]
+
+def test_board_rejects_ragged_rows(valid_board):
+    valid_board[3] = valid_board[3][:8]
+    with pytest.raises(ValueError):
+        SudokuBoard.fromRows(valid_board)
+
+def test_board_snapshot_restore(valid_board):
+    board = SudokuBoard.fromRows(valid_board)
+    snapshot = board.snapshot()
+    board.clear()
+    assert board.cells.count(0) == 81
+    board.restore(snapshot)
+    assert board == valid_board
+
+def test_board_string_round_trip(valid_board):
+    board = SudokuBoard.fromRows(valid_board)
+    assert SudokuBoard.fromString(board.toString()) == board
+
+def test_board_symbols_past_nine():
+    board = SudokuBoard.empty(16)
+    board[0, 0], board[0, 1], board[15, 15] = 10, 16, 9
+    text = board.toString()
+    assert text.startswith("AG.") and text.endswith("9") and len(text) == 256
+    assert SudokuBoard.fromString(text) == board
+    assert [to_symbol(value) for value in (0, 9, 10, 35, 36)] == ["", "9", "A", "Z", "a"]
+    assert [from_symbol(text) for text in ("", "7", "A", "a", "10")] == [0, 7, 10, 36, 10]
+
+def test_board_symbols_out_of_range():
+    with pytest.raises(ValueError, match="out of range"):
+        SudokuBoard.fromString("A" + "." * 80)
+    with pytest.raises(ValueError):
+        from_symbol("?")
+
+def test_board_numpy_shares_memory(valid_board):
+    np = pytest.importorskip("numpy")
+    board = SudokuBoard.fromRows(valid_board)
+    values = board.toNumpy()
+    values[0, 2] = 4
+    assert board[0, 2] == 4
+
+    values = np.array(valid_board, dtype=np.uint8)
+    SudokuBoard.fromNumpy(values)[0, 2] = 4
+    assert values[0, 2] == 4
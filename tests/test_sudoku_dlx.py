@@ -0,0 +1,38 @@
+from src.sudoku_core import CandidateGrid
+from src.sudoku_dlx import DancingLinks, solve_dlx
+
+# ---------------------------
+# Algorithm X
+# ---------------------------
+
+def test_knuth_example():
+    # The exact cover example from Knuth's "Dancing Links" paper
+    links = DancingLinks(7)
+    rows = [[3, 5, 6], [1, 4, 7], [2, 3, 6], [1, 4], [2, 7], [4, 5, 7]]
+    for row_id, columns in enumerate(rows):
+        links.addRow(row_id, columns)
+    assert sorted(links.search()) == [0, 3, 4]
+
+def test_no_exact_cover():
+    links = DancingLinks(3)
+    links.addRow(0, [1, 2])
+    links.addRow(1, [2, 3])
+    assert links.search() is None
+
+def test_solve_16x16():
+    board = [[(4 * (y % 4) + y // 4 + x) % 16 + 1 for x in range(16)] for y in range(16)]
+    solution = [row[:] for row in board]
+    for y in range(16):
+        for x in range(16):
+            if (y * 7 + x * 3) % 5 < 3:
+                board[y][x] = 0
+
+    grid = CandidateGrid(board)
+    solved, placements, _, _ = solve_dlx(grid)
+    board = grid.board.tolist()
+    assert solved is True
+    assert placements > 0
+    for y in range(16):
+        assert sorted(board[y]) == list(range(1, 17))
+        assert sorted(row[y] for row in board) == list(range(1, 17))
+    assert all(board[y][x] == solution[y][x] for y in range(16) for x in range(16) if (y * 7 + x * 3) % 5 >= 3)
@@ -0,0 +1,199 @@
+import pytest
+from src import sudoku_engine
+from src.sudoku_core import CandidateGrid, SudokuBoard
+from src.sudoku_engine import STRATEGIES, SudokuEngine, count_solutions, solve
+
+# Needs thousands of placements from the backtracking searches
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+# Takes the row-major backtracking search minutes
+SLOW = ".......12........3..23..4....1....5..4......6.7...8....9...2..8....5...3.6......."
+
+# ---------------------------
+# Headless engine
+# ---------------------------
+
+def test_engine_solve(valid_board, valid_board_solution):
+    result = SudokuEngine(valid_board).solve()
+    assert result.solved is True
+    assert result.board == valid_board_solution
+    assert result.stats.placements >= 51
+
+def test_engine_step_matches_solve(valid_board, valid_board_solution):
+    engine = SudokuEngine(valid_board)
+    changes = []
+    engine.on_change = lambda row, column, value: changes.append((row, column, value))
+
+    assert engine.start() is True
+    while engine.step():
+        pass
+
+    assert engine.solved is True
+    assert engine.board == valid_board_solution
+    assert len(changes) == engine.stats.placements + engine.stats.backtracks
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+def test_every_strategy_solves(algorithm, valid_board, valid_board_solution):
+    result = SudokuEngine(valid_board, algorithm).solve()
+    assert result.solved is True
+    assert result.board == valid_board_solution
+
+def test_algorithm_can_be_picked_per_solve(valid_board, valid_board_solution):
+    engine = SudokuEngine(valid_board, "backtrack")
+    assert engine.solve(algorithm="dlx").board == valid_board_solution
+
+def test_unknown_algorithm(valid_board):
+    with pytest.raises(ValueError):
+        SudokuEngine(valid_board, "magic")
+
+def test_solve_leaves_input_untouched(valid_board):
+    original = [row[:] for row in valid_board]
+    solve(valid_board)
+    assert valid_board == original
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+def test_unsolvable_board(algorithm):
+    board = [[0] * 9 for _ in range(9)]
+    board[0] = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    board[1][8] = 9  # (0, 8) can only be 9
+    result = solve(board, algorithm)
+    assert result.solved is False
+    assert result.board == board
+
+# ---------------------------
+# Solution counting
+# ---------------------------
+
+def test_count_unique_puzzle(valid_board):
+    engine = SudokuEngine(valid_board)
+    before = engine.board.snapshot()
+    assert engine.countSolutions(limit=2) == 1
+    assert engine.board.snapshot() == before
+    assert engine.grid.emptyCount() == 51
+
+def test_count_stops_at_limit(valid_board_solution):
+    board = [row[:] for row in valid_board_solution]
+    for y, x in [(0, 3), (0, 4), (3, 3), (3, 4)]:
+        board[y][x] = 0  # 6 7 / 7 6 can also be filled as 7 6 / 6 7
+    assert count_solutions(board, limit=1) == 1
+    assert count_solutions(board, limit=5) == 2
+    assert count_solutions([[0] * 9 for _ in range(9)], limit=10) == 10
+
+def test_count_solutions_node_budget(valid_board):
+    # an open board cannot be proven unique within a few placements
+    engine = SudokuEngine([[0] * 9 for _ in range(9)])
+    assert engine.countSolutions(limit=2, max_nodes=5) == 2
+    assert engine.board.cells.count(0) == 81
+    assert SudokuEngine(valid_board).countSolutions(limit=2, max_nodes=10_000) == 1
+
+def test_count_no_solution(valid_board):
+    assert count_solutions([[1] * 9] + [[0] * 9 for _ in range(8)]) == 0
+    board = [[0] * 9 for _ in range(9)]
+    board[0] = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    board[1][8] = 9
+    assert count_solutions(board) == 0
+
+# ---------------------------
+# Instrumentation
+# ---------------------------
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+def test_solve_stats(algorithm, valid_board):
+    phases = []
+    finished = []
+    engine = SudokuEngine(valid_board, algorithm)
+    engine.addHook("phase", lambda name, wall, cpu: phases.append(name))
+    engine.addHook("finish", finished.append)
+    stats = engine.solve().stats
+    assert phases == ["start", "search"]
+    assert finished == [stats]
+    assert set(stats.phases) == {"start", "search"}
+    assert stats.elapsed >= stats.phases["search"][0]
+    assert stats.max_depth > 0 or algorithm == "propagate"
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+def test_sampling(algorithm):
+    board = [[0] * 9 for _ in range(9)]
+    samples = []
+    engine = SudokuEngine(board, algorithm, sample_every=5)
+    engine.addHook("sample", samples.append)
+    stats = engine.solve().stats
+    assert samples == stats.samples
+    assert len(samples) == stats.placements // 5
+    assert all(sample.placements % 5 == 0 for sample in samples)
+
+def test_stepped_stats(valid_board):
+    engine = SudokuEngine(valid_board, cell_order="mrv")
+    engine.start()
+    while engine.step():
+        pass
+    assert engine.stats.elapsed > 0
+    assert engine.stats.max_depth == 51
+
+def test_unknown_hook(valid_board):
+    with pytest.raises(ValueError):
+        SudokuEngine(valid_board).addHook("tick", print)
+
+# ---------------------------
+# Cancellation
+# ---------------------------
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+def test_cancel_stops_the_search(algorithm, monkeypatch):
+    monkeypatch.setattr(sudoku_engine, "CANCEL_CHECK_INTERVAL", 1)
+    engine = SudokuEngine([[0] * 9 for _ in range(9)], algorithm)
+    engine.cancel()
+    result = engine.solve()
+    assert result.solved is False
+    assert result.cancelled is True
+    assert result.stats.placements <= 1
+
+    # the flag only applies to one solve
+    assert engine.cancelled is False
+    assert engine.solve().solved is True
+
+# ---------------------------
+# Budgets
+# ---------------------------
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+def test_node_budget_gives_a_partial_result(algorithm, monkeypatch):
+    monkeypatch.setattr(sudoku_engine, "CANCEL_CHECK_INTERVAL", 1)
+    puzzle = SudokuBoard.fromString(HARD)
+    engine = SudokuEngine(puzzle.copy(), algorithm)
+    engine.setBudget(nodes=5)
+    result = engine.solve()
+    assert result.solved is False
+    assert result.cancelled is False
+    assert result.timed_out is True and result.exceeded == "nodes"
+    assert result.stats.placements == 5
+    assert CandidateGrid(result.partial).isConsistent()
+    assert result.partial.cells.count(0) < puzzle.cells.count(0)
+
+    # budgets apply to every solve, and a larger one lets it finish
+    engine = SudokuEngine(puzzle.copy(), algorithm)
+    engine.setBudget(nodes=10_000_000)
+    result = engine.solve()
+    assert result.solved is True and result.timed_out is False and result.partial is None
+
+def test_time_and_memory_budgets():
+    puzzle = SudokuBoard.fromString(SLOW)
+    engine = SudokuEngine(puzzle.copy())
+    engine.setBudget(seconds=0.05)
+    result = engine.solve()
+    assert result.exceeded == "time"
+    assert result.stats.elapsed < 1
+    assert result.partial.cells.count(0) < puzzle.cells.count(0)
+
+    engine = SudokuEngine(SudokuBoard.fromString(HARD), "dlx")
+    engine.setBudget(memory=1)
+    assert engine.solve().exceeded == "memory"
+
+def test_budget_stops_stepping(monkeypatch):
+    monkeypatch.setattr(sudoku_engine, "CANCEL_CHECK_INTERVAL", 1)
+    engine = SudokuEngine(SudokuBoard.fromString(HARD))
+    engine.setBudget(nodes=30)
+    engine.start()
+    while engine.step():
+        pass
+    assert engine.stats.placements == 30
+    assert engine.result().timed_out is True
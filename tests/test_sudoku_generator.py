@@ -0,0 +1,56 @@
+import pytest
+from src.sudoku_core import CandidateGrid
+from src.sudoku_engine import count_solutions
+from src.sudoku_generator import DIFFICULTIES, generate_puzzle, generate_stream, grade, main, random_full_grid
+from src.sudoku_io import parse_puzzle
+
+# ---------------------------
+# Generation
+# ---------------------------
+
+def test_random_full_grid():
+    grid = CandidateGrid(random_full_grid(9))
+    assert grid.emptyCount() == 0
+    assert grid.isConsistent()
+
+@pytest.mark.parametrize("board_size", [16, 25, 36])
+def test_random_full_grid_large(board_size):
+    grid = CandidateGrid(random_full_grid(board_size))
+    assert grid.emptyCount() == 0
+    assert grid.isConsistent()
+
+def test_generated_puzzle_is_unique():
+    puzzle = generate_puzzle(seed=1)
+    assert puzzle.cells.count(0) > 40
+    assert count_solutions(puzzle) == 1
+
+def test_generation_is_reproducible():
+    assert generate_puzzle(seed=7) == generate_puzzle(seed=7)
+
+@pytest.mark.parametrize("difficulty", ["easy", "expert"])
+def test_generated_difficulty(difficulty):
+    puzzle = generate_puzzle(difficulty, seed=3)
+    assert grade(CandidateGrid(puzzle)) == difficulty
+
+def test_unknown_difficulty():
+    with pytest.raises(ValueError):
+        generate_puzzle("impossible")
+
+def test_grade(valid_board):
+    assert grade(CandidateGrid(valid_board)) == "easy"
+    assert list(DIFFICULTIES) == ["easy", "medium", "hard", "expert"]
+
+# ---------------------------
+# Batch generation
+# ---------------------------
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_stream_is_distinct(workers):
+    puzzles = list(generate_stream(6, workers=workers, chunk_size=2, seed=5))
+    assert len(set(puzzles)) == 6
+    assert all(count_solutions(parse_puzzle(puzzle)) == 1 for puzzle in puzzles)
+
+def test_main_writes_puzzles(tmp_path):
+    target = tmp_path / "puzzles.txt"
+    assert main(["-n", "3", "-o", str(target), "--workers", "1", "--seed", "2"]) == 0
+    assert len(target.read_text().splitlines()) == 3
@@ -0,0 +1,56 @@
+import pytest
+from src.sudoku_core import CandidateGrid
+from src.sudoku_engine import SudokuEngine
+from src.sudoku_heuristics import CELL_ORDERS, VALUE_ORDERS, get_cell_order, get_value_order, peer_masks
+
+# ---------------------------
+# Cell and value orders
+# ---------------------------
+
+def test_peer_masks():
+    assert all(mask.bit_count() == 20 for mask in peer_masks(9))
+
+def test_mrv_picks_most_constrained_cell(valid_board):
+    grid = CandidateGrid(valid_board)
+    row, column = get_cell_order("mrv")(grid)
+    assert grid.candidates(row, column).bit_count() == 1
+
+def test_row_major(valid_board):
+    assert get_cell_order("row-major")(CandidateGrid(valid_board)) == (0, 2)
+
+def test_lcv_returns_every_candidate(valid_board):
+    grid = CandidateGrid(valid_board)
+    assert sorted(get_value_order("lcv")(grid, 0, 2)) == [1, 2, 4]
+
+def test_unknown_order():
+    with pytest.raises(ValueError):
+        get_cell_order("whatever")
+
+@pytest.mark.parametrize("cell_order", sorted(CELL_ORDERS))
+@pytest.mark.parametrize("value_order", sorted(VALUE_ORDERS))
+def test_every_combination_solves(cell_order, value_order, valid_board, valid_board_solution):
+    engine = SudokuEngine(valid_board, cell_order=cell_order, value_order=value_order, seed=1)
+    assert engine.solve().board == valid_board_solution
+
+def test_mrv_expands_fewer_nodes(valid_board):
+    row_major = SudokuEngine([row[:] for row in valid_board]).solve()
+    mrv = SudokuEngine(valid_board, cell_order="mrv").solve()
+    assert mrv.stats.placements < row_major.stats.placements
+
+def test_restarts(valid_board, valid_board_solution):
+    result = SudokuEngine(valid_board, cell_order="mrv", value_order="random", restarts=True, seed=3).solve()
+    assert result.board == valid_board_solution
+
+def test_step_uses_cell_order(valid_board, valid_board_solution):
+    engine = SudokuEngine(valid_board, cell_order="mrv")
+    engine.start()
+    while engine.step():
+        pass
+    assert engine.board == valid_board_solution
+    assert engine.stats.backtracks == 0
+
+def test_restart_cutoff(monkeypatch, valid_board, valid_board_solution):
+    monkeypatch.setattr("src.sudoku_engine.RESTART_CUTOFF", 4)
+    result = SudokuEngine(valid_board, restarts=True, seed=0).solve()
+    assert result.board == valid_board_solution
+    assert result.stats.restarts > 0
@@ -0,0 +1,29 @@
+import io
+
+import pytest
+from src.sudoku_io import format_board, parse_puzzle, read_puzzles
+
+VALID_PUZZLE = "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79"
+
+# ---------------------------
+# Text format
+# ---------------------------
+
+def test_parse_puzzle(valid_board):
+    assert parse_puzzle(VALID_PUZZLE) == valid_board
+    assert parse_puzzle(VALID_PUZZLE.replace(".", "0")) == valid_board
+
+def test_format_board(valid_board):
+    assert format_board(valid_board) == VALID_PUZZLE
+
+@pytest.mark.parametrize("text", ["123", "x" * 81, ""])
+def test_parse_invalid(text):
+    with pytest.raises(ValueError):
+        parse_puzzle(text)
+
+def test_read_puzzles_is_lazy():
+    stream = io.StringIO(f"# header\n{VALID_PUZZLE}\n\n{VALID_PUZZLE}\n")
+    puzzles = read_puzzles(stream)
+    assert next(puzzles) == VALID_PUZZLE
+    assert stream.tell() < len(stream.getvalue())
+    assert list(puzzles) == [VALID_PUZZLE]
@@ -0,0 +1,121 @@
+import pytest
+from src.sudoku_core import CandidateGrid, SudokuBoard
+from src.sudoku_engine import STRATEGIES, SudokuEngine, count_solutions
+from src.sudoku_layout import cage_digits, get_layout, jigsaw_layout, killer_layout
+
+# An irregular 4x4: region id per cell
+JIGSAW = (
+    0, 0, 0, 1,
+    2, 0, 1, 1,
+    2, 2, 3, 1,
+    2, 3, 3, 3,
+)
+
+def follows_layout(board, layout):
+    # Every unit full of different digits and every cage on its total
+    cells = board.cells
+    for unit in layout.units:
+        values = [cells[cell] for cell in unit]
+        if 0 in values or len(set(values)) != len(values):
+            return False
+    return all(sum(cells[cell] for cell in layout.units[unit]) == total for unit, total, _ in layout.cages)
+
+def domino_killer():
+    # A full 9x9 board cut into horizontal dominoes (the last column alone)
+    solution = SudokuEngine(SudokuBoard.empty(9), "propagate").solve().board
+    cages = [((y * 9 + x, y * 9 + x + 1), solution[y, x] + solution[y, x + 1]) for y in range(9) for x in range(0, 8, 2)]
+    cages += [((y * 9 + 8,), solution[y, 8]) for y in range(9)]
+    return killer_layout(9, cages)
+
+# ---------------------------
+# Layout tables
+# ---------------------------
+
+def test_classic_layout():
+    layout = get_layout(9)
+    assert len(layout.units) == len(layout.houses) == 27
+    assert layout.units[18 + 4] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+    assert layout.core_of[40] == (4, 9 + 4, 18 + 4)
+    assert layout.has_extra is False
+    assert all(len(peers) == 20 for peers in layout.peers)
+    assert get_layout(9) is layout
+
+def test_diagonals_and_windows():
+    x = get_layout(9, "x")
+    assert len(x.units) == 29
+    assert len(x.units_of[40]) == 5 and len(x.peers[40]) == 32
+    assert x.extra_of[1] == ()
+
+    windoku = get_layout(9, "windoku")
+    assert len(windoku.units) == 31
+    assert windoku.units[27] == (10, 11, 12, 19, 20, 21, 28, 29, 30)
+
+def test_jigsaw_layout():
+    layout = jigsaw_layout(JIGSAW)
+    assert layout.variant == "jigsaw"
+    assert layout.units[8] == (0, 1, 2, 5)
+    assert jigsaw_layout(list(JIGSAW)) is layout
+
+def test_invalid_layouts():
+    with pytest.raises(ValueError):
+        get_layout(9, "hexagonal")
+    with pytest.raises(ValueError):
+        jigsaw_layout((0,) * 8 + (1,) * 8)
+    with pytest.raises(ValueError):
+        killer_layout(4, [((0, 1), 3), ((1, 2), 3)])
+
+def test_cage_digits():
+    assert cage_digits(9, 3, 2, 0) == (1 << 1) | (1 << 2)
+    assert cage_digits(9, 17, 2, 0) == (1 << 8) | (1 << 9)
+    assert cage_digits(9, 10, 2, 1 << 3) == 1 << 7
+    assert cage_digits(9, 10, 2, (1 << 3) | (1 << 7)) == get_layout(9).full_mask
+    assert cage_digits(9, 10, 2, (1 << 3) | (1 << 6)) == 0
+
+# ---------------------------
+# Grids and engines on variants
+# ---------------------------
+
+def test_grid_checks_extra_units():
+    board = SudokuBoard.empty(9)
+    board[0, 0] = 5
+    grid = CandidateGrid(board, get_layout(9, "x"))
+    assert not grid.isLegal(8, 8, 5)
+    assert grid.isLegal(8, 7, 5)
+    board[4, 4] = 5
+    grid.load()
+    assert grid.isConsistent() is False
+
+def test_grid_checks_cage_totals():
+    grid = CandidateGrid(SudokuBoard.empty(9), killer_layout(9, [((0, 1), 4)]))
+    assert [d for d in range(1, 10) if grid.candidatesAt(0) >> d & 1] == [1, 3]
+    grid.placeAt(0, 1)
+    assert grid.candidatesAt(1) == 1 << 3
+    grid.unplaceAt(0)
+    grid.cells[0] = grid.cells[1] = 2
+    assert grid.isConsistent() is False
+
+@pytest.mark.parametrize("algorithm", sorted(STRATEGIES))
+@pytest.mark.parametrize("variant", ["x", "windoku", "jigsaw", "killer"])
+def test_every_strategy_solves_every_variant(algorithm, variant):
+    layout = {
+        "x": lambda: get_layout(9, "x"),
+        "windoku": lambda: get_layout(9, "windoku"),
+        "jigsaw": lambda: jigsaw_layout(JIGSAW),
+        "killer": domino_killer,
+    }[variant]()
+    result = SudokuEngine(SudokuBoard.empty(layout.board_size), algorithm, layout=layout).solve()
+    assert result.solved is True
+    assert follows_layout(result.board, layout)
+
+@pytest.mark.parametrize("cell_order", ["mrv", "mrv-degree"])
+def test_heuristics_use_the_layout(cell_order):
+    layout = get_layout(9, "windoku")
+    result = SudokuEngine(SudokuBoard.empty(9), cell_order=cell_order, value_order="lcv", layout=layout).solve()
+    assert follows_layout(result.board, layout)
+
+def test_count_solutions_on_a_variant():
+    layout = get_layout(9, "x")
+    board = SudokuEngine(SudokuBoard.empty(9), "dlx", layout=layout).solve().board
+    board[0, 0] = board[4, 4] = 0
+    assert count_solutions(board, layout=layout) == 1
+    assert count_solutions(SudokuBoard.empty(4), limit=10, layout=jigsaw_layout(JIGSAW)) == 10
@@ -0,0 +1,67 @@
+import pytest
+from src.sudoku_checkpoint import read_checkpoint
+from src.sudoku_core import SudokuBoard
+from src.sudoku_engine import SudokuEngine, count_solutions
+from src.sudoku_parallel import count_parallel, open_branches, solve_parallel, split_board
+
+# Needs thousands of placements from the backtracking searches
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+
+# ---------------------------
+# Splitting the search tree
+# ---------------------------
+
+def test_split_keeps_every_solution():
+    parts = split_board(SudokuBoard.empty(4), 20)
+    assert len(parts) >= 20
+    assert sum(count_solutions(part, limit=1000) for part in parts) == 288
+
+def test_split_drops_dead_branches(valid_board):
+    parts = split_board(SudokuBoard.fromRows(valid_board), 10)
+    assert sum(count_solutions(part) for part in parts) == 1
+
+@pytest.mark.parametrize("cell_order", ["row-major", "mrv"])
+def test_open_branches_cover_the_rest_of_a_stopped_search(tmp_path, cell_order):
+    path = str(tmp_path / "slice.ckpt")
+    engine = SudokuEngine(SudokuBoard.fromString(HARD), cell_order=cell_order)
+    engine.setBudget(nodes=1000)
+    engine.setCheckpoint(path, every_nodes=0, every_seconds=0)
+    assert engine.solve().timed_out is True
+
+    checkpoint = read_checkpoint(path)
+    branches = open_branches(engine.board, checkpoint.kind, checkpoint.frames)
+    assert len(branches) > 1
+    boards = []
+    for snapshot in branches:
+        board = SudokuBoard.empty(9)
+        board.restore(snapshot)
+        boards.append(board)
+    assert sum(count_solutions(board) for board in boards) == 1
+
+# ---------------------------
+# Parallel search
+# ---------------------------
+
+@pytest.mark.parametrize("cell_order", ["row-major", "mrv"])
+def test_solve_parallel(cell_order):
+    expected = SudokuEngine(SudokuBoard.fromString(HARD)).solve().board
+    puzzle = SudokuBoard.fromString(HARD)
+    # tiny slices, so that subproblems get split and handed around
+    result = solve_parallel(puzzle, workers=2, cell_order=cell_order, slice_nodes=1)
+    assert result.solved is True
+    assert result.board == expected
+    assert puzzle == SudokuBoard.fromString(HARD)
+    assert result.stats.placements > 0
+
+def test_solve_parallel_unsolvable():
+    result = solve_parallel(SudokuBoard.fromString("12345678.........9" + "." * 63), workers=2, slice_nodes=1)
+    assert result.solved is False
+
+def test_count_parallel(valid_board_solution):
+    board = SudokuBoard.fromString(HARD)
+    assert count_parallel(board, workers=2) == 1
+
+    board = SudokuBoard.fromRows(valid_board_solution)
+    board[0, 0] = board[0, 1] = board[1, 0] = board[1, 1] = 0
+    assert count_parallel(board, workers=2, limit=10) == count_solutions(board, limit=10)
+    assert count_parallel(SudokuBoard.empty(4), limit=1000, workers=2) == 288
@@ -0,0 +1,63 @@
+from src.sudoku_core import CandidateGrid
+from src.sudoku_propagation import TECHNIQUES, Propagator, solve_propagate, unit_tables
+
+# ---------------------------
+# Unit tables
+# ---------------------------
+
+def test_unit_tables():
+    rows, columns, boxes, peers = unit_tables(9)
+    assert len(rows) == len(columns) == len(boxes) == 9
+    assert boxes[4] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+    assert len(peers[0]) == 20 and 0 not in peers[0]
+
+# ---------------------------
+# Propagation
+# ---------------------------
+
+def test_easy_puzzle_needs_no_guesses(valid_board, valid_board_solution):
+    propagator = Propagator(9)
+    grid = CandidateGrid(valid_board)
+    assert solve_propagate(grid, propagator) is True
+    assert grid.board == valid_board_solution
+    assert propagator.counts["guess"] == 0
+    assert set(propagator.counts) == set(TECHNIQUES)
+
+def test_hidden_single():
+    # 1 can only go in the top-left cell of the first box
+    board = [[0] * 9 for _ in range(9)]
+    board[1][3] = 1
+    board[2][6] = 1
+    board[3][1] = 1
+    board[6][2] = 1
+    propagator = Propagator(9)
+    candidates, done = propagator.load(CandidateGrid(board))
+    assert propagator.hiddenSingles(candidates, done) == 1
+    assert candidates[0] == 1 << 1
+    assert propagator.counts["hidden_single"] >= 1
+
+def test_naked_pair():
+    propagator = Propagator(9)
+    candidates = [propagator.full_mask] * 81
+    candidates[0] = candidates[1] = (1 << 1) | (1 << 2)
+    assert propagator.nakedSubsets(candidates, 2, "naked_pair") == 1
+    assert all(not candidates[cell] & ((1 << 1) | (1 << 2)) for cell in range(2, 9))
+    assert propagator.counts["naked_pair"] == 1
+
+def test_pointing():
+    # In the first box, 5 is only possible in the top row
+    propagator = Propagator(9)
+    candidates = [propagator.full_mask] * 81
+    for cell in (9, 10, 11, 18, 19, 20):
+        candidates[cell] &= ~(1 << 5)
+    assert propagator.lockedCandidates(candidates) == 1
+    assert all(not candidates[cell] & (1 << 5) for cell in range(3, 9))
+    assert propagator.counts["pointing"] == 1
+
+def test_contradiction(valid_board):
+    valid_board[0][2] = 0
+    valid_board[0][8] = 4
+    valid_board[2][0] = 1
+    valid_board[1][1] = 2  # (0, 2) has no candidate left
+    propagator = Propagator(9)
+    assert solve_propagate(CandidateGrid(valid_board), propagator) is False
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from src.sudoku_service import SolveService, solve_puzzles
+
+VALID_PUZZLE = "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79"
+UNSOLVABLE_PUZZLE = "12345678.........9" + "." * 63
+
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content), head.decode()
+
+
+def with_service(scenario, **options):
+    async def main():
+        service = SolveService(port=0, workers=1, **options)
+        await service.start()
+        try:
+            return await scenario(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+# ---------------------------
+# Worker function
+# ---------------------------
+
+def test_solve_puzzles(valid_board_solution):
+    results = solve_puzzles([VALID_PUZZLE, UNSOLVABLE_PUZZLE, "123", "55" + "." * 79], "propagate")
+    assert [result["status"] for result in results] == ["solved", "unsolvable", "invalid", "invalid"]
+    assert len(results[0]["solution"]) == 81 and "." not in results[0]["solution"]
+
+def test_solve_limit():
+    hard = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+    result, = solve_puzzles([hard], "backtrack", solve_limit=1e-9)
+    assert result["status"] == "timeout"
+    assert len(result["partial"]) == 81
+
+# ---------------------------
+# HTTP service
+# ---------------------------
+
+def test_single_and_batched_requests():
+    async def scenario(service):
+        status, single, _ = await request(service.port, "POST", "/solve", {"puzzle": VALID_PUZZLE})
+        assert status == 200 and single["status"] == "solved"
+
+        # concurrent requests end up in shared micro-batches
+        responses = await asyncio.gather(*(
+            request(service.port, "POST", "/solve", {"puzzles": [VALID_PUZZLE, UNSOLVABLE_PUZZLE], "algorithm": "dlx"})
+            for _ in range(5)
+        ))
+        for status, payload, _ in responses:
+            assert status == 200
+            assert [result["status"] for result in payload["results"]] == ["solved", "unsolvable"]
+            assert payload["results"][0]["solution"] == single["solution"]
+
+        status, health, _ = await request(service.port, "GET", "/health")
+        assert status == 200 and health["solved"] == 11 and health["pending"] == 0
+    with_service(scenario, max_delay=0.05)
+
+
+def test_bad_requests():
+    async def scenario(service):
+        assert (await request(service.port, "POST", "/solve", {"puzzle": 5}))[0] == 400
+        assert (await request(service.port, "POST", "/solve", {"puzzle": VALID_PUZZLE, "algorithm": "magic"}))[0] == 400
+        assert (await request(service.port, "GET", "/solve"))[0] == 405
+        assert (await request(service.port, "GET", "/nowhere"))[0] == 404
+        for length in ("abc", "-5"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            writer.write(f"POST /solve HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            assert response.split()[1] == b"400"
+            assert b"Invalid Content-Length" in response
+    with_service(scenario)
+
+
+def test_timeout_and_back_pressure():
+    async def scenario(service):
+        status, payload, _ = await request(service.port, "POST", "/solve", {"puzzle": VALID_PUZZLE, "timeout": 0})
+        assert status == 504
+
+        status, payload, head = await request(service.port, "POST", "/solve", {"puzzles": [VALID_PUZZLE] * 3})
+        assert status == 503 and "Retry-After: 1" in head
+
+        # the timed out puzzle is still solved in the background and frees its slot
+        while service.pending:
+            await asyncio.sleep(0.01)
+        assert (await request(service.port, "POST", "/solve", {"puzzles": [VALID_PUZZLE] * 2}))[0] == 200
+    with_service(scenario, max_pending=2)
@@ -1,4 +1,6 @@
 import pytest
+from src.sudoku_core import SudokuBoard
+from src.sudoku_generator import generate_puzzle
 from src.sudoku_solver import SudokuSolver
 
 # ---------------------------
@@ -61,4 +63,130 @@ def test_invalid_number_move(solver):
 # ---------------------------
 def test_solver_solution(solver, valid_board_solution):
     solver.solve()
-    assert solver.state.board == valid_board_solution
\ No newline at end of file
+    assert solver.state.board == valid_board_solution
+
+def test_solver_step_mode(solver, valid_board_solution):
+    solver.solve(mode="step")
+    while solver._backTrackStep():
+        pass
+    assert solver.state.board == valid_board_solution
+
+def test_solver_count_solutions(solver, valid_board):
+    assert solver.countSolutions() == 1
+    assert solver.state.board == valid_board
+
+def test_solver_set_board(solver):
+    puzzle = generate_puzzle(seed=4)
+    changes = []
+    solver.value_changed.connect(lambda row, column, value: changes.append(value))
+    solver.setBoard(puzzle)
+    assert solver.state.board == puzzle and solver.state.original_board == puzzle
+    assert len(changes) == 81
+    assert solver.countSolutions() == 1
+
+def test_set_board_of_another_size(solver):
+    sizes = []
+    solver.board_resized.connect(sizes.append)
+    puzzle = SudokuBoard.empty(16)
+    puzzle[0, 0] = 16
+    solver.setBoard(puzzle)
+    assert sizes == [16]
+    assert solver.state.board_size == 16 and solver.state.box_size == 4
+    assert solver.state.board == puzzle and solver.engine.board is solver.state.board
+    assert solver.isMoveValid((0, 1), 16) is False
+    assert solver.solve().solved
+    assert solver.isValidBoard() is None
+
+def test_back_to_small_boards_restores_the_cell_order(solver):
+    solver.setBoard(SudokuBoard.empty(16))
+    assert solver.engine.cell_order == "mrv"
+    solver.setBoard(SudokuBoard.empty(9))
+    assert solver.engine.cell_order == "row-major"
+
+def test_run_steps_coalesces_changes(solver, valid_board_solution):
+    batches = []
+    finished = []
+    solver.cells_changed.connect(batches.append)
+    solver.finished.connect(lambda: finished.append(True))
+    solver.solve(mode="step")
+    assert solver.runSteps(max_steps=1) is True
+    assert len(batches) == 1 and len(batches[0]) == 1
+
+    assert solver.runSteps(max_seconds=10) is False
+    assert finished == [True]
+    assert len(batches) == 2
+    assert len({(row, column) for row, column, _ in batches[1]}) == len(batches[1])
+    assert all(valid_board_solution[row][column] == value for row, column, value in batches[1])
+    assert solver.state.board == valid_board_solution
+
+def test_background_solve(solver, valid_board_solution):
+    from PySide6.QtCore import QCoreApplication, QEventLoop
+    app = QCoreApplication.instance() or QCoreApplication([])
+    loop = QEventLoop()
+    batches = []
+    solver.cells_changed.connect(batches.append)
+    solver.finished.connect(loop.quit)
+    solver.solve(mode="background")
+    assert solver.isSolving()
+    loop.exec()
+    assert not solver.isSolving()
+    assert solver.state.board == valid_board_solution
+    assert len(batches) == 1 and len(batches[0]) == 51
+    assert solver.stats.placements >= 51
+
+def test_shutdown_waits_for_a_background_solve():
+    from PySide6.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication([])
+    # minutes of row-major backtracking
+    solver = SudokuSolver(SudokuBoard.fromString(".......12........3..23..4....1....5..4......6.7...8....9...2..8....5...3.6.......").tolist())
+    solver.solve(mode="background")
+    thread = solver._thread
+    solver.shutdown()
+    assert thread.isFinished()
+    assert not solver.isSolving()
+    # the cancelled result still on its way is dropped
+    app.processEvents()
+    assert solver.state.board.cells.count(0) > 0
+
+@pytest.mark.parametrize("cancel", [False, True])
+def test_generate_in_background(solver, cancel):
+    from PySide6.QtCore import QCoreApplication, QEventLoop
+    app = QCoreApplication.instance() or QCoreApplication([])
+    loop = QEventLoop()
+    progress = []
+    solver.generate_progress.connect(progress.append)
+    solver.generated.connect(loop.quit)
+    solver.generatePuzzle(16 if cancel else 9)
+    assert solver.isSolving()
+    if cancel:
+        solver.cancel()
+    loop.exec()
+    assert not solver.isSolving()
+    # a cancelled generation still gives a puzzle with one solution (here the full
+    # grid, as no clue was taken away yet)
+    assert solver.state.board_size == (16 if cancel else 9)
+    assert solver.countSolutions() == 1
+    if not cancel:
+        assert solver.state.board.cells.count(0) > 0
+        assert progress[-1] > 90
+
+def test_background_solves_use_the_cache(valid_board, valid_board_solution):
+    from PySide6.QtCore import QCoreApplication, QEventLoop
+    from src.sudoku_cache import SolveCache
+    app = QCoreApplication.instance() or QCoreApplication([])
+    cache = SolveCache()
+    solver = SudokuSolver(valid_board, cache=cache)
+    loop = QEventLoop()
+    solver.finished.connect(loop.quit)
+    solver.solve(mode="background")
+    loop.exec()
+    assert cache.get(SudokuBoard.fromRows(valid_board)).board == valid_board_solution
+
+    # a hit is answered without starting a thread
+    again = SudokuSolver(valid_board, cache=cache)
+    finished = []
+    again.finished.connect(lambda: finished.append(True))
+    again.solve(mode="background")
+    assert not again.isSolving()
+    assert finished == [True]
+    assert again.state.board == valid_board_solution
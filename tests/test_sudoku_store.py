@@ -0,0 +1,110 @@
+import io
+
+import pytest
+from src.sudoku_core import SudokuBoard
+from src.sudoku_store import (
+    INVALID,
+    SOLVED,
+    UNSOLVABLE,
+    UNSOLVED,
+    PuzzleStore,
+    PuzzleStoreWriter,
+    export_text,
+    import_text,
+    main,
+    solve_store,
+)
+
+VALID_PUZZLE = "53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79"
+UNSOLVABLE_PUZZLE = "12345678.........9" + "." * 63
+TEXT = f"# corpus\n{VALID_PUZZLE}\nnot a puzzle\n{UNSOLVABLE_PUZZLE}\n"
+
+# ---------------------------
+# Puzzle store
+# ---------------------------
+
+@pytest.mark.parametrize("packing", ["byte", "nibble"])
+def test_import_and_random_access(tmp_path, packing, valid_board):
+    path = str(tmp_path / "corpus.sdk")
+    assert import_text(io.StringIO(TEXT), path, packing=packing) == 3
+    with PuzzleStore(path) as store:
+        assert len(store) == 3
+        assert store.puzzle(0) == valid_board
+        assert store.puzzle(2).toString() == UNSOLVABLE_PUZZLE
+        assert [store.status(index) for index in range(3)] == [UNSOLVED, INVALID, UNSOLVED]
+        assert store.solution(0) is None
+        with pytest.raises(IndexError):
+            store.puzzle(3)
+
+def test_nibble_packing_halves_the_records(tmp_path):
+    for packing in ("byte", "nibble"):
+        import_text(io.StringIO(TEXT), str(tmp_path / packing), packing=packing)
+    with PuzzleStore(str(tmp_path / "byte")) as store, PuzzleStore(str(tmp_path / "nibble")) as packed:
+        assert store.record_size == 1 + 2 * 81
+        assert packed.record_size == 1 + 2 * 41
+
+def test_byte_boards_are_views_of_the_file(tmp_path):
+    path = str(tmp_path / "corpus.sdk")
+    import_text(io.StringIO(TEXT), path)
+    with PuzzleStore(path, writable=True) as store:
+        board = store.puzzle(0)
+        board[0, 2] = 4
+        del board
+    with PuzzleStore(path) as store:
+        assert store.puzzle(0)[0, 2] == 4
+
+@pytest.mark.parametrize("packing", ["byte", "nibble"])
+def test_solve_in_place_and_export(tmp_path, packing, valid_board_solution):
+    path = str(tmp_path / "corpus.sdk")
+    import_text(io.StringIO(TEXT), path, packing=packing)
+    counts = solve_store(path)
+    assert (counts[SOLVED], counts[UNSOLVABLE], counts[INVALID]) == (1, 1, 1)
+    with PuzzleStore(path) as store:
+        assert store.solution(0) == valid_board_solution
+        assert store.puzzle(0).toString() == VALID_PUZZLE
+        assert store.status(2) == UNSOLVABLE
+
+    answers = list(export_text(path, solutions=True))
+    assert answers[1:] == ["Invalid puzzle", "unsolvable"]
+    assert SudokuBoard.fromString(answers[0]) == valid_board_solution
+    assert list(export_text(path))[0] == VALID_PUZZLE
+
+def test_failed_solve_still_closes_the_store(tmp_path):
+    path = str(tmp_path / "corpus.sdk")
+    import_text(io.StringIO(TEXT), path)
+    # the engine's error comes through instead of a BufferError from close()
+    with pytest.raises(ValueError, match="Unknown algorithm"):
+        solve_store(path, "bogus")
+    with pytest.raises(SystemExit):
+        main(["solve", path, "-a", "bogus"])
+    assert solve_store(path)[SOLVED] == 1
+
+def test_writer_appends_to_matching_stores_only(tmp_path, valid_board):
+    path = str(tmp_path / "corpus.sdk")
+    with PuzzleStoreWriter(path) as writer:
+        writer.append(SudokuBoard.fromRows(valid_board))
+    with PuzzleStoreWriter(path) as writer:
+        writer.append(SudokuBoard.fromRows(valid_board))
+    with PuzzleStore(path) as store:
+        assert len(store) == 2
+    with pytest.raises(ValueError):
+        PuzzleStoreWriter(path, packing="nibble")
+    with pytest.raises(ValueError):
+        PuzzleStoreWriter(str(tmp_path / "big.sdk"), board_size=16, packing="nibble")
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    path.write_text(TEXT)
+    with pytest.raises(ValueError):
+        PuzzleStore(str(path))
+
+def test_main_round_trip(tmp_path, capsys):
+    source = tmp_path / "puzzles.txt"
+    source.write_text(TEXT)
+    store = str(tmp_path / "corpus.sdk")
+    target = tmp_path / "solutions.txt"
+    assert main(["import", str(source), store]) == 0
+    assert main(["solve", store]) == 0
+    assert main(["export", store, "--solutions", "-o", str(target)]) == 0
+    assert target.read_text().splitlines()[2] == "unsolvable"
+    assert "1 solved" in capsys.readouterr().err
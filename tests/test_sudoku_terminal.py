@@ -0,0 +1,80 @@
+import io
+import re
+
+from src.sudoku_core import SudokuBoard
+from src.sudoku_solver import SudokuSolver
+from src.sudoku_terminal import SudokuTerminalVisualizer
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+    def reset(self):
+        # Forget everything written so far
+        self.seek(0)
+        self.truncate()
+        self.writes = 0
+
+
+def test_first_frame_draws_the_whole_board(solver):
+    stream = CountingStream()
+    visualizer = SudokuTerminalVisualizer(stream=stream)
+    stream.reset()
+
+    visualizer.print(solver.state)
+    frame = re.sub(r"\033\[[0-9;]*[A-Za-z]", "", stream.getvalue())
+    assert stream.writes == 1
+    assert frame.count("\n") == 12
+    assert frame.splitlines()[1].split() == ["|", "5", "3", "-", "|", "-", "7", "-", "|", "-", "-", "-", "|"]
+
+
+def test_later_frames_only_rewrite_changed_cells(solver):
+    stream = CountingStream()
+    visualizer = SudokuTerminalVisualizer(stream=stream)
+    visualizer.print(solver.state)
+    stream.reset()
+
+    visualizer.print(solver.state)
+    assert stream.getvalue() == ""
+
+    solver.state.board[0, 2] = 4
+    solver.state.board[8, 8] = 0
+    visualizer.print(solver.state)
+    moves = re.findall(r"\033\[(\d+);(\d+)H", stream.getvalue())
+    # row 0 is below the top line, row 8 below four lines; column 2 after one separator
+    assert moves[:2] == [("2", "7"), ("12", "23")]
+    assert stream.writes == 1
+    assert "\033[1;32m4" in stream.getvalue()
+
+
+def test_frames_are_skipped_above_the_frame_rate(solver):
+    stream = CountingStream()
+    visualizer = SudokuTerminalVisualizer(fps=1, stream=stream)
+    visualizer.print(solver.state)
+    stream.seek(0), stream.truncate()
+
+    solver.state.board[0, 2] = 4
+    visualizer.print(solver.state)
+    assert stream.getvalue() == ""
+    visualizer.print(solver.state, force=True)
+    assert "\033[2;7H" in stream.getvalue()
+
+
+def test_large_boards_use_symbols():
+    solver = SudokuSolver(SudokuBoard.empty(25).tolist())
+    solver.state.board[0, 0] = 25
+    stream = io.StringIO()
+    visualizer = SudokuTerminalVisualizer(stream=stream)
+    visualizer.print(solver.state)
+    assert visualizer.cellWidth(solver.state) == 2
+    assert "mP " in stream.getvalue()
+
+def test_huge_boards_get_wider_cells():
+    solver = SudokuSolver(SudokuBoard.empty(64).tolist())
+    assert SudokuTerminalVisualizer(stream=io.StringIO()).cellWidth(solver.state) == 3
@@ -0,0 +1,134 @@
+import io
+import random
+import re
+
+import pytest
+from src.sudoku_core import SudokuBoard
+from src.sudoku_engine import SudokuEngine
+from src.sudoku_terminal import SudokuTerminalVisualizer
+from src.sudoku_trace import HEADER, KEYFRAME_INTERVAL, TracePlayer, TraceWriter, main, read_trace
+
+# Needs tens of thousands of placements from the row-major search
+HARD = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+
+def traced_solve(puzzle, **options):
+    engine = SudokuEngine(SudokuBoard.fromString(puzzle), **options)
+    stream = io.BytesIO()
+    with TraceWriter(stream, engine.board) as writer:
+        engine.setTrace(writer)
+        result = engine.solve()
+    return result, stream.getvalue()
+
+# ---------------------------
+# Recording
+# ---------------------------
+
+@pytest.mark.parametrize("options", [{}, {"cell_order": "mrv", "value_order": "lcv"}, {"restarts": True, "seed": 3}])
+def test_trace_replays_the_search(options):
+    result, data = traced_solve(HARD, **options)
+    expected = SudokuEngine(SudokuBoard.fromString(HARD), **options).solve()
+    trace = read_trace(data)
+    assert result.solved is True
+    assert result.stats.placements == expected.stats.placements
+    assert trace.boardAt(0) == SudokuBoard.fromString(HARD)
+    assert trace.boardAt(len(trace)) == result.board
+    assert sum(1 for value in trace.after if value) == result.stats.placements
+    # a few bytes per event
+    assert len(data) - HEADER.size - 81 < 2 * len(trace)
+
+def test_stepping_search_is_traced(valid_board, valid_board_solution):
+    engine = SudokuEngine(valid_board)
+    stream = io.BytesIO()
+    writer = TraceWriter(stream, engine.board)
+    engine.setTrace(writer)
+    engine.start()
+    while engine.step():
+        pass
+    writer.close()
+    assert read_trace(stream.getvalue()).boardAt(writer.events) == valid_board_solution
+
+def test_writer_streams(tmp_path):
+    path = str(tmp_path / "solve.trace")
+    engine = SudokuEngine(SudokuBoard.fromString(HARD))
+    writer = TraceWriter(path, engine.board, flush_bytes=256)
+    engine.setTrace(writer)
+    engine.solve()
+    # everything up to the last flush is readable while the writer is still open
+    assert 0 < len(read_trace(path)) <= writer.events
+    writer.close()
+    assert len(read_trace(path)) == writer.events
+
+def test_other_algorithms_cannot_be_traced(valid_board):
+    engine = SudokuEngine(valid_board, "dlx")
+    engine.setTrace(TraceWriter(io.BytesIO(), engine.board))
+    with pytest.raises(ValueError):
+        engine.solve()
+
+def test_rejects_bad_traces():
+    _, data = traced_solve(HARD)
+    with pytest.raises(ValueError):
+        read_trace(data[:HEADER.size - 1])
+    with pytest.raises(ValueError):
+        read_trace(b"SDKTRAC!" + data[8:])
+    # an event cut off at the end is left out
+    assert len(read_trace(data + b"\x80")) == len(read_trace(data))
+
+# ---------------------------
+# Replay
+# ---------------------------
+
+def test_seek_and_step():
+    trace = read_trace(traced_solve(HARD)[1])
+    assert len(trace) > 4 * KEYFRAME_INTERVAL
+    player = TracePlayer(trace)
+    generator = random.Random(5)
+    for _ in range(50):
+        before = player.board.copy()
+        if generator.random() < 0.5:
+            changes = player.seek(generator.randrange(len(trace) + 1))
+        else:
+            changes = player.step(generator.randrange(-300, 300))
+        assert player.board == trace.boardAt(player.position)
+        for row, column, value in changes:
+            before[row, column] = value
+        assert before == player.board
+    assert player.seek(len(trace) + 10) is not None and player.atEnd()
+
+def test_terminal_replay():
+    trace = read_trace(traced_solve(HARD)[1])
+    stream = io.StringIO()
+    visualizer = SudokuTerminalVisualizer(stream=stream)
+    player = TracePlayer(trace)
+    visualizer.replayTrace(player, speed=0)
+    assert player.atEnd()
+    assert visualizer.drawn == list(trace.boardAt(len(trace)).cells)
+
+    visualizer.replayTrace(player, speed=10_000_000, end=0)
+    assert player.position == 0
+    assert visualizer.drawn == list(SudokuBoard.fromString(HARD).cells)
+
+def test_solver_replays_a_trace(solver):
+    trace = read_trace(traced_solve(HARD)[1])
+    batches = []
+    finished = []
+    solver.cells_changed.connect(batches.append)
+    solver.finished.connect(lambda: finished.append(True))
+    solver.openTrace(trace)
+    assert solver.state.board == trace.boardAt(0)
+
+    assert solver.replaySteps(1000) is True
+    assert solver.state.board == trace.boardAt(1000)
+    assert solver.replaySteps(len(trace)) is False
+    assert finished == [True]
+    assert solver.state.board == trace.boardAt(len(trace))
+    solver.seekTrace(10)
+    assert solver.state.board == trace.boardAt(10)
+    assert len(batches) == 3
+
+def test_main_records_and_describes(tmp_path, capsys):
+    path = str(tmp_path / "solve.trace")
+    assert main(["record", HARD, path]) == 0
+    assert main(["info", path]) == 0
+    output = capsys.readouterr().out
+    assert re.search(r"9x9 board, \d+ events \(\d+ placements\)", output)
+    assert "bytes per event" in output